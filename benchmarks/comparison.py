@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Benchmark `Comparison` on large route tables with a large interface mapping.
+
+A full comparison should be linear in the number of objects, so the time per
+route printed for each table size should stay flat as the table grows.
+"""
+import sys
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "controller" / "voss")]
+
+from model.compare import Comparison  # noqa: E402
+from model.network_objects import Basic, Interface, Network, State  # noqa: E402
+from voss import TechFile, VOSS  # noqa: E402
+
+
+def address(n: int) -> str:
+    return f"{n >> 24 & 255}.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}"
+
+
+def switch(routes: int, ports: int, changed: int, slot: int) -> VOSS:
+    """
+    Build a parsed switch holding a route table and a set of interfaces.
+
+    :param routes: the number of /24 routes
+    :param ports: the number of interfaces
+    :param changed: every `changed`th route has a different next hop
+    :param slot: the slot number of every interface
+    :return: a parsed VOSS object
+    """
+    instance = VOSS(TechFile())
+    instance._data_store = {
+        Network: {
+            Network(address(0x0A000000 + (n << 8)), "255.255.255.0"): {
+                "Next Hop": Basic(address(0xC0A80001 + (n % changed == 0 and slot))),
+                "Outgoing Interface": Interface(f"Vlan{n % 4000}"),
+            }
+            for n in range(routes)
+        },
+        Interface: {Interface(f"{slot}/{n}"): {"State": State("Up")} for n in range(ports)},
+    }
+    return instance
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--routes", type=int, nargs="+", default=[250_000, 500_000, 1_000_000])
+    parser.add_argument("--ports", type=int, default=100_000, help="mapped interfaces")
+    args = parser.parse_args()
+
+    mapping = {Interface: [Comparison.Pair(Interface(f"1/{n}"), Interface(f"3/{n}")) for n in range(args.ports)]}
+    for routes in args.routes:
+        old = switch(routes, args.ports, 100, 1)
+        new = switch(routes, args.ports, 100, 3)
+        start = time.perf_counter()
+        differences = sum(1 for _, d in Comparison(old, new, mapping) for v in d.values() if v)
+        elapsed = time.perf_counter() - start
+        objects = routes + args.ports
+        print(f"{routes:>10,} routes {args.ports:>8,} mapped ports: {elapsed:7.2f}s "
+              f"{elapsed / objects * 1e9:8.0f} ns/object {differences:>8,} differences")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark `TechFile.extractor` across tech file sizes and parser registry sizes.
+
+The extractor should scale linearly with the number of lines in the tech file and
+its cost should not depend on the number of registered commands. The table printed
+reports the throughput for each combination so that both properties can be read off
+directly: lines/sec should stay flat down each column and across each row.
+"""
+import sys
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "controller" / "voss")]
+
+from voss import TechFile  # noqa: E402
+
+
+def tech_file(sections: int, lines_per_section: int) -> list[str]:
+    """
+    Build a synthetic tech file of `sections` command sections.
+
+    :param sections: the number of command sections
+    :param lines_per_section: the number of output lines in each section
+    :return: the tech file as a list of lines
+    """
+    text = []
+    for n in range(sections):
+        text.append(f"Command:[{n}] [show synthetic command {n}]\n")
+        text.extend(f"Port{n % 8 + 1}/{i % 64 + 1}  up  1000  full  {i:08d}\n" for i in range(lines_per_section))
+    return text
+
+
+def run(text: list[str], commands: set[str]) -> float:
+    start = time.perf_counter()
+    for _ in TechFile.extractor(text, commands):
+        pass
+    return time.perf_counter() - start
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sections", type=int, default=200, help="command sections in the smallest file")
+    parser.add_argument("--lines", type=int, default=500, help="output lines per section")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 2, 4, 8], help="file size multipliers")
+    parser.add_argument("--parsers", type=int, nargs="+", default=[5, 50, 500], help="registered command counts")
+    args = parser.parse_args()
+
+    print(f"{'lines':>10} " + " ".join(f"{f'{p} parsers':>16}" for p in args.parsers))
+    for scale in args.scales:
+        sections = args.sections * scale
+        text = tech_file(sections, args.lines)
+        row = []
+        for parsers in args.parsers:
+            # Half of the registered commands appear in the file, the rest never match.
+            commands = {f"show synthetic command {n * 2}" for n in range(parsers)}
+            row.append(len(text) / run(text, commands))
+        print(f"{len(text):>10} " + " ".join(f"{r:>10,.0f} l/s" for r in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+The generator module writes deterministic synthetic VOSS tech files.
+
+The output of each registered command is laid out the way a VOSS switch prints it,
+closely enough that every parser finds what it is looking for, and sized by the
+number of ports, neighbours, learned MAC addresses and routes requested. Sections
+of commands with no parser are interleaved to stand in for the rest of a tech file.
+"""
+from __future__ import annotations
+
+import random
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+RULE = "=" * 90 + "\n"
+DASH = "-" * 90 + "\n"
+
+
+def _address(n: int) -> str:
+    return f"{n >> 24 & 255}.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}"
+
+
+def _mac(n: int) -> str:
+    return ":".join(f"{n >> shift & 255:02x}" for shift in range(40, -8, -8))
+
+
+@dataclass
+class TechFileGenerator:
+    """
+    A TechFileGenerator describes the size of a synthetic switch. The same parameters and seed
+    always produce the same tech file.
+    """
+    ports: int = 48
+    lldp_neighbors: int = 8
+    isis_neighbors: int = 4
+    mac_addresses: int = 1000
+    routes: int = 1000
+    filler_lines: int = 1000
+    seed: int = 0
+    hostname: str = "vsp-1"
+
+    def _ports(self) -> list[str]:
+        return [f"{n // 48 + 1}/{n % 48 + 1}" for n in range(self.ports)]
+
+    def sections(self) -> Iterator[tuple[str, list[str]]]:
+        """
+        Generate the command sections of the tech file in the order a switch prints them.
+
+        :return: a tuple holding each command and its output separated by lines
+        """
+        rng = random.Random(self.seed)
+        ports = self._ports()
+        neighbors = rng.sample(ports, min(self.lldp_neighbors, len(ports)))
+        yield "show sys-info", [f"        SysName      : {self.hostname}\n", *self._filler(rng)]
+        yield "show interfaces gigabitEthernet", self._interfaces(rng, ports)
+        yield "show running-config", self._filler(rng)
+        yield "show lldp neighbor", self._lldp(rng, neighbors)
+        yield "show isis adjacencies", self._isis(rng, neighbors[:self.isis_neighbors])
+        yield "show ip interface", self._ip_interfaces()
+        yield "show ip route", self._routes(rng, neighbors[:self.isis_neighbors])
+        yield "show log file", self._filler(rng)
+
+    def lines(self) -> Iterator[str]:
+        """
+        Generate the tech file line by line.
+
+        :return: the lines of the tech file
+        """
+        for n, (command, output) in enumerate(self.sections(), 1):
+            yield f"Command:[{n}] [{command}]\n"
+            yield from output
+
+    def write(self, file_path: Path) -> Path:
+        """
+        Write the tech file to a path.
+
+        :param file_path: the path to write to
+        :return: the path
+        """
+        with open(file_path, 'w') as f:
+            f.writelines(self.lines())
+        return Path(file_path)
+
+    def _filler(self, rng: random.Random) -> list[str]:
+        return [f"  {rng.getrandbits(64):016x} filler output line {n}\n" for n in range(self.filler_lines // 3)]
+
+    def _interfaces(self, rng: random.Random, ports: list[str]) -> list[str]:
+        output = [RULE, " " * 37 + "Port Name\n", RULE,
+                  "PORT                                    OPERATE  OPERATE  OPERATE\n",
+                  "NUM      NAME            DESCRIPTION    STATUS   DUPLX    SPEED    VLAN\n", DASH]
+        for port in ports:
+            status = "up" if rng.random() < 0.7 else "down"
+            output.append(f"{port:<9}{'':<16}10GbSR         {status:<9}full     10000    Access\n")
+        output += [RULE, " " * 37 + "Port Config\n", RULE]
+        output += [f"{port:<9}disable  false    true     enable\n" for port in ports]
+        output += [RULE, " " * 37 + "Port Fdb\n", RULE, "VLAN  MAC                 PORT       TYPE\n", DASH]
+        for n in range(self.mac_addresses):
+            output.append(f"{rng.randrange(1, 4000):<6}{_mac(0x005100000000 + n):<20}Port-{rng.choice(ports):<6}LEARNED\n")
+        output += [RULE, " " * 33 + "Brouter Port Ip\n", RULE]
+        return output
+
+    def _lldp(self, rng: random.Random, neighbors: list[str]) -> list[str]:
+        output = [RULE, " " * 37 + "LLDP Neighbor\n", RULE, "\n"]
+        for n, port in enumerate(neighbors):
+            output += [
+                f"Port: {port:<9}Index       : {n + 1}\n",
+                "               Protocol    : LLDP\n",
+                f"               ChassisId   : MAC Address   {_mac(0x020000000000 + n)}\n",
+                f"               PortId      : IfName        {rng.choice(self._ports())}\n",
+                f"               SysName     : core-{n}\n",
+                "               SysDescr    : VSP-8404C (8.1.0.0)\n",
+                "\n",
+            ]
+        return output
+
+    def _isis(self, rng: random.Random, neighbors: list[str]) -> list[str]:
+        output = [RULE, " " * 32 + "ISIS Adjacencies\n", RULE,
+                  "INTERFACE    L STATE   UPTIME      PRI HOLDTIME SYSID          HOST-NAME       STATE\n", DASH]
+        for n, port in enumerate(neighbors):
+            output.append(f"Port{port:<9}1 UP      1d 02:11:03 127 27       0200.1000.{n:04x} core-{n:<10} UP\n")
+        output += [DASH, f"{len(neighbors)} out of {len(neighbors)} Total Num of Adjacencies\n"]
+        return output
+
+    def _ip_interfaces(self) -> list[str]:
+        output = [RULE, " " * 30 + "IP Interface - GlobalRouter\n", RULE,
+                  "IFINDEX    IP ADDRESS      NET MASK        BCASTADDR  REASM MAXSIZE  VLAN ID  BROUTER\n", DASH]
+        for vlan in range(1, min(self.routes, 64) + 1):
+            output.append(f"Vlan{vlan:<6} {_address(0x0A640001 + (vlan << 8)):<15} 255.255.255.0   ones       1500           "
+                          f"{vlan:<8} false\n")
+        return output
+
+    def _routes(self, rng: random.Random, neighbors: list[str]) -> list[str]:
+        output = [RULE, " " * 30 + "IP Route - GlobalRouter\n", RULE,
+                  "                                                    NH                INTER\n",
+                  "DST             MASK            NEXT               VRF/ISID  COST      FACE  PROT  AGE  TYPE  PRF\n",
+                  DASH]
+        for n in range(self.routes):
+            if neighbors and rng.random() < 0.5:
+                next_hop, face, protocol = f"core-{rng.randrange(len(neighbors))}", rng.choice(neighbors), "ISIS"
+            else:
+                vlan = rng.randrange(1, 65)
+                next_hop, face, protocol = _address(0x0A640001 + (vlan << 8)), str(vlan), "OSPF"
+            output.append(f"{_address(0x0B000000 + (n << 8)):<15} 255.255.255.0   {next_hop:<18} GRT       "
+                          f"{rng.randrange(1, 100):<9} {face:<5} {protocol:<5} 0    IB    7\n")
+        output += [DASH, f"{self.routes} out of {self.routes} Total Num of Route Entries\n"]
+        return output
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark a year of daily collections of a switch in a History.
+
+Each day moves the LLDP neighbours of a few ports and replaces a few routes. The size
+of the History is compared with a full snapshot of every day, and the time to rebuild
+the switch at the day with the most changes since its snapshot, and to find when the
+LLDP neighbour of a port changed, are timed.
+"""
+import random
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from datetime import date, timedelta
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "controller" / "voss")]
+
+import layer2  # noqa: E402,F401 registers the layer 2 parsers
+import layer3  # noqa: E402,F401 registers the layer 3 parsers
+from benchmarks.generator import TechFileGenerator  # noqa: E402
+from model.history import History  # noqa: E402
+from model.network_objects import Connection, Interface, Network  # noqa: E402
+from voss import VOSS  # noqa: E402
+
+
+def size(directory: Path) -> int:
+    return sum(path.stat().st_size for path in directory.iterdir())
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--ports", type=int, default=384)
+    parser.add_argument("--mac-addresses", type=int, default=20_000)
+    parser.add_argument("--routes", type=int, default=20_000)
+    parser.add_argument("--changes", type=int, default=5, help="ports and routes changed each day")
+    parser.add_argument("--keyframe-interval", type=int, default=30)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        tech_file = Path(directory) / "vsp.txt"
+        TechFileGenerator(ports=args.ports, mac_addresses=args.mac_addresses, routes=args.routes).write(tech_file)
+        switch = VOSS.load(tech_file)
+        switch.save(str(Path(directory) / "vsp.snap"))
+        data = switch.read()
+        ports = list(data[Interface])
+
+        start = time.perf_counter()
+        with History(Path(directory) / "history", keyframe_interval=args.keyframe_interval) as history:
+            first = date(2025, 1, 1)
+            for day in range(args.days):
+                # Only the dictionaries holding a change are copied, as a parser would create them anew.
+                data = {**data, Interface: dict(data[Interface]), Network: dict(data[Network])}
+                for port in rng.sample(ports, args.changes):
+                    data[Interface][port] = {**data[Interface][port], "LLDP Remote SysName": Connection(f"core-{day}")}
+                for route in rng.sample(list(data[Network]), args.changes):
+                    values = data[Network].pop(route)
+                    data[Network][Network(f"172.{day % 256}.{rng.randrange(256)}.0", route.mask)] = values
+                history.record(first + timedelta(days=day), data)
+            elapsed = time.perf_counter() - start
+            print(f"{args.days} collections recorded in {elapsed:.2f}s, {elapsed / args.days * 1e3:.1f}ms each")
+            full = (Path(directory) / "vsp.snap").stat().st_size * args.days
+            stored = size(Path(directory) / "history")
+            print(f"history {stored / 1e6:.1f}MB against {full / 1e6:.1f}MB of daily snapshots")
+
+            # The day before the last keyframe has the longest chain of deltas, or the last day if there is one keyframe.
+            keyframe = (args.days - 1) // args.keyframe_interval * args.keyframe_interval
+            worst = first + timedelta(days=keyframe - 1 if keyframe else args.days - 1)
+            start = time.perf_counter()
+            history.state(worst)
+            print(f"state at {worst} rebuilt in {time.perf_counter() - start:.2f}s")
+            start = time.perf_counter()
+            history.state(worst, types=[Interface])
+            print(f"Interface state at {worst} rebuilt in {time.perf_counter() - start:.2f}s")
+            start = time.perf_counter()
+            changes = history.changes(Interface, ports[0], "LLDP Remote SysName")
+            print(f"{len(changes)} LLDP neighbour changes of {ports[0]} found in {(time.perf_counter() - start) * 1e3:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
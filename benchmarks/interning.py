@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Measure the memory held by the parsed data of a synthetic fleet with interned,
+slotted network objects against the plain frozen dataclasses they replaced.
+"""
+import sys
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from dataclasses import dataclass
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "controller" / "voss")]
+
+from model import network_objects  # noqa: E402
+
+
+@dataclass(frozen=True)
+class Plain:
+    name: str
+
+
+@dataclass(frozen=True)
+class PlainNetwork:
+    address: str
+    mask: str
+
+
+def fleet(switches: int, ports: int, routes: int, basic, network) -> list[dict]:
+    """
+    Build the parsed data of a fleet the way the parsers do, one new object per value per line.
+
+    :return: the parsed data of each switch
+    """
+    data = []
+    for s in range(switches):
+        interfaces = {
+            basic(f"{slot}/{port}"): {
+                "State": basic("Up" if port % 3 else "Down"),
+                "LLDP Remote SysName": basic(f"core-{s % 16}"),
+                "LLDP Remote Interface": basic(f"{slot}/{port}"),
+            }
+            for slot in range(1, 3) for port in range(1, ports // 2 + 1)
+        }
+        networks = {
+            network(f"10.{n >> 8 & 255}.{n & 255}.0", "255.255.255.0"): {
+                "Next Hop": basic(f"10.255.{s % 4}.1"),
+                "Outgoing Interface": basic(f"Vlan{n % 100}"),
+            }
+            for n in range(routes)
+        }
+        data.append({"Interface": interfaces, "Network": networks})
+    return data
+
+
+def measure(build) -> tuple[int, float, list]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, elapsed, data
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--switches", type=int, default=200)
+    parser.add_argument("--ports", type=int, default=96)
+    parser.add_argument("--routes", type=int, default=2000)
+    args = parser.parse_args()
+
+    counts = args.switches, args.ports, args.routes
+    plain_size, plain_time, plain = measure(lambda: fleet(*counts, Plain, PlainNetwork))
+    del plain
+    interned_size, interned_time, interned = measure(
+        lambda: fleet(*counts, network_objects.Interface, network_objects.Network)
+    )
+    print(f"plain dataclasses: {plain_size / 2**20:8.1f} MiB {plain_time:6.2f}s")
+    print(f"interned objects:  {interned_size / 2**20:8.1f} MiB {interned_time:6.2f}s")
+    print(f"reduction:         {1 - interned_size / plain_size:8.1%}")
+
+
+if __name__ == "__main__":
+    main()
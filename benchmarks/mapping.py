@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark loading a mapping file of explicit pairs against the equivalent range rule.
+
+A chassis migration of many ports is written both as one explicit pair per port, loaded
+with the pure Python YAML loader the mapping files used to be read with and with the
+loader `model.mapping` uses, and as a single range rule resolved on demand.
+"""
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+import yaml
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "controller" / "voss")]
+
+from model.mapping import YAML_LOADER, load_mapping  # noqa: E402
+from model.network_objects import Interface  # noqa: E402
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ports", type=int, default=50_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        explicit, rules = Path(directory) / "explicit.yaml", Path(directory) / "rules.yaml"
+        explicit.write_text("Interface:\n" + "".join(
+            f"  - before: 1/{n}\n    after: 3/{n}\n" for n in range(1, args.ports + 1)
+        ))
+        rules.write_text(f"Interface:\n  - before: 1/[1-{args.ports}]\n    after: 3/[1-{args.ports}]\n")
+        lines = args.ports * 2 + 1
+
+        start = time.perf_counter()
+        with open(explicit) as f:
+            yaml.load(f, Loader=yaml.FullLoader)
+        print(f"explicit pairs, FullLoader:   {lines:>9,} lines in {time.perf_counter() - start:6.2f}s")
+        start = time.perf_counter()
+        load_mapping(explicit)
+        print(f"explicit pairs, {YAML_LOADER.__name__ + ':':<13} {lines:>9,} lines in {time.perf_counter() - start:6.2f}s")
+
+        start = time.perf_counter()
+        resolver = load_mapping(rules)[Interface]
+        print(f"range rule:                   {3:>9,} lines in {time.perf_counter() - start:6.2f}s")
+        ports = [Interface(f"1/{n}") for n in range(1, args.ports + 1)]
+        for label in ("first lookups", "repeat lookups"):
+            start = time.perf_counter()
+            for port in ports:
+                resolver.get(port)
+            elapsed = time.perf_counter() - start
+            print(f"range rule, {label + ':':<17} {args.ports / elapsed:>12,.0f} lookups/s")
+
+
+if __name__ == "__main__":
+    main()
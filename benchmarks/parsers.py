@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Benchmark the VOSS parsers built on the table engine against the hand-rolled parsers they replaced.
+
+Each parser is run on its section of a synthetic tech file and the throughput of both
+versions is reported in lines per second, after checking that both produce the same output.
+"""
+import re
+import sys
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "controller" / "voss")]
+
+from benchmarks.generator import TechFileGenerator  # noqa: E402
+from model.network_objects import Basic, Connection, Interface, MacAddresses, Network, State  # noqa: E402
+from voss import TechFile, VOSS  # noqa: E402
+
+import layer2  # noqa: E402,F401 registers the layer 2 parsers
+import layer3  # noqa: E402,F401 registers the layer 3 parsers
+
+
+def get_lldp_neighbors(text_lines: list[str]) -> dict[Interface, dict[str, VOSS.Object]]:
+    """The hand-rolled parser of "show lldp neighbor" before the table engine."""
+    data = {}
+    port: Interface | None = None
+    for line in text_lines:
+        port_name = re.search(r'Port: *\d+/\d+', line)
+        if re.search(r'Port: *\d+/\d+', line):
+            # We have found a line indicating the beginning of some LLDP neighbor information
+            # Extract the local port name from this line and enter it in the data table
+            port = Interface(port_name[0].replace("Port: ", ""))
+            data.update({port: {}})
+        elif "SysName" in line:
+            # This line contains hostname (SysName) information
+            # Grab the SysName. It is the last word on the line.
+            if not port:
+                continue
+            data[port]["LLDP Remote SysName"] = Connection(line.split()[-1].strip())
+        elif "PortId" in line:
+            # This line contains remote port information
+            # Grab the port name. It is the last word in the line.
+            data[port]["LLDP Remote Interface"] = Interface(line.split()[-1].strip())
+            pass
+    return data
+
+
+def get_isis_adjacencies(text_lines: list[str]) -> dict[Interface, dict[str, VOSS.Object]]:
+    """The hand-rolled parser of "show isis adjacencies" before the table engine."""
+    data: dict[Interface, dict] = {}
+    for line in text_lines:
+        port_name = re.search(r'Port\d+/\d+', line)
+        if port_name:
+            # We have found a line indicating some isis adjacency information
+            port = Interface(port_name[0].replace("Port", ""))
+            adj = re.search(r'([\w-]+)', line.split()[-2])[0]
+            status = re.search(r'(\w+)', line.split()[-1])[0]
+            data.update({port: {"ISIS Adjacency": Connection(adj), "ISIS Status": State(status)}})
+    return data
+
+
+def get_port_state(text_lines: list[str]) -> dict[Interface, dict[str, VOSS.Object]]:
+    """The hand-rolled parser of "show interfaces gigabitEthernet" before the table engine."""
+    data = {}
+    pattern = re.compile(r'\d+\/\d+')
+    searching_state = False
+    portmac_pattern = re.compile(r'Port-\d+\/\d+')
+    searching_mac = False
+    mac_pattern = re.compile(r'(?:[0-9a-fA-F](:|\.)?){12}')
+
+    for line in text_lines:
+        if "Port Name" in line: # We found the section we want.
+            searching_state = True
+        elif "Port Config" in line: # We reached the next section. Stop searching.
+            searching_state = False
+        if searching_state:
+            match = pattern.search(line)
+            if match:
+                port_name = match[0]
+                data.update({Interface(port_name):
+                    {
+                        "State": State("Up" if "up" in line else "Down"),
+                        "MAC Addresses": []
+                    }
+                })
+        if "Port Fdb" in line: #Begin searching for MAC Addresses
+            searching_mac = True
+        elif "Brouter Port Ip" in line:
+            searching_mac = False
+        if searching_mac:
+            match = portmac_pattern.search(line)
+            if match:
+                port_name = Interface(match[0].replace("Port-", ""))
+                mac = mac_pattern.search(line)[0]
+                if port_name in data:
+                    data[port_name]["MAC Addresses"].append(mac)
+    # Convert MAC Address lists to MacAddresses objects for comparisons
+    data = {port: {**data[port], "MAC Addresses": MacAddresses(data[port]["MAC Addresses"])} for port in data}
+    return data
+
+
+def get_ip_interfaces(text_lines: list[str]) -> dict[Interface, Network]:
+    """The hand-rolled parser of "show ip interface" before the table engine."""
+    def search_lines() -> tuple[Interface, dict[str, str]]:
+        for line in text_lines:
+            # Check if this line contains IP address information by searching for a valid IP address pattern.
+            matches = re.findall(r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}', line)
+            if matches:
+                # We have found a line containing IP address information.
+                # The first match is the IP address, the second is the subnet mask.
+                # The interface name is the first word on the line.
+                interface_name = line.split()[0]
+                yield Interface(interface_name), Network(matches[0], matches[1])
+    return {iface: net for iface, net in search_lines()}
+
+
+def get_ip_routes(text_lines: list[str]) -> dict[Network, dict[str, Any]]:
+    """The hand-rolled parser of "show ip route" before the table engine."""
+    def search_lines() -> tuple[Network, dict[str, Any]]:
+        for line in text_lines:
+            # Check if this line contains IP address information by searching for a valid IP address pattern.
+            matches = re.findall(r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}', line)
+            if matches:
+                # We have found a line containing IP address information.
+                # The first match is the destination IP address, the second is the subnet mask.
+                # There may or may not be a third match, because the next hop may not be an IP address.
+                network = Network(matches[0], matches[1])
+                hop = matches[2] if len(matches) == 3 else line.split()[2].strip()
+                iface = line.split()[5].strip()
+                iface = Interface(iface) if re.search(r'[a-zA-Z]]', iface) else Interface("Vlan" + iface)
+                yield network, {"Next Hop": Basic(hop), "Outgoing Interface": iface}
+    return {net: data for net, data in search_lines()}
+
+
+LEGACY = {
+    "show lldp neighbor": get_lldp_neighbors,
+    "show isis adjacencies": get_isis_adjacencies,
+    "show interfaces gigabitEthernet": get_port_state,
+    "show ip interface": get_ip_interfaces,
+    "show ip route": get_ip_routes,
+}
+
+
+def timed(parser, lines: list[str], repeat: int) -> tuple[float, Any]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = parser(lines)
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ports", type=int, default=384)
+    parser.add_argument("--macs", type=int, default=20000)
+    parser.add_argument("--routes", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    generator = TechFileGenerator(
+        ports=args.ports, lldp_neighbors=args.ports // 2, isis_neighbors=args.ports // 4,
+        mac_addresses=args.macs, routes=args.routes, filler_lines=0
+    )
+    sections = dict(TechFile.extractor(generator.lines(), LEGACY.keys()))
+    print(f"{'command':<34} {'lines':>7} {'hand-rolled':>14} {'table':>14} {'speedup':>8}")
+    for command, legacy in LEGACY.items():
+        lines = sections[command]
+        old_seconds, old = timed(legacy, lines, args.repeat)
+        new_seconds, new = timed(TechFile._commands[command], lines, args.repeat)
+        assert old == new, f"{command} parses differently"
+        print(
+            f"{command:<34} {len(lines):>7} {len(lines) / old_seconds:>10,.0f} l/s "
+            f"{len(lines) / new_seconds:>10,.0f} l/s {old_seconds / new_seconds:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
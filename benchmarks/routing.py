@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark `RouteTable` construction and longest prefix match lookups on a full table,
+and `diff_routes` between two full tables.
+"""
+import random
+import sys
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "controller" / "voss")]
+
+from model.network_objects import Basic, Network  # noqa: E402
+from model.routing import RouteTable, diff_routes, int_to_address, prefix_mask  # noqa: E402
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--routes", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    parser.add_argument("--changes", type=int, default=10_000, help="routes changed between the diffed tables")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    routes = {}
+    while len(routes) < args.routes:
+        # Prefix lengths are weighted towards /24 like an Internet table.
+        length = rng.choice((16, 20, 22, 23, 24, 24, 24, 24))
+        address = rng.getrandbits(32) & prefix_mask(length)
+        routes[Network(int_to_address(address), int_to_address(prefix_mask(length)))] = {"Next Hop": Basic("10.0.0.1")}
+
+    start = time.perf_counter()
+    table = RouteTable(routes)
+    print(f"built {len(table):,} prefixes in {time.perf_counter() - start:.2f}s")
+
+    addresses = [rng.getrandbits(32) for _ in range(args.lookups)]
+    start = time.perf_counter()
+    for address in addresses:
+        table.lookup(address)
+    elapsed = time.perf_counter() - start
+    print(f"lookup:      {args.lookups / elapsed:>12,.0f} lookups/s")
+    start = time.perf_counter()
+    table.lookup_many(addresses)
+    elapsed = time.perf_counter() - start
+    print(f"lookup_many: {args.lookups / elapsed:>12,.0f} lookups/s")
+
+    # The new table changes the next hop of some routes, removes others and adds as many.
+    new = dict(routes)
+    networks = rng.sample(list(routes), args.changes * 2)
+    for network in networks[:args.changes]:
+        new[network] = {"Next Hop": Basic("10.0.0.2")}
+    for network in networks[args.changes:]:
+        del new[network]
+    while len(new) < len(routes):
+        address = rng.getrandbits(32) & prefix_mask(24)
+        new[Network(int_to_address(address), "255.255.255.0")] = {"Next Hop": Basic("10.0.0.1")}
+    start = time.perf_counter()
+    changes = sum(1 for _ in diff_routes(routes, new))
+    elapsed = time.perf_counter() - start
+    print(f"diff_routes: {len(routes) + len(new):>12,} routes in {elapsed:.2f}s, {changes:,} changes")
+
+
+if __name__ == "__main__":
+    main()
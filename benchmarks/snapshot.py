@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark loading a switch from a snapshot against parsing its tech file again.
+
+A large tech file is parsed and saved as a snapshot. Both are then loaded with nothing of
+the switch left in memory, so that every object is created anew, and a single Type is read
+from the snapshot on its own.
+"""
+import gc
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "controller" / "voss")]
+
+import layer2  # noqa: E402,F401 registers the layer 2 parsers
+import layer3  # noqa: E402,F401 registers the layer 3 parsers
+from benchmarks.generator import TechFileGenerator  # noqa: E402
+from model.network_objects import Interface  # noqa: E402
+from model.snapshot import Snapshot  # noqa: E402
+from voss import VOSS  # noqa: E402
+
+
+def timed(label: str, size: int, load) -> float:
+    gc.collect()
+    start = time.perf_counter()
+    data = load()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} {size / 1e6:>7.1f}MB in {elapsed:6.2f}s")
+    del data
+    return elapsed
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ports", type=int, default=384)
+    parser.add_argument("--mac-addresses", type=int, default=100_000)
+    parser.add_argument("--routes", type=int, default=200_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        tech_file = Path(directory) / "vsp.txt"
+        TechFileGenerator(ports=args.ports, mac_addresses=args.mac_addresses, routes=args.routes).write(tech_file)
+        switch = VOSS.load(tech_file)
+        switch.read()
+        start = time.perf_counter()
+        switch.save(str(Path(directory) / "vsp.snap"))
+        print(f"snapshot written in {time.perf_counter() - start:.2f}s")
+        del switch
+
+        parse = timed("parse tech file", tech_file.stat().st_size, lambda: VOSS.load(tech_file).read())
+        snapshot = Path(directory) / "vsp.snap"
+        load = timed("load snapshot", snapshot.stat().st_size, lambda: VOSS.load(snapshot).read())
+        timed("load snapshot Interface", snapshot.stat().st_size, lambda: Snapshot(snapshot).read(Interface))
+        print(f"loading the snapshot is {parse / load:.1f}x faster than parsing")
+
+
+if __name__ == "__main__":
+    main()
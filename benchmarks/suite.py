@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark the tech file pipeline end to end on synthetic VOSS tech files.
+
+Each stage is timed on its own: extracting the command sections, every registered
+parser on its section, aggregating the parsed results by Type in `VOSS.__iter__`
+and comparing two switches with `Comparison`. Throughput is reported in lines and
+objects per second along with the peak resident memory of the process, and can be
+written as JSON to track regressions between runs.
+"""
+import json
+import resource
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "controller" / "voss")]
+
+from benchmarks.generator import TechFileGenerator  # noqa: E402
+from model.compare import Comparison  # noqa: E402
+from voss import TechFile, VOSS  # noqa: E402
+
+import layer2  # noqa: E402,F401 registers the layer 2 parsers
+import layer3  # noqa: E402,F401 registers the layer 3 parsers
+
+
+def peak_rss() -> int:
+    """
+    :return: the peak resident memory of the process in bytes
+    """
+    # Linux reports kilobytes, macOS reports bytes.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def record(results: list[dict], stage: str, seconds: float, lines: int = 0, objects: int = 0) -> None:
+    results.append({
+        "stage": stage,
+        "seconds": seconds,
+        "lines_per_second": lines / seconds if seconds else 0.0,
+        "objects_per_second": objects / seconds if seconds else 0.0,
+        "peak_rss": peak_rss(),
+    })
+
+
+def run(generator: TechFileGenerator, directory: Path) -> list[dict]:
+    results = []
+    old_path = generator.write(directory / "old.txt")
+    generator.seed += 1
+    new_path = generator.write(directory / "new.txt")
+    with open(old_path) as f:
+        text = f.readlines()
+
+    sections, seconds = timed(lambda: dict(TechFile.extractor(text, TechFile._commands.keys())))
+    record(results, "extractor", seconds, lines=len(text))
+
+    for command, parser in TechFile._commands.items():
+        lines = sections.get(command, [])
+        parsed, seconds = timed(parser, lines)
+        record(results, parser.__name__, seconds, lines=len(lines), objects=len(parsed))
+
+    old = VOSS.load(old_path)
+    data, seconds = timed(old.read)
+    record(results, "VOSS.__iter__", seconds, lines=len(text), objects=sum(len(d) for d in data.values()))
+
+    new = VOSS.load(new_path)
+    new.read()
+    differences, seconds = timed(lambda: dict(Comparison(old, new)))
+    record(results, "Comparison", seconds, objects=sum(len(d) for d in data.values()))
+    return results
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ports", type=int, default=384)
+    parser.add_argument("--lldp-neighbors", type=int, default=48)
+    parser.add_argument("--isis-neighbors", type=int, default=16)
+    parser.add_argument("--mac-addresses", type=int, default=100_000)
+    parser.add_argument("--routes", type=int, default=100_000)
+    parser.add_argument("--filler-lines", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="write the results to a JSON file")
+    args = parser.parse_args()
+
+    generator = TechFileGenerator(
+        ports=args.ports, lldp_neighbors=args.lldp_neighbors, isis_neighbors=args.isis_neighbors,
+        mac_addresses=args.mac_addresses, routes=args.routes, filler_lines=args.filler_lines, seed=args.seed,
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        results = run(generator, Path(directory))
+
+    print(f"{'stage':<28}{'seconds':>10}{'lines/s':>14}{'objects/s':>14}{'peak RSS':>12}")
+    for r in results:
+        print(f"{r['stage']:<28}{r['seconds']:>10.3f}{r['lines_per_second']:>14,.0f}"
+              f"{r['objects_per_second']:>14,.0f}{r['peak_rss'] / 2**20:>10.1f}Mi")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+The collect module gathers the output of the registered commands from live VOSS
+switches over SSH with netmiko, many switches at a time, and hands the output
+straight to a `TechFile` without writing it to disk.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Collection, Iterable, Iterator
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any
+
+from voss import TechFile
+
+
+@dataclass(frozen=True)
+class Device:
+    """
+    A Device describes how to reach a switch. Devices that share a site share that site's concurrency limit.
+    """
+    host: str
+    username: str
+    password: str = field(repr=False)
+    site: str = ""
+    port: int = 22
+    device_type: str = "extreme_vsp"
+
+
+@dataclass
+class Capture:
+    """
+    A Capture is the result of gathering the output of the commands from one Device.
+    The source is None if every attempt failed, in which case the error holds the last failure.
+    """
+    device: Device
+    source: TechFile | None
+    error: Exception | None = None
+    attempts: int = 0
+    seconds: float = 0.0
+
+
+def netmiko_connect(device: Device, timeout: float) -> Any:
+    """
+    Open a netmiko SSH session to a Device.
+
+    :param device: the Device
+    :param timeout: the number of seconds to wait for the connection
+    :return: a netmiko connection
+    """
+    from netmiko import ConnectHandler
+    return ConnectHandler(
+        device_type=device.device_type,
+        host=device.host,
+        port=device.port,
+        username=device.username,
+        password=device.password,
+        conn_timeout=timeout,
+    )
+
+
+class Collector:
+    """
+    A Collector gathers command output from many Devices concurrently on a pool of threads.
+
+    The number of sessions open at once is bounded both overall and per site, so that no
+    site's management network is flooded. When collecting many Devices, a Device is only
+    scheduled once its site has a free slot, so a busy site never holds up the workers.
+    Each Device gets a single session that is reused for every command. A failed attempt
+    closes the session and, after a growing delay, starts again with a new one until the
+    retries are used up.
+    """
+
+    def __init__(
+            self,
+            connect: Callable[[Device, float], Any] = netmiko_connect,
+            workers: int = 32,
+            per_site: int = 4,
+            timeout: float = 30.0,
+            command_timeout: float = 120.0,
+            retries: int = 2,
+            backoff: float = 1.0
+    ):
+        """
+        Create a new Collector.
+
+        :param connect: a function that opens a session to a Device, with netmiko's `send_command` and `disconnect`
+        :param workers: the maximum number of sessions open at once
+        :param per_site: the maximum number of sessions open at once to the Devices of a single site
+        :param timeout: the number of seconds to wait for a session to open
+        :param command_timeout: the number of seconds to wait for the output of a single command
+        :param retries: the number of times to retry a Device after a failed attempt
+        :param backoff: the number of seconds to wait before the first retry, doubled for every retry after it
+        """
+        self.connect = connect
+        self.workers = workers
+        self.per_site = per_site
+        self.timeout = timeout
+        self.command_timeout = command_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._sites: dict[str, threading.Semaphore] = {}
+        self._lock = threading.Lock()
+
+    def _site(self, site: str) -> threading.Semaphore:
+        with self._lock:
+            if site not in self._sites:
+                self._sites[site] = threading.Semaphore(self.per_site)
+            return self._sites[site]
+
+    def _gather(self, device: Device, commands: Collection[str]) -> dict[str, str]:
+        """
+        Open a session to a Device and gather the output of every command over it.
+
+        :param device: the Device
+        :param commands: the commands to run
+        :return: the output of each command
+        """
+        connection = self.connect(device, self.timeout)
+        try:
+            return {
+                command: connection.send_command(command, read_timeout=self.command_timeout)
+                for command in commands
+            }
+        finally:
+            connection.disconnect()
+
+    def collect_one(self, device: Device, commands: Collection[str] = None) -> Capture:
+        """
+        Gather the output of the commands from a single Device, retrying failed attempts.
+
+        :param device: the Device
+        :param commands: the commands to run, defaulting to every command with a registered parser
+        :return: a Capture
+        """
+        commands = list(commands if commands is not None else TechFile._commands)
+        start = time.perf_counter()
+        error = None
+        for attempt in range(1, self.retries + 2):
+            if attempt > 1:
+                time.sleep(self.backoff * 2 ** (attempt - 2))
+            try:
+                # Devices scheduled by `collect` never wait here, but direct callers are bounded per site too.
+                with self._site(device.site):
+                    outputs = self._gather(device, commands)
+            except Exception as e:
+                error = e
+                continue
+            return Capture(device, TechFile.from_outputs(outputs), None, attempt, time.perf_counter() - start)
+        return Capture(device, None, error, self.retries + 1, time.perf_counter() - start)
+
+    def collect(self, devices: Iterable[Device], commands: Collection[str] = None) -> Iterator[Capture]:
+        """
+        Gather the output of the commands from many Devices concurrently.
+        Each Capture is yielded as soon as its Device is finished.
+
+        :param devices: the Devices
+        :param commands: the commands to run, defaulting to every command with a registered parser
+        :return: a Capture for each Device
+        """
+        # A Device is only handed to a worker once its site has a free slot, so that no worker sits
+        # waiting on a busy site while the Devices of other sites wait for a worker.
+        waiting: dict[str, deque[Device]] = {}
+        for device in devices:
+            waiting.setdefault(device.site, deque()).append(device)
+        running = dict.fromkeys(waiting, 0)
+        futures: dict[Future, str] = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                for site, queue in waiting.items():
+                    while queue and running[site] < self.per_site and len(futures) < self.workers:
+                        futures[pool.submit(self.collect_one, queue.popleft(), commands)] = site
+                        running[site] += 1
+                if not futures:
+                    return
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    running[futures.pop(future)] -= 1
+                    yield future.result()
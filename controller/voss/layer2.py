@@ -3,10 +3,38 @@ from __future__ import annotations
 import re
 
 from model.network_objects import Interface, MacAddresses, State, Connection
+from model.table import Column, PORT, Scanner, Table
 from voss import TechFile, VOSS
 
+_WORD = re.compile(r'[\w-]+')
+_ALPHANUMERIC = re.compile(r'\w+')
 
-@TechFile.parser("show lldp neighbor")
+_LLDP_NEIGHBOR = Scanner(
+    Table("port", [Column("port", PORT, Interface, prefix=r'Port: *')], marker="Port:"),
+    Table("sysname", [Column(None, r'SysName.*'), Column("name", convert=Connection)], marker="SysName", trailing=True),
+    Table("portid", [Column(None, r'PortId.*'), Column("port", convert=Interface)], marker="PortId", trailing=True),
+)
+
+_ISIS_ADJACENCIES = Table("adjacency", [
+    Column("port", PORT, Interface, prefix="Port"),
+    # The host and status are the last two fields, with or without other fields before them.
+    Column("host", convert=lambda host: Connection(_WORD.search(host)[0]), prefix=r'(?:.*\s)?'),
+    Column("status", convert=lambda status: State(_ALPHANUMERIC.search(status)[0])),
+], marker="Port", trailing=True)
+
+_PORT_STATE = Scanner(
+    Table("state", [
+        Column("port", PORT, Interface),
+        Column("state", r'.*', lambda rest: State("Up" if "up" in rest else "Down")),
+    ], start="Port Name", end="Port Config", anchored=True),
+    # Each forwarding database row is searched for its MAC address and its port separately, in whatever order they come.
+    Table("fdb", [Column("row", r'.*')], marker="Port-", start="Port Fdb", end="Brouter Port Ip"),
+)
+_MAC = re.compile(r'(?:[0-9a-fA-F][:.]?){12}')
+_FDB_PORT = re.compile(r'Port-(\d+/\d+)')
+
+
+@TechFile.parser("show lldp neighbor", produces=[Interface])
 def get_lldp_neighbors(text_lines: list[str]) -> dict[Interface, dict[str, VOSS.Object]]:
     """
     parse the output of "show lldp neighbor" and create structured data correlating
@@ -17,28 +45,24 @@ def get_lldp_neighbors(text_lines: list[str]) -> dict[Interface, dict[str, VOSS.
     """
     data = {}
     port: Interface | None = None
-    for line in text_lines:
-        port_name = re.search(r'Port: *\d+/\d+', line)
-        if re.search(r'Port: *\d+/\d+', line):
+    for kind, row in _LLDP_NEIGHBOR.scan(text_lines):
+        if kind == "port":
             # We have found a line indicating the beginning of some LLDP neighbor information
-            # Extract the local port name from this line and enter it in the data table
-            port = Interface(port_name[0].replace("Port: ", ""))
+            # Enter the local port name from this line in the data table
+            port, = row
             data.update({port: {}})
-        elif "SysName" in line:
+        elif kind == "sysname":
             # This line contains hostname (SysName) information
-            # Grab the SysName. It is the last word on the line.
             if not port:
                 continue
-            data[port]["LLDP Remote SysName"] = Connection(line.split()[-1].strip())
-        elif "PortId" in line:
+            data[port]["LLDP Remote SysName"], = row
+        elif kind == "portid":
             # This line contains remote port information
-            # Grab the port name. It is the last word in the line.
-            data[port]["LLDP Remote Interface"] = Interface(line.split()[-1].strip())
-            pass
+            data[port]["LLDP Remote Interface"], = row
     return data
 
 
-@TechFile.parser("show isis adjacencies")
+@TechFile.parser("show isis adjacencies", produces=[Interface])
 def get_isis_adjacencies(text_lines: list[str]) -> dict[Interface, dict[str, VOSS.Object]]:
     """
     parse the output of "show isis adjacencies" and create structured data correlating
@@ -47,19 +71,14 @@ def get_isis_adjacencies(text_lines: list[str]) -> dict[Interface, dict[str, VOS
     :param text_lines: the output of "show isis adjacencies" seperated by lines
     :return: a dictionary holding isis neighbor hostnames and adjacency status indexed by port names
     """
-    data: dict[Interface, dict] = {}
-    for line in text_lines:
-        port_name = re.search(r'Port\d+/\d+', line)
-        if port_name:
-            # We have found a line indicating some isis adjacency information
-            port = Interface(port_name[0].replace("Port", ""))
-            adj = re.search(r'([\w-]+)', line.split()[-2])[0]
-            status = re.search(r'(\w+)', line.split()[-1])[0]
-            data.update({port: {"ISIS Adjacency": Connection(adj), "ISIS Status": State(status)}})
-    return data
+    # Each row is a line indicating some isis adjacency information
+    return {
+        port: {"ISIS Adjacency": adjacency, "ISIS Status": status}
+        for port, adjacency, status in _ISIS_ADJACENCIES.rows(text_lines)
+    }
 
 
-@TechFile.parser("show interfaces gigabitEthernet")
+@TechFile.parser("show interfaces gigabitEthernet", produces=[Interface])
 def get_port_state(text_lines: list[str]) -> dict[Interface, dict[str, VOSS.Object]]:
     """
     parse the output of "show interfaces gigabitEthernet" and create a table correlating
@@ -69,38 +88,21 @@ def get_port_state(text_lines: list[str]) -> dict[Interface, dict[str, VOSS.Obje
     :return: a dictionary holding port states indexed by port names
     """
     data = {}
-    pattern = re.compile(r'\d+\/\d+')
-    searching_state = False
-    portmac_pattern = re.compile(r'Port-\d+\/\d+')
-    searching_mac = False
-    mac_pattern = re.compile(r'(?:[0-9a-fA-F](:|\.)?){12}')
-
-    for line in text_lines:
-        if "Port Name" in line: # We found the section we want.
-            searching_state = True
-        elif "Port Config" in line: # We reached the next section. Stop searching.
-            searching_state = False
-        if searching_state:
-            match = pattern.search(line)
-            if match:
-                port_name = match[0]
-                data.update({Interface(port_name):
-                    {
-                        "State": State("Up" if "up" in line else "Down"),
-                        "MAC Addresses": []
-                    }
-                })
-        if "Port Fdb" in line: #Begin searching for MAC Addresses
-            searching_mac = True
-        elif "Brouter Port Ip" in line:
-            searching_mac = False
-        if searching_mac:
-            match = portmac_pattern.search(line)
-            if match:
-                port_name = Interface(match[0].replace("Port-", ""))
-                mac = mac_pattern.search(line)[0]
-                if port_name in data:
-                    data[port_name]["MAC Addresses"].append(mac)
+    # The MAC addresses are gathered by the name of their port, so that each port is only converted once.
+    macs = {}
+    for kind, row in _PORT_STATE.scan(text_lines):
+        if kind == "state":
+            port, state = row
+            data.update({port: {"State": state, "MAC Addresses": []}})
+        else:
+            line, = row
+            mac, port = _MAC.search(line), _FDB_PORT.search(line)
+            if mac and port:
+                macs.setdefault(port[1], []).append(mac[0])
+    for port, addresses in macs.items():
+        port = Interface(port)
+        if port in data:
+            data[port]["MAC Addresses"].extend(addresses)
     # Convert MAC Address lists to MacAddresses objects for comparisons
     data = {port: {**data[port], "MAC Addresses": MacAddresses(data[port]["MAC Addresses"])} for port in data}
     return data
@@ -2,10 +2,28 @@ import re
 from typing import Any
 
 from model.network_objects import Interface, Network, Basic
+from model.table import Column, IPV4, Table
 from voss import TechFile
 
+_ALPHA = re.compile(r'[a-zA-Z]]')
 
-@TechFile.parser("show ip interface")
+_IP_INTERFACES = Table("interface", [
+    Column("interface", convert=Interface),
+    Column("address", IPV4),
+    Column("mask", IPV4),
+], marker=".", anchored=True)
+
+_IP_ROUTES = Table("route", [
+    Column("address", IPV4),
+    Column("mask", IPV4),
+    Column("hop", convert=Basic),
+    Column(None),
+    Column(None),
+    Column("interface", convert=lambda iface: Interface(iface) if _ALPHA.search(iface) else Interface("Vlan" + iface)),
+], marker=".", anchored=True)
+
+
+@TechFile.parser("show ip interface", produces=[Interface])
 def get_ip_interfaces(text_lines: list[str]) -> dict[Interface, Network]:
     """
     parse the output of "show ip interface" and create structured data correlating
@@ -14,20 +32,12 @@ def get_ip_interfaces(text_lines: list[str]) -> dict[Interface, Network]:
     :param text_lines: the output of "show ip interface" seperated by lines
     :return: a dictionary holding ip address and subnet mask indexed by interface names
     """
-    def search_lines() -> tuple[Interface, dict[str, str]]:
-        for line in text_lines:
-            # Check if this line contains IP address information by searching for a valid IP address pattern.
-            matches = re.findall(r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}', line)
-            if matches:
-                # We have found a line containing IP address information.
-                # The first match is the IP address, the second is the subnet mask.
-                # The interface name is the first word on the line.
-                interface_name = line.split()[0]
-                yield Interface(interface_name), Network(matches[0], matches[1])
-    return {iface: net for iface, net in search_lines()}
-
-
-@TechFile.parser("show ip route")
+    # Each row is a line containing IP address information.
+    # The interface name is the first word on the line, followed by the IP address and the subnet mask.
+    return {iface: Network(address, mask) for iface, address, mask in _IP_INTERFACES.rows(text_lines)}
+
+
+@TechFile.parser("show ip route", produces=[Network])
 def get_ip_routes(text_lines: list[str]) -> dict[Network, dict[str, Any]]:
     """
     parse the output of "show ip route" and create structured data correlating
@@ -36,17 +46,10 @@ def get_ip_routes(text_lines: list[str]) -> dict[Network, dict[str, Any]]:
     :param text_lines: the output of "show ip route" seperated by lines
     :return: a dictionary holding next hop and outgoing interface indexed by network address and subnet mask
     """
-    def search_lines() -> tuple[Network, dict[str, Any]]:
-        for line in text_lines:
-            # Check if this line contains IP address information by searching for a valid IP address pattern.
-            matches = re.findall(r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}', line)
-            if matches:
-                # We have found a line containing IP address information.
-                # The first match is the destination IP address, the second is the subnet mask.
-                # There may or may not be a third match, because the next hop may not be an IP address.
-                network = Network(matches[0], matches[1])
-                hop = matches[2] if len(matches) == 3 else line.split()[2].strip()
-                iface = line.split()[5].strip()
-                iface = Interface(iface) if re.search(r'[a-zA-Z]]', iface) else Interface("Vlan" + iface)
-                yield network, {"Next Hop": Basic(hop), "Outgoing Interface": iface}
-    return {net: data for net, data in search_lines()}
+    # Each row is a line containing route information.
+    # The destination IP address and the subnet mask are followed by the next hop, which may
+    # or may not be an IP address, and the outgoing interface is the sixth word on the line.
+    return {
+        Network(address, mask): {"Next Hop": hop, "Outgoing Interface": iface}
+        for address, mask, hop, iface in _IP_ROUTES.rows(text_lines)
+    }
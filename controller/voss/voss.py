@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+import io
 import re
-import json
+import os
+import time
+import importlib
 from pathlib import Path
-from collections.abc import Collection, Iterable
+from collections.abc import Collection, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
 from typing import Any, Type, Callable
 
 from abc import ABC
+from model.cache import ParseCache
+from model.report import ReportWriter
+from model.snapshot import Snapshot, is_snapshot, write_snapshot
 from model.switch import Switch, SourceData
 
 
@@ -17,6 +25,11 @@ class TechFile(SourceData):
     It can be used to extract the output of commands.
     """
 
+    # A single pattern recognises every command header. The bracketed command is captured so that
+    # it can be resolved against the registered commands with a set lookup instead of one regex each.
+    _header = re.compile(r'Command:\[\d+\](?: \[\s*(.*?)\s*\])?')
+    _header_bytes = re.compile(_header.pattern.encode())
+
     @classmethod
     def extractor(cls, text: Iterable[str], command_set: Collection[str]) -> (str, list[str]):
         """
@@ -26,14 +39,14 @@ class TechFile(SourceData):
             :param command_set: the commands to extract output of
             :return: a tuple holding the command and the command output
             """
-
-        def _command_id(_c: str) -> re.Pattern:
-            return re.compile(fr'Command:\[\d+\] \[\s*{_c}\s*\]')
-
+        commands = frozenset(command_set)
+        header = cls._header.search
         current_command = None
         txt = []
         for line in text:
-            if re.search(r"Command:\[\d+\]", line):
+            # The substring test is far cheaper than a regex and rejects almost every line.
+            match = header(line) if "Command:[" in line else None
+            if match:
                 # This line contains a command.
                 if current_command:
                     # We have reached a new command, and we have been gathering output.
@@ -43,15 +56,100 @@ class TechFile(SourceData):
                     current_command = None
                     txt = []
                     yield tmp
-                for cmd in command_set:
-                    if _command_id(cmd).search(line):
-                        # One of the commands we are looking for has been found.
-                        # We can now start gathering the output. We use the state of current_command to signal this.
-                        current_command = cmd
-                        txt = []
+                if match[1] in commands:
+                    # One of the commands we are looking for has been found.
+                    # We can now start gathering the output. We use the state of current_command to signal this.
+                    current_command = match[1]
+                    txt = []
             elif current_command:
                 # We have found a command and are presently gathering output.
                 txt.append(line)
+        if current_command:
+            # The last command in the file is not followed by another header.
+            yield current_command, txt
+
+    @classmethod
+    def from_outputs(cls, outputs: dict[str, str]) -> TechFile:
+        """
+        Create a TechFile from the output of commands gathered by other means, such as a live session.
+        Each output is framed with a command header as it would appear in a tech file.
+
+        :param outputs: the output of each command
+        :return: a TechFile object
+        """
+        instance = cls()
+        instance.data_stream = [
+            line
+            for n, (command, output) in enumerate(outputs.items(), 1)
+            for line in [f"Command:[{n}] [{command}]\n", *io.StringIO(output, newline=None)]
+        ]
+        return instance
+
+    @classmethod
+    def headers(cls, buffer: bytes, command_set: Collection[str]) -> Iterator[tuple[str | None, int, int]]:
+        """
+        scan a VOSS tech file held in a buffer for the command headers
+
+        :param buffer: the content of a VOSS tech file as bytes or a memory map
+        :param command_set: the commands to recognise
+        :return: a tuple holding the command, or None if it is not in the command set,
+            and the start and end byte offsets of the header line
+        """
+        commands = {c.encode(): c for c in command_set}
+        position = buffer.find(b"Command:[")
+        while position != -1:
+            # Header lines are matched in full, exactly as the extractor matches them.
+            line_start = buffer.rfind(b"\n", 0, position) + 1
+            line_end = buffer.find(b"\n", position)
+            line_end = len(buffer) if line_end == -1 else line_end + 1
+            match = cls._header_bytes.search(buffer, line_start, line_end)
+            if match:
+                yield commands.get(match[1]), line_start, line_end
+            position = buffer.find(b"Command:[", line_end)
+
+
+@dataclass
+class WorkerStatistics:
+    """
+    The WorkerStatistics class records the throughput of a single worker process of `VOSS.load_many`.
+    """
+    pid: int
+    files: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+
+def _import_parsers(modules: Collection[str]) -> None:
+    """
+    Import the modules holding the registered parsers so that a freshly spawned worker process
+    has the same parsers as the process that started it.
+
+    :param modules: the names of the modules to import
+    """
+    for module in modules:
+        importlib.import_module(module)
+
+
+def _load_worker(tech_file_path: Path, index: bool, cache: ParseCache | None) -> tuple[Path, dict, int, float, int]:
+    """
+    Load and parse a single tech file in a worker process.
+
+    :return: a tuple holding the path, the parsed results, the worker pid, the parse time and the file size
+    """
+    start = time.perf_counter()
+    switch = VOSS.load(tech_file_path, index=index, cache=cache)
+    # The file is released as soon as it is parsed, rather than when the worker next collects garbage.
+    with switch.tech_file:
+        data = switch.read()
+    return tech_file_path, data, os.getpid(), time.perf_counter() - start, os.path.getsize(tech_file_path)
 
 
 class VOSS(Switch):
@@ -68,41 +166,134 @@ class VOSS(Switch):
         :param tech_file: a TechFile object
         """
         self.tech_file = tech_file
+        # The parsed results are correlated by Type one command at a time, as each command is needed.
+        self._data_store: dict[Type[VOSS.Object], dict[VOSS.Object, Any]] = {}
+        self._merged: set[str] = set()
+        self._complete = False
+        # A switch loaded from a snapshot reads the data of each Type from the snapshot instead.
+        self._snapshot: Snapshot | None = None
 
     @classmethod
-    def load(cls, tech_file_path: Path):
+    def load(cls, tech_file_path: Path, index: bool = False, cache: ParseCache = None, previous: VOSS = None):
         """
         Load a TechFile from a Path and create a new VOSS object.
+        A snapshot written by `save` is loaded instead of a tech file if the path holds one.
+        A snapshot is already parsed and can be read a Type at a time, so `index`, `cache`
+        and `previous` do not apply to it and are ignored.
+
+        :param tech_file_path: the path to the tech file or snapshot
+        :param index: whether to index the tech file for random access to each command
+        :param cache: a cache of parsed command sections to consult before parsing
+        :param previous: an earlier parsed VOSS object of the same switch to reuse unchanged sections from
+        :return: a VOSS object
+        """
+        if is_snapshot(tech_file_path):
+            return cls.load_snapshot(tech_file_path)
+        return cls(TechFile.load(
+            tech_file_path, index=index, cache=cache, previous=previous.tech_file if previous else None
+        ))
+
+    @classmethod
+    def load_snapshot(cls, snapshot_path: Path) -> VOSS:
+        """
+        Open a snapshot and create a new VOSS object from it.
+        The data of each Type is only read from the snapshot when the Type is needed.
 
-        :param tech_file_path: the path to the tech file
+        :param snapshot_path: the path to the snapshot
         :return: a VOSS object
         """
-        return cls(TechFile.load(tech_file_path))
+        switch = cls(TechFile())
+        switch._snapshot = Snapshot(snapshot_path)
+        return switch
+
+    @classmethod
+    def load_many(
+            cls,
+            tech_file_paths: Iterable[Path],
+            workers: int = None,
+            index: bool = False,
+            cache: ParseCache = None,
+            statistics: dict[int, WorkerStatistics] = None,
+            errors: dict[Path, Exception] = None
+    ) -> Iterator[tuple[Path, VOSS]]:
+        """
+        Load and parse many tech files in parallel across a pool of worker processes.
+        The parsed VOSS objects are yielded as soon as each one completes, which is
+        not necessarily the order of the paths given.
+
+        A tech file that fails to load is recorded in `errors` and the others are still loaded.
+        Without `errors` the first failure is raised. Either way, when the loading stops early
+        the tech files not yet started are cancelled rather than parsed.
+
+        :param tech_file_paths: the paths to the tech files
+        :param workers: the number of worker processes, defaulting to the number of CPUs
+        :param index: whether to index each tech file for random access to each command
+        :param cache: a cache of parsed command sections to consult before parsing
+        :param statistics: a dictionary to fill with the throughput of each worker by pid
+        :param errors: a dictionary to fill with the exception of each tech file that fails to load
+        :return: a tuple holding the path and the parsed VOSS object of each tech file
+        """
+        modules = {parser.__module__ for parser in TechFile._commands.values()}
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_import_parsers, initargs=(modules,))
+        try:
+            futures = {pool.submit(_load_worker, path, index, cache): path for path in tech_file_paths}
+            for future in as_completed(futures):
+                try:
+                    path, data, pid, seconds, size = future.result()
+                except Exception as e:
+                    if errors is None:
+                        raise
+                    errors[futures[future]] = e
+                    continue
+                if statistics is not None:
+                    worker = statistics.setdefault(pid, WorkerStatistics(pid))
+                    worker.files += 1
+                    worker.bytes += size
+                    worker.seconds += seconds
+                # The switch is already parsed, so it has no need of the raw tech file.
+                switch = cls(TechFile())
+                switch._data_store = data
+                switch._complete = True
+                yield path, switch
+        finally:
+            pool.shutdown(cancel_futures=True)
 
     def save(self, filename: str) -> None:
         """
-        Save the data in the tech file to a JSON file.
+        Save the data in the tech file to a JSON file,
+        or to a JSON Lines file if the filename has a `.jsonl` suffix,
+        or to a binary snapshot if the filename has a `.snap` suffix.
         This requires the data to be parsed first and
         then translating the named tuples into
         strings so that they can be serialized.
+        Each object is written as soon as it is serialized.
 
         :param filename: the name of the new file
         """
-        serialized = { t.__name__: { str(k): v for k, v in d.items() } for t, d in self }
-        with open(filename, 'w') as f:
-            json.dump(serialized, f, indent=2, default=lambda x: str(x))
+        if Path(filename).suffix == '.snap':
+            write_snapshot(Path(filename), self)
+            return
+        with ReportWriter.open(filename) as writer:
+            for t, d in self:
+                writer.write_type(t, d.items())
 
     def __getitem__(self, t: Type[VOSS.Object]) -> dict[VOSS.Object, Any] | None:
         """
         Get the all the parsed results for a given VOSS.Object Type.
+        Only the commands whose parsers may produce the Type are parsed,
+        every other command is left unparsed until it is needed.
 
         :param t: the Type of the objects to return
         :return: a dictionary of the parsed results
         """
-        for object_type, data in self:
-            if t == object_type:
-                return data
-        return None
+        if self._snapshot is not None:
+            if t not in self._data_store and t in self._snapshot:
+                self._data_store[t] = self._snapshot.read(t)
+        elif not self._complete:
+            commands = [c for c in self.tech_file.producers(t) if c not in self._merged]
+            for command, result in self.tech_file.parse(commands).items():
+                self._merge(command, result)
+        return self._data_store.get(t)
 
     def __iter__(self) -> tuple[Type[VOSS.Object], dict[VOSS.Object, Any]]:
         """
@@ -110,25 +301,41 @@ class VOSS(Switch):
         the parsed results for each Type.
         """
         # If we have iterated before we can yield from the data we have already parsed.
-        if not self._data_store:
-            tmp = {}
+        if self._snapshot is not None and not self._complete:
+            for t in self._snapshot.types():
+                if t not in self._data_store:
+                    self._data_store[t] = self._snapshot.read(t)
+            self._complete = True
+        if not self._complete:
             # We need to parse all the results in the tech file in order to correlate all results of the same type and object.
             for command, result in self.tech_file:
-                for network_object, data in result.items():
-                    # We need to make sure that we have a dictionary for each type.
-                    tmp[type(network_object)] = tmp.get(type(network_object), {})
-                    # We need to make sure that we have a dictionary for each object.
-                    tmp[type(network_object)][network_object] = tmp[type(network_object)].get(network_object, {})
-                    # We now update the tmp dictionary with the new data.
-                    # However, because the result of the parsing function is a dictionary
-                    # of Any. We need to make sure the Any can be entered into the dictionary.
-                    d = data if isinstance(data, dict) else { type(data).__name__: data }
-                    tmp[type(network_object)][network_object].update(d)
-            # Now that we have all the data, we can yield it through recursion.
-            self._data_store = tmp
+                self._merge(command, result)
+            self._complete = True
         for t, d in self._data_store.items():
             yield t, d
 
+    def _merge(self, command: str, result: dict[VOSS.Object, Any]) -> None:
+        """
+        Correlate the parsed results of a command with the results of the same type and object.
+
+        :param command: the command
+        :param result: the parsed results of the command
+        """
+        if command in self._merged:
+            return
+        self._merged.add(command)
+        tmp = self._data_store
+        for network_object, data in result.items():
+            # We need to make sure that we have a dictionary for each type.
+            tmp[type(network_object)] = tmp.get(type(network_object), {})
+            # We need to make sure that we have a dictionary for each object.
+            tmp[type(network_object)][network_object] = tmp[type(network_object)].get(network_object, {})
+            # We now update the tmp dictionary with the new data.
+            # However, because the result of the parsing function is a dictionary
+            # of Any. We need to make sure the Any can be entered into the dictionary.
+            d = data if isinstance(data, dict) else { type(data).__name__: data }
+            tmp[type(network_object)][network_object].update(d)
+
     def __contains__(self, t: Type[VOSS.Object]) -> bool:
         """
         Check if the tech file contains data for a given VOSS.Object Type.
@@ -138,6 +345,33 @@ class VOSS(Switch):
         """
         return self[t] is not None
 
+    def types(self) -> list[Type[VOSS.Object]] | None:
+        """
+        List the Types the parsers of the tech file declare they produce,
+        or the Types held by the snapshot the switch was loaded from.
+
+        :return: the Types, or None if a parser does not declare the Types it produces
+        """
+        if self._snapshot is not None:
+            return self._snapshot.types()
+        produces = self.tech_file._produces.values()
+        if any(p is None for p in produces):
+            return None
+        return list(dict.fromkeys(t for p in produces for t in p))
+
+    def section_digests(self, t: Type[VOSS.Object]) -> dict[str, str | None] | None:
+        """
+        Hash the sections of the commands that may produce a Type, without parsing them.
+
+        :param t: the Type
+        :return: the hash of each command's section, None for a command not in the tech file,
+            or None if the tech file holds no raw data
+        """
+        if not self.tech_file.has_raw_data:
+            return None
+        digests = self.tech_file.hash_sections()
+        return {command: digests.get(command) for command in self.tech_file.producers(t)}
+
     def read(self) -> dict[Type[VOSS.Object], dict[VOSS.Object, Any]]:
         """
         Read the tech file and return all the parsed results.
@@ -0,0 +1,119 @@
+"""
+The cache module holds a persistent on-disk cache of parsed command output.
+
+Tech files never change once they have been collected, so the parsed result of a
+command section can be reused by every later run that encounters the same section.
+"""
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+from model import codec
+from model.switch import Switch, SourceData
+
+
+class ParseCache:
+    """
+    A ParseCache stores the parsed output of command sections in a directory.
+
+    Each entry is keyed by `SourceData.digest`, a hash of the command, the version of
+    its parser and the content of its section, so a changed parser or a changed section never reuses a
+    stale result. The total size of the directory is bounded, and the least recently
+    used entries are evicted once the bound is exceeded.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int = 1 << 30):
+        """
+        Create a new ParseCache.
+
+        :param directory: the directory to hold the cache entries, created if it does not exist
+        :param max_bytes: the maximum total size of the cache entries
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._size: int | None = None
+
+    # Entries are keyed by the hash every SourceData computes for its command sections.
+    key = staticmethod(SourceData.digest)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> dict[Switch.Object, Any] | None:
+        """
+        Return the cached parsed output for a key and mark it as recently used.
+
+        :param key: the cache key
+        :return: the parsed output, or None if the key is not cached
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'r') as f:
+                value = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        # The modification time doubles as the last use time for eviction.
+        os.utime(path)
+        return codec.decode(value)
+
+    def put(self, key: str, value: dict[Switch.Object, Any]) -> None:
+        """
+        Store the parsed output for a key, evicting old entries if the cache is full.
+
+        :param key: the cache key
+        :param value: the parsed output
+        """
+        if self._size is None:
+            self._size = self.size()
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        try:
+            # An entry replaced by the new one no longer counts towards the size.
+            self._size -= path.stat().st_size
+        except FileNotFoundError:
+            pass
+        # Write to a temporary file first so that concurrent readers never see a partial entry.
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, 'w') as f:
+            json.dump(codec.encode(value), f, separators=(',', ':'))
+        os.replace(tmp, path)
+        self._size += path.stat().st_size
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def size(self) -> int:
+        """
+        Return the total size of the cache entries.
+
+        :return: the size in bytes
+        """
+        return sum(path.stat().st_size for path in self.directory.glob("*/*.json"))
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries until the cache fits within its bound.
+        """
+        entries = sorted(
+            ((stat.st_mtime_ns, stat.st_size, path) for path in self.directory.glob("*/*.json")
+             for stat in (path.stat(),)),
+            key=lambda e: e[0]
+        )
+        size = sum(e[1] for e in entries)
+        for _, entry_size, path in entries:
+            if size <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            size -= entry_size
+        self._size = size
+
+    def clear(self) -> None:
+        """
+        Remove every entry from the cache.
+        """
+        for path in self.directory.glob("*/*.json"):
+            path.unlink(missing_ok=True)
+        self._size = 0
@@ -0,0 +1,74 @@
+"""
+The codec module translates parsed results to and from JSON compatible values.
+
+Parsed results are dictionaries keyed by `Switch.Object` instances, which JSON
+cannot represent directly. Objects are encoded as dictionaries tagged with their
+type name, and dictionaries with non-string keys are encoded as lists of pairs,
+so that decoding restores the original typed keys and values.
+"""
+from __future__ import annotations
+
+from array import array
+from dataclasses import fields
+from typing import Any, Type
+
+from model.switch import Switch
+
+TYPE_TAG = "__type__"
+ITEMS_TAG = "__items__"
+
+
+def object_types() -> dict[str, Type[Switch.Object]]:
+    """
+    Find every concrete Switch.Object Type by name, including subclasses of subclasses.
+
+    :return: a dictionary of Switch.Object Types indexed by their names
+    """
+    types = {}
+    pending = list(Switch.Object.__subclasses__())
+    while pending:
+        t = pending.pop()
+        types[t.__name__] = t
+        pending.extend(t.__subclasses__())
+    return types
+
+
+def encode(value: Any) -> Any:
+    """
+    Encode a parsed value as a JSON compatible value.
+
+    :param value: a parsed value, which may be a Switch.Object or a container of them
+    :return: the JSON compatible value
+    """
+    if isinstance(value, Switch.Object):
+        return {TYPE_TAG: type(value).__name__, **{f.name: encode(getattr(value, f.name)) for f in fields(value)}}
+    if isinstance(value, dict):
+        if all(isinstance(k, str) for k in value):
+            return {k: encode(v) for k, v in value.items()}
+        return {ITEMS_TAG: [[encode(k), encode(v)] for k, v in value.items()]}
+    if isinstance(value, (list, tuple)):
+        return [encode(v) for v in value]
+    if isinstance(value, array):
+        return value.tolist()
+    return value
+
+
+def decode(value: Any, types: dict[str, Type[Switch.Object]] = None) -> Any:
+    """
+    Decode a JSON compatible value produced by `encode`.
+
+    :param value: the JSON compatible value
+    :param types: the Switch.Object Types indexed by name, found automatically if not given
+    :return: the parsed value
+    """
+    types = types if types is not None else object_types()
+    if isinstance(value, dict):
+        if TYPE_TAG in value:
+            t = types[value[TYPE_TAG]]
+            return t(**{k: decode(v, types) for k, v in value.items() if k != TYPE_TAG})
+        if ITEMS_TAG in value:
+            return {decode(k, types): decode(v, types) for k, v in value[ITEMS_TAG]}
+        return {k: decode(v, types) for k, v in value.items()}
+    if isinstance(value, list):
+        return [decode(v, types) for v in value]
+    return value
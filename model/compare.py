@@ -1,13 +1,14 @@
 from __future__ import annotations
 
-from collections.abc import Container, Iterable
+from collections.abc import Collection, Container, Iterable, Iterator
 from typing import Type, Any, Generic, TypeVar
 from dataclasses import dataclass
 from pathlib import Path
 
-import json
-from yaml import FullLoader, load
-
+from model.mapping import Resolver, load_mapping
+from model.network_objects import Network
+from model.report import ReportWriter
+from model.routing import RouteChange, diff_routes
 from model.switch import Switch
 
 P = TypeVar('P', bound=Switch.Object.__subclasses__())
@@ -35,61 +36,59 @@ class Comparison:
         def __eq__(self, other: Switch.Object) -> bool:
             return self.old == other
 
-    def __init__(self, old: Switch, new: Switch, mapping: dict[Type, list[Pair]] = None):
+    def __init__(
+            self, old: Switch, new: Switch, mapping: dict[Type, list[Pair] | Resolver] = None,
+            types: Collection[Type[Switch.Object]] = None, skip_unchanged: bool = False
+    ):
         """
         Create a new Comparison object for comparing two Switch objects.
+        When given Types, only those Types are compared, and a Switch that parses
+        lazily only parses the commands producing them.
+
+        When told to skip unchanged Types, a Type whose raw data hashes equal in both Switch
+        objects is neither parsed nor compared, since it cannot differ, and is recorded in `skipped`
+        with the commands whose sections were found equal. A Type with a mapping is always compared.
+        The differences of a skipped Type are an empty dictionary, rather than an empty dictionary
+        of differences for each of its objects, since its objects are never parsed.
 
         :param old: the old object
         :param new: the new object
-        :param mapping: a mapping by type of the keys between the two objects
+        :param mapping: a mapping by type of the keys between the two objects, as pairs or a Resolver
+        :param types: the Types to compare, every Type of the old object if not given
+        :param skip_unchanged: whether to skip the Types whose raw data hashes equal
         """
         self.mapping = mapping if mapping else {}
         self.old = old
         self.new = new
+        self.types = types
+        self.skip_unchanged = skip_unchanged
+        self.skipped: dict[Type[Switch.Object], list[str]] = {}
 
     @classmethod
-    def load(cls, *args, mapping_file_path: Path):
+    def load(cls, *args, mapping_file_path: Path, **kwargs):
         """
         Load a mapping file and return a Comparison object.
         The mapping file can be a JSON or YAML file.
-        It should be a dictionary of type keys to a sub-dictionary of old keys to new keys.
+        It should be a dictionary of type keys to a list of pairs of old and new keys,
+        ranges of old and new keys, or regular expression substitutions, see `model.mapping`.
 
         :param mapping_file_path: the path to the mapping file
         :return: a Comparison object
         """
-        m = None
-        if mapping_file_path:
-            with open(mapping_file_path, 'r') as f:
-                if mapping_file_path.suffix == '.json':
-                    mapping = json.load(f)
-                elif mapping_file_path.suffix in ('.yaml', '.yml'):
-                    mapping = load(f, Loader=FullLoader)
-                else:
-                    raise ValueError('The mapping file must be a JSON or YAML file.')
-            # We now have a dictionary of strings to a list of dictionaries of strings to strings. We need to convert the
-            # root keys strings to BaseTypes and the values strings to Pairs of those type instances.
-            # We use the subclasses of Switch.Object as the keys because we want to be able to use the subclasses
-            # as the keys in the Pairs.
-            subclasses = {t.__name__: t for t in Switch.Object.__subclasses__()}
-            m = {
-                subclasses[type_name]:
-                    [Comparison.Pair(
-                        subclasses[type_name](pair['before']),
-                        subclasses[type_name](pair['after'])
-                    ) for pair in pairs]
-                for type_name, pairs in mapping.items()
-            }
-        return cls(*args, mapping=m)
+        m = load_mapping(mapping_file_path) if mapping_file_path else None
+        return cls(*args, mapping=m, **kwargs)
 
     def save(self, file_path: Path):
         """
-        Save the Comparison object to a JSON file.
+        Save the Comparison object to a JSON file, or to a JSON Lines file if the path has a `.jsonl` suffix.
+        Each object's differences are written as soon as they are found.
 
         :param file_path: the path to the file
         """
-        serialized = {t.__name__: {str(k): v for k, v in d.items() if v} for t, d in self}
-        with open(file_path, 'w') as f:
-            json.dump(serialized, f, default=lambda o: str(o), indent=2)
+        with ReportWriter.open(file_path) as writer:
+            for t, old_data in self._old_types():
+                differences = () if old_data is None else self.differences(t, old_data)
+                writer.write_type(t, ((k, v) for k, v in differences if v))
 
     def __getitem__(self, item: Type[Switch.Object]) -> dict[Switch.Object, Any]:
         """
@@ -98,7 +97,12 @@ class Comparison:
         :param item: the Type
         :return: a dictionary of differences by object of that Type
         """
-        return dict(self)[item]
+        if self._unchanged(item):
+            return {}
+        old_data = self.old[item]
+        if old_data is None:
+            raise KeyError(item)
+        return dict(self.differences(item, old_data))
 
     def __iter__(self) -> tuple[Type[Switch.Object], dict[Switch.Object, Any]]:
         """
@@ -107,38 +111,156 @@ class Comparison:
 
         :return: a tuple of the Type and a dictionary of the differences by object of that Type
         """
-        for t, old_data in self.old:
-            if t not in self.new:
-                raise ValueError(f'The new object does not have a {t.__name__} Type.')
-            new_data = self.new[t]
-            # We now have the old and new data for a given Type.
-            # We need to compare the values of the objects in new and old.
-            mapping = self.mapping.get(t, [])
-            tmp = {}
-            for old_object, old_values in old_data.items():
-                # Now we need to find corresponding new values for the old values.
-                if old_object not in mapping:
-                    # We don't have a mapping for this object, so we assume the keying objects are the same for now.
-                    new_object = old_object
-                else:
-                    # We have a mapping for this object. We need to find the new object that matches the mapping.
-                    new_object = next(pair.new for pair in mapping if pair.old == old_object)
-                    # If no new object matches the mapping, we throw a MappingError.
-                    if new_object is None:
-                        raise MappingError(f'The new {t.__name__} data has no object with the key {mapping[old_object].new}.')
-                # If the object is not in the new data this could be for a number of reasons, but we will assume
-                # that it is because the two switches have different objects of this type. That isn't an error, we
-                # just don't want to compare it.
-                if new_object not in new_data:
-                    continue
-                new_values = new_data[new_object]
-                # We now have two corresponding old and new values for this object.
-                # We need to compare them using a comparison generator capable of recursion.
-                differences = { field: diff for field, diff in Comparison.compare(old_values, new_values) if diff }
-                differences.update({ "old": old_object } if differences else {})
-                tmp[new_object] = differences
-            # We now have a dictionary of differences for this Type.
-            yield t, tmp
+        for t, old_data in self._old_types():
+            yield t, {} if old_data is None else dict(self.differences(t, old_data))
+
+    def _old_types(self) -> Iterator[tuple[Type[Switch.Object], dict[Switch.Object, Any] | None]]:
+        """
+        Iterate over the Types to compare and the older Switch object's data of each Type,
+        which is None for a Type skipped because it is unchanged.
+        """
+        types = self.types
+        if types is None and self.skip_unchanged:
+            # Knowing the Types without parsing lets the unchanged Types go unparsed.
+            types = self.old.types()
+        if types is None:
+            for t, old_data in self.old:
+                yield t, None if self._unchanged(t) else old_data
+            return
+        for t in types:
+            if self._unchanged(t):
+                yield t, None
+                continue
+            old_data = self.old[t]
+            if old_data is not None:
+                yield t, old_data
+
+    def _unchanged(self, t: Type[Switch.Object]) -> bool:
+        """
+        Check whether the raw data of a Type hashes equal in both Switch objects, recording it as skipped if so.
+
+        :param t: the Type
+        :return: True if the Type cannot differ, False if it has to be compared
+        """
+        if t in self.skipped:
+            return True
+        if not self.skip_unchanged or self.mapping.get(t):
+            return False
+        old_digests = self.old.section_digests(t)
+        if old_digests is None or not any(old_digests.values()) or old_digests != self.new.section_digests(t):
+            return False
+        self.skipped[t] = [command for command, digest in old_digests.items() if digest]
+        return True
+
+    def any_difference(self) -> bool:
+        """
+        Check whether any object of the Types to compare differs, stopping at the first difference
+        found and without describing it.
+
+        :return: True if there is a difference, False otherwise
+        """
+        for t, old_data in self._old_types():
+            for _, _, old_values, new_values in self._pairs(t, old_data) if old_data is not None else ():
+                if Comparison.differs(old_values, new_values):
+                    return True
+        return False
+
+    def summary(self) -> dict[Type[Switch.Object], int]:
+        """
+        Count the objects with differences for each Type to compare, without describing the differences.
+
+        :return: the number of objects with differences by Type
+        """
+        return {
+            t: 0 if old_data is None else sum(1 for _, _, old_values, new_values in self._pairs(t, old_data)
+                                              if Comparison.differs(old_values, new_values))
+            for t, old_data in self._old_types()
+        }
+
+    def routes(self) -> Iterator[RouteChange]:
+        """
+        Compare the routes of the old and new Switch objects by prefix rather than key by key,
+        reporting added, removed and changed routes and routes aggregated or deaggregated.
+        Mappings do not apply to routes.
+
+        :return: the RouteChanges, as they are found
+        """
+        old_routes, new_routes = self.old[Network], self.new[Network]
+        if old_routes is None or new_routes is None:
+            raise ValueError('Both objects must have a Network Type to compare their routes.')
+        return diff_routes(old_routes, new_routes)
+
+    def differences(self, t: Type[Switch.Object], old_data: dict[Switch.Object, Any]) -> Iterator[tuple[Switch.Object, dict[str, Any]]]:
+        """
+        Compare the old data of a given Type with the new Switch object's data of that Type,
+        yielding the differences of each object as they are found.
+
+        :param t: the Type
+        :param old_data: the old Switch object's data of that Type
+        :return: a tuple of the new object and a dictionary of its differences
+        """
+        for old_object, new_object, old_values, new_values in self._pairs(t, old_data):
+            # We now have two corresponding old and new values for this object.
+            # We need to compare them using a comparison generator capable of recursion.
+            differences = { field: diff for field, diff in Comparison.compare(old_values, new_values) if diff }
+            differences.update({ "old": old_object } if differences else {})
+            yield new_object, differences
+
+    def _pairs(
+            self, t: Type[Switch.Object], old_data: dict[Switch.Object, Any]
+    ) -> Iterator[tuple[Switch.Object, Switch.Object, Any, Any]]:
+        """
+        Pair the old data of a given Type with the new Switch object's data of that Type.
+
+        :param t: the Type
+        :param old_data: the old Switch object's data of that Type
+        :return: a tuple of the old object, the new object, and their values
+        """
+        new_data = self.new[t]
+        if new_data is None:
+            raise ValueError(f'The new object does not have a {t.__name__} Type.')
+        # We now have the old and new data for a given Type.
+        # We need to compare the values of the objects in new and old.
+        # The mapping pairs are indexed by their old object so that each object is resolved with a single lookup.
+        mapping = self.mapping.get(t, [])
+        if not isinstance(mapping, Resolver):
+            mapping = {pair.old: pair.new for pair in mapping}
+        for old_object, old_values in old_data.items():
+            # Now we need to find corresponding new values for the old values.
+            # If we don't have a mapping for this object, we assume the keying objects are the same.
+            new_object = mapping.get(old_object, old_object)
+            # If the object is not in the new data this could be for a number of reasons, but we will assume
+            # that it is because the two switches have different objects of this type. That isn't an error, we
+            # just don't want to compare it.
+            if new_object not in new_data:
+                continue
+            yield old_object, new_object, old_values, new_data[new_object]
+
+    @staticmethod
+    def differs(old_values: dict[str, Switch.Object], new_values: dict[str, Switch.Object]) -> bool:
+        """
+        Check whether `compare` would find a difference between two value dictionaries,
+        stopping at the first difference.
+
+        :param old_values: the old values in a dictionary
+        :param new_values: the new values in a dictionary
+        :return: True if the values differ, False otherwise
+        """
+        if old_values.keys() != new_values.keys():
+            # A field exists in only one of old and new.
+            return True
+        for field_name, old_field_value in old_values.items():
+            new_field_value = new_values[field_name]
+            if old_field_value is new_field_value:
+                continue
+            if type(old_field_value) != type(new_field_value):
+                raise TypeError(f'Field {field_name} has different types in old and new.')
+            if isinstance(old_field_value, dict):
+                if Comparison.differs(old_field_value, new_field_value):
+                    return True
+            elif old_field_value != new_field_value:
+                return True
+        return False
 
     @staticmethod
     def compare(old_values: dict[str, Switch.Object], new_values: dict[str, Switch.Object]) -> tuple[str, dict[str, Any]]:
@@ -149,31 +271,31 @@ class Comparison:
         :param new_values: the new values in a dictionary
         :return: a tuple of the field_name and a dictionary describing the difference if there is one
         """
-        for old_field_name, old_field_value in old_values.items():
-            if old_field_name not in new_values:
+        for field_name, old_field_value in old_values.items():
+            if field_name not in new_values:
                 # Field exists in old but not new.
-                yield old_field_name, {"old": old_field_value, "new": None}
+                yield field_name, {"old": old_field_value, "new": None}
                 continue
-            for new_field_name, new_field_value in new_values.items():
-                if new_field_name not in old_values:
-                    # Field exists in new but not in old.
-                    yield new_field_name, {"old": None, "new": new_field_value}
-                    continue
-                if old_field_name == new_field_name:
-                    # Field exists in both old and new, compare values.
-                    if type(old_field_value) != type(new_field_value):
-                        raise TypeError(f'Field {old_field_name} has different types in old and new.')
-                    if isinstance(old_field_value, dict):
-                        # If the value is another dictionary, we need to recurse.
-                        new_field_value: dict
-                        yield old_field_name, { k: v for k, v in Comparison.compare(old_field_value, new_field_value) }
-                    diff = old_field_value != new_field_value
-                    if diff:
-                        # Finally, if the values are different, yield the difference.
-                        yield old_field_name, diff
-                    # If the two are the same, we don't need to do anything. We just move on to the next field.
-
-
-
-
-
+            # Field exists in both old and new, compare values.
+            new_field_value = new_values[field_name]
+            if old_field_value is new_field_value:
+                # The same object cannot differ from itself.
+                continue
+            if type(old_field_value) != type(new_field_value):
+                raise TypeError(f'Field {field_name} has different types in old and new.')
+            if isinstance(old_field_value, dict):
+                # If the value is another dictionary, we need to recurse.
+                yield field_name, { k: v for k, v in Comparison.compare(old_field_value, new_field_value) if v }
+                continue
+            diff = old_field_value != new_field_value
+            if diff is True:
+                # Values that are not Switch Objects only report that they differ, so we describe the difference.
+                diff = {"old": old_field_value, "new": new_field_value}
+            if diff:
+                # Finally, if the values are different, yield the difference.
+                yield field_name, diff
+            # If the two are the same, we don't need to do anything. We just move on to the next field.
+        for field_name, new_field_value in new_values.items():
+            if field_name not in old_values:
+                # Field exists in new but not in old.
+                yield field_name, {"old": None, "new": new_field_value}
@@ -0,0 +1,172 @@
+"""
+The compression module reads tech files that are stored compressed with gzip, bzip2
+or xz, streaming them through the decompressor instead of decompressing to disk first.
+"""
+from __future__ import annotations
+
+import bz2
+import gzip
+import io
+import lzma
+import zlib
+from bisect import bisect_right
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, TextIO
+
+# Tech files are read in large blocks, they are typically hundreds of megabytes.
+READ_SIZE = 1 << 20
+# Compressed input is fed to a decompressor in blocks of this size when indexing.
+# A resumed read discards at most the output of one block before the section it wants.
+CHUNK_SIZE = 1 << 16
+
+_MAGIC: dict[str, bytes] = {
+    "gzip": b"\x1f\x8b",
+    "bzip2": b"BZh",
+    "xz": b"\xfd7zXZ\x00",
+}
+
+_OPENERS: dict[str, Callable[..., BinaryIO]] = {
+    "gzip": gzip.open,
+    "bzip2": bz2.open,
+    "xz": lzma.open,
+}
+
+# The compression methods whose decompressors cannot save their state, so that a CompressedBuffer
+# would have to decompress from the start of the file for every slice.
+UNRESUMABLE = frozenset({"bzip2", "xz"})
+
+_DECOMPRESSORS: dict[str, Callable[[], Any]] = {
+    "gzip": lambda: zlib.decompressobj(wbits=zlib.MAX_WBITS | 16),
+    "bzip2": bz2.BZ2Decompressor,
+    "xz": lzma.LZMADecompressor,
+}
+
+
+def detect(file_path: Path) -> str | None:
+    """
+    Detect the compression of a file from its leading bytes.
+
+    :param file_path: the path to the file
+    :return: the name of the compression method, or None if the file is not compressed
+    """
+    with open(file_path, 'rb') as f:
+        head = f.read(6)
+    return next((method for method, magic in _MAGIC.items() if head.startswith(magic)), None)
+
+
+def open_text(file_path: Path) -> TextIO:
+    """
+    Open a possibly compressed file for reading lines of text with a large read buffer.
+
+    :param file_path: the path to the file
+    :return: a text stream of the decompressed content
+    """
+    method = detect(file_path)
+    if method is None:
+        return open(file_path, 'r', buffering=READ_SIZE)
+    return io.TextIOWrapper(io.BufferedReader(_OPENERS[method](file_path, 'rb'), buffer_size=READ_SIZE))
+
+
+class CompressedBuffer:
+    """
+    A CompressedBuffer gives random access by decompressed byte offset to a compressed file.
+
+    The file is decompressed once from the start with `windows`, which yields the content
+    in blocks that end on a line boundary. Offsets of interest found in those blocks are
+    recorded with `checkpoint`, which saves the state of the decompressor at the start of
+    the block. Slicing the buffer later resumes decompression from the nearest checkpoint
+    instead of from the start of the file.
+
+    Only gzip decompressors can save their state. Slices of bzip2 and xz files would be read
+    by decompressing from the start of the file, so a SourceData streams those files instead.
+    """
+
+    def __init__(self, file_path: Path, method: str):
+        """
+        Create a new CompressedBuffer.
+
+        :param file_path: the path to the compressed file
+        :param method: the name of the compression method
+        """
+        self.file_path = file_path
+        self.method = method
+        self._file: BinaryIO = open(file_path, 'rb')
+        self._length = 0
+        # Each checkpoint is the decompressed offset, the compressed offset and the decompressor state.
+        self._checkpoints: list[tuple[int, int, Any]] = [(0, 0, None)]
+        self._current: tuple[int, int, Any] = self._checkpoints[0]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _inflate(self, offset: int, compressed_offset: int, decompressor: Any) -> Iterator[bytes]:
+        """
+        Decompress the file from a compressed offset, recording the state before each block.
+
+        :param offset: the decompressed offset the compressed offset corresponds to
+        :param compressed_offset: the compressed offset to start from
+        :param decompressor: the decompressor state at that offset, or None to start a new one
+        :return: the blocks of decompressed content
+        """
+        decompressor = decompressor.copy() if decompressor else _DECOMPRESSORS[self.method]()
+        self._file.seek(compressed_offset)
+        while True:
+            copy = getattr(decompressor, "copy", None)
+            self._current = (offset, compressed_offset, copy() if copy else None)
+            data = self._file.read(CHUNK_SIZE)
+            if not data:
+                return
+            compressed_offset += len(data)
+            output = b''
+            while data:
+                # A file may hold several concatenated streams, each needing a new decompressor.
+                if decompressor.eof:
+                    decompressor = _DECOMPRESSORS[self.method]()
+                output += decompressor.decompress(data)
+                data = decompressor.unused_data if decompressor.eof else b''
+            offset += len(output)
+            yield output
+
+    def windows(self) -> Iterator[tuple[int, bytes]]:
+        """
+        Decompress the whole file, yielding blocks of complete lines.
+
+        :return: a tuple holding the decompressed offset of a block and the block
+        """
+        carry = b''
+        base = 0
+        for output in self._inflate(0, 0, None):
+            block = carry + output
+            end = block.rfind(b"\n") + 1
+            if end:
+                yield base, block[:end]
+                base += end
+            carry = block[end:]
+        if carry:
+            yield base, carry
+        self._length = base + len(carry)
+
+    def checkpoint(self, offset: int) -> None:
+        """
+        Record a checkpoint for resuming decompression at an offset in the block last yielded by `windows`.
+
+        :param offset: the decompressed offset that will be read from later
+        """
+        if self._current[2] is not None and self._current[0] <= offset and self._current != self._checkpoints[-1]:
+            self._checkpoints.append(self._current)
+
+    def __getitem__(self, item: slice) -> bytes:
+        start, stop = item.start or 0, len(self) if item.stop is None else item.stop
+        offset, compressed_offset, state = self._checkpoints[
+            bisect_right(self._checkpoints, start, key=lambda c: c[0]) - 1
+        ]
+        data = bytearray()
+        for output in self._inflate(offset, compressed_offset, state):
+            data += output
+            if offset + len(data) >= stop:
+                break
+        return bytes(data[start - offset:stop - offset])
+
+    def close(self) -> None:
+        self._file.close()
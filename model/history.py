@@ -0,0 +1,285 @@
+"""
+The history module keeps the collections of a single switch over time, storing a full
+snapshot of the switch every so often and only what changed from one collection to the
+next in between, so that a year of daily collections costs little more than its changes.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+from collections.abc import Collection, Iterator
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Type
+
+from model import codec
+from model.compare import Comparison
+from model.snapshot import Snapshot, write_snapshot
+from model.switch import Switch
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS collections (
+    id INTEGER PRIMARY KEY,
+    collected TEXT NOT NULL UNIQUE,
+    keyframe TEXT
+);
+CREATE TABLE IF NOT EXISTS changes (
+    collection INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    key TEXT NOT NULL,
+    attribute TEXT,
+    old TEXT,
+    new TEXT
+);
+CREATE INDEX IF NOT EXISTS changes_by_collection ON changes (collection);
+CREATE INDEX IF NOT EXISTS changes_by_object ON changes (type, key, attribute, collection);
+"""
+
+_MISSING = object()
+
+
+def _dumps(value: Any) -> str | None:
+    return None if value is _MISSING else json.dumps(codec.encode(value), separators=(",", ":"))
+
+
+def _timestamp(collected: date | str) -> str:
+    # Dates and datetimes are stored in ISO 8601 form, which sorts in time order.
+    return collected.isoformat() if isinstance(collected, date) else str(collected)
+
+
+def _differs(old: Any, new: Any) -> bool:
+    if old is new:
+        return False
+    if type(old) is not type(new):
+        return True
+    if isinstance(old, dict):
+        try:
+            return Comparison.differs(old, new)
+        except TypeError:
+            # An attribute holding values of different types differs.
+            return True
+    return bool(old != new)
+
+
+def _copy(value: Any) -> Any:
+    # The containers of the parsed data are copied all the way down, while the objects and scalars
+    # they hold are immutable and shared, which is far cheaper than a deepcopy of the objects too.
+    if isinstance(value, dict):
+        return {k: _copy(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy(v) for v in value]
+    if isinstance(value, tuple) and type(value) is tuple:
+        return tuple(_copy(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return type(value)(_copy(v) for v in value)
+    return value
+
+
+def delta(
+        old: dict[Type[Switch.Object], dict[Switch.Object, Any]], new: dict[Type[Switch.Object], dict[Switch.Object, Any]]
+) -> Iterator[tuple[Type[Switch.Object], Switch.Object, str | None, Any, Any]]:
+    """
+    Find what changed between two collections of a switch, attribute by attribute.
+    Unchanged objects are recognised with `Comparison.differs` before their attributes are compared.
+
+    :param old: the parsed data of the earlier collection
+    :param new: the parsed data of the later collection
+    :return: the Type, the object, the attribute or None for the whole object, and the old and new
+        values of each change, where an added or removed object or attribute is missing from one side
+    """
+    for t in dict.fromkeys([*old, *new]):
+        old_objects, new_objects = old.get(t, {}), new.get(t, {})
+        for key, old_values in old_objects.items():
+            new_values = new_objects.get(key, _MISSING)
+            if new_values is _MISSING:
+                yield t, key, None, old_values, _MISSING
+            elif not _differs(old_values, new_values):
+                continue
+            elif isinstance(old_values, dict) and isinstance(new_values, dict):
+                for attribute in dict.fromkeys([*old_values, *new_values]):
+                    old_value, new_value = old_values.get(attribute, _MISSING), new_values.get(attribute, _MISSING)
+                    if _differs(old_value, new_value):
+                        yield t, key, attribute, old_value, new_value
+            else:
+                yield t, key, None, old_values, new_values
+        for key, new_values in new_objects.items():
+            if key not in old_objects:
+                yield t, key, None, _MISSING, new_values
+
+
+@dataclass(frozen=True)
+class Change:
+    """
+    A Change records an object, or an attribute of an object, changing in a collection.
+    The old value of an object or attribute that was added is None, as is the new value
+    of one that was removed.
+    """
+    collected: str
+    key: Switch.Object
+    attribute: str | None
+    old: Any
+    new: Any
+
+
+class History:
+    """
+    A History stores the collections of a single switch in a directory.
+
+    Every `keyframe_interval` collections the whole switch is saved as a snapshot. Every
+    collection after the first, including those, also stores its changes from the previous
+    collection in a SQLite database, indexed by object and attribute. The state of the switch at any
+    date is rebuilt from the last snapshot before it and the changes since, and the history
+    of an object is read from the changes alone.
+    """
+
+    def __init__(self, directory: Path | str, keyframe_interval: int = 30):
+        """
+        Open a History, creating the directory and database if they do not exist.
+
+        :param directory: the directory holding the history of the switch
+        :param keyframe_interval: the number of collections between full snapshots
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.keyframe_interval = keyframe_interval
+        self.connection = sqlite3.connect(self.directory / "history.db", isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.executescript(SCHEMA)
+        self._types = codec.object_types()
+        # The parsed data of the last collection, which the next collection is compared with.
+        self._latest: dict[Type[Switch.Object], dict[Switch.Object, Any]] | None = None
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> History:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _decode(self, value: str) -> Any:
+        return codec.decode(json.loads(value), self._types)
+
+    def collections(self) -> list[str]:
+        """
+        :return: the dates of the stored collections, from the earliest to the latest
+        """
+        return [collected for collected, in self.connection.execute("SELECT collected FROM collections ORDER BY id")]
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM collections").fetchone()[0]
+
+    def record(self, collected: date | str, switch: Switch | dict) -> int:
+        """
+        Store a collection of the switch, which must be later than every stored collection.
+
+        :param collected: the date or datetime of the collection, or its ISO 8601 form
+        :param switch: the Switch, or the dictionary returned by its `read` method
+        :return: the number of changes from the previous collection
+        """
+        collected = _timestamp(collected)
+        count, last = self.connection.execute("SELECT COUNT(*), MAX(collected) FROM collections").fetchone()
+        if last is not None and collected <= last:
+            raise ValueError(f'The collection of {collected} is not later than the collection of {last}.')
+        data = dict(switch.items() if isinstance(switch, dict) else switch)
+        # The first collection is only stored as a snapshot, since it has nothing to change from.
+        previous = data if not count else self._latest if self._latest is not None else self.state()
+        changes = [
+            (t.__name__, _dumps(key), attribute, _dumps(old), _dumps(new))
+            for t, key, attribute, old, new in delta(previous, data)
+        ]
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            collection = cursor.execute("INSERT INTO collections (collected) VALUES (?)", (collected,)).lastrowid
+            if count % self.keyframe_interval == 0:
+                keyframe = f"{collection}.snap"
+                write_snapshot(self.directory / keyframe, data.items())
+                cursor.execute("UPDATE collections SET keyframe = ? WHERE id = ?", (keyframe, collection))
+            cursor.executemany(f"INSERT INTO changes VALUES ({collection}, ?, ?, ?, ?, ?)", changes)
+            cursor.execute("COMMIT")
+        except BaseException:
+            cursor.execute("ROLLBACK")
+            raise
+        # The caller may go on to change its dictionaries, so the next collection is compared with a copy.
+        self._latest = _copy(data)
+        return len(changes)
+
+    def state(
+            self, at: date | str = None, types: Collection[Type[Switch.Object]] = None
+    ) -> dict[Type[Switch.Object], dict[Switch.Object, Any]]:
+        """
+        Rebuild the parsed data of the switch as it was collected at a date.
+
+        :param at: the date, the latest collection on or before which is rebuilt, or None for the latest collection
+        :param types: the Types to rebuild, every Type if not given
+        :return: the parsed data in the form returned by `Switch.read`
+        """
+        row = self.connection.execute(
+            "SELECT MAX(id) FROM collections WHERE collected <= ?", (_timestamp(at),)
+        ).fetchone() if at is not None else self.connection.execute("SELECT MAX(id) FROM collections").fetchone()
+        if row[0] is None:
+            raise KeyError(f'There is no collection on or before {at}.' if at is not None else 'There is no collection.')
+        collection, = row
+        keyframe_collection, keyframe = self.connection.execute(
+            "SELECT id, keyframe FROM collections WHERE id <= ? AND keyframe IS NOT NULL ORDER BY id DESC LIMIT 1",
+            (collection,)
+        ).fetchone()
+        snapshot = Snapshot(self.directory / keyframe)
+        names = None if types is None else [t.__name__ for t in types]
+        data = {t: snapshot.read(t) for t in snapshot.types() if types is None or t in types}
+        query = "SELECT type, key, attribute, new FROM changes WHERE collection > ? AND collection <= ?"
+        parameters = [keyframe_collection, collection]
+        if names is not None:
+            query += f" AND type IN ({', '.join('?' * len(names))})"
+            parameters.extend(names)
+        keys = {}
+        for type_name, key, attribute, new in self.connection.execute(query + " ORDER BY collection, rowid", parameters):
+            objects = data.setdefault(self._types[type_name], {})
+            o = keys.get(key)
+            if o is None:
+                o = keys[key] = self._decode(key)
+            if attribute is None:
+                if new is None:
+                    objects.pop(o, None)
+                else:
+                    objects[o] = self._decode(new)
+            elif new is None:
+                objects[o].pop(attribute, None)
+            else:
+                objects[o][attribute] = self._decode(new)
+        return {t: objects for t, objects in data.items() if objects}
+
+    def changes(self, t: Type[Switch.Object], key: Switch.Object, attribute: str = None) -> list[Change]:
+        """
+        Find when an object, or one attribute of it, changed, such as when the LLDP neighbour of a port changed.
+        The collections are not rebuilt, only the changes of the object are read.
+
+        :param t: the Type of the object
+        :param key: the object
+        :param attribute: the attribute, or None for every change of the object
+        :return: the Changes since the first collection, from the earliest to the latest
+        """
+        query = (
+            "SELECT collections.collected, changes.attribute, changes.old, changes.new "
+            "FROM changes JOIN collections ON changes.collection = collections.id "
+            "WHERE changes.type = ? AND changes.key = ?"
+        )
+        parameters = [t.__name__, _dumps(key)]
+        if attribute is not None:
+            # The whole object being added or removed changes each of its attributes too.
+            query += " AND (changes.attribute = ? OR changes.attribute IS NULL)"
+            parameters.append(attribute)
+        changes = []
+        for collected, changed, old, new in self.connection.execute(query + " ORDER BY changes.collection", parameters):
+            old = None if old is None else self._decode(old)
+            new = None if new is None else self._decode(new)
+            if attribute is not None and changed is None:
+                old = old.get(attribute) if isinstance(old, dict) else None
+                new = new.get(attribute) if isinstance(new, dict) else None
+                if old is None and new is None:
+                    continue
+            changes.append(Change(collected, key, attribute if attribute is not None else changed, old, new))
+        return changes
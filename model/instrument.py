@@ -0,0 +1,128 @@
+"""
+The instrument module measures where the time and memory go while a SourceData is parsed.
+"""
+from __future__ import annotations
+
+import time
+import tracemalloc
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from model.switch import Switch
+
+
+@dataclass
+class ParseRecord:
+    """
+    A ParseRecord describes the extraction and parsing of a single command section.
+
+    The bytes are the size of the section encoded as UTF-8. The allocation figures are only
+    recorded when allocation tracking is enabled, and are the net change in traced memory
+    across the parse and the peak traced memory above the level at the start of the parse.
+    The peak is only recorded when tracemalloc was not already tracing, since measuring it
+    means resetting the peak of whoever started tracing.
+    """
+    command: str
+    lines: int
+    bytes: int
+    extract_seconds: float
+    parse_seconds: float
+    objects: int
+    reused: bool = False
+    allocated: int | None = None
+    peak: int | None = None
+
+
+@dataclass
+class Instrumentation:
+    """
+    An Instrumentation collects a ParseRecord for every command section a SourceData parses
+    and passes each one to its hooks as soon as it is made.
+
+    An Instrumentation is attached by setting the `instrumentation` attribute of a SourceData,
+    or of a SourceData class to instrument every instance of it. A SourceData without one
+    pays for a single attribute check per section.
+    """
+    hooks: list[Callable[[ParseRecord], None]] = field(default_factory=list)
+    allocations: bool = False
+    records: list[ParseRecord] = field(default_factory=list)
+
+    def add_hook(self, hook: Callable[[ParseRecord], None]) -> Callable[[ParseRecord], None]:
+        """
+        Add a function to call with every new ParseRecord. It can be used as a decorator.
+
+        :param hook: the function
+        :return: the function
+        """
+        self.hooks.append(hook)
+        return hook
+
+    def measure(
+            self,
+            command: str,
+            lines: list[str],
+            extract_seconds: float,
+            resolve: Callable[[str, list[str]], dict[Switch.Object, Any]],
+            reused: Callable[[], bool]
+    ) -> dict[Switch.Object, Any]:
+        """
+        Resolve the parsed output of a command section while measuring it.
+
+        :param command: the command
+        :param lines: the output of the command separated by lines
+        :param extract_seconds: the time taken to extract the section
+        :param resolve: the function that parses or otherwise resolves the section
+        :param reused: a function telling whether the output was reused rather than parsed
+        :return: the parsed output
+        """
+        # Tracing is only started, and stopped again, when no one else is already tracing. The peak of
+        # a trace started by someone else covers more than this parse and is not reset, so it is not recorded.
+        started = self.allocations and not tracemalloc.is_tracing()
+        allocated = peak = None
+        try:
+            if started:
+                tracemalloc.start()
+            if self.allocations:
+                before, _ = tracemalloc.get_traced_memory()
+            start = time.perf_counter()
+            result = resolve(command, lines)
+            seconds = time.perf_counter() - start
+            if self.allocations:
+                after, top = tracemalloc.get_traced_memory()
+                allocated = after - before
+                peak = top - before if started else None
+        finally:
+            if started:
+                tracemalloc.stop()
+        size = sum(len(line.encode(errors='surrogateescape')) for line in lines)
+        record = ParseRecord(
+            command, len(lines), size, extract_seconds, seconds, len(result), reused(), allocated, peak
+        )
+        self.records.append(record)
+        for hook in self.hooks:
+            hook(record)
+        return result
+
+    def summary(self, records: Iterable[ParseRecord] = None) -> str:
+        """
+        Summarise the records by command, slowest first.
+
+        :param records: the records to summarise, defaulting to every record collected
+        :return: the summary as a printable table
+        """
+        totals: dict[str, list] = {}
+        for r in self.records if records is None else records:
+            total = totals.setdefault(r.command, [0, 0, 0.0, 0.0, 0, 0])
+            total[0] += r.lines
+            total[1] += r.bytes
+            total[2] += r.extract_seconds
+            total[3] += r.parse_seconds
+            total[4] += r.objects
+            total[5] += r.allocated or 0
+        rows = [f"{'command':<36}{'lines':>10}{'bytes':>12}{'extract s':>11}{'parse s':>10}{'objects':>10}{'alloc':>12}"]
+        for command, (lines, size, extract, parse, objects, allocated) in sorted(
+                totals.items(), key=lambda item: item[1][2] + item[1][3], reverse=True):
+            rows.append(f"{command:<36}{lines:>10,}{size:>12,}{extract:>11.3f}{parse:>10.3f}{objects:>10,}"
+                        f"{allocated if self.allocations else '-':>12}")
+        return "\n".join(rows)
@@ -0,0 +1,313 @@
+"""
+The inventory module stores the parsed data of a fleet of switches in a SQLite database,
+so that questions about the whole fleet can be answered without loading every switch.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from collections.abc import Iterable
+from dataclasses import fields
+from pathlib import Path
+from typing import Any, Type
+
+from model import codec
+from model.network_objects import MacAddresses, Network
+from model.routing import address_to_int, network_to_prefix, prefix_mask
+from model.switch import Switch
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS switches (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    snapshot TEXT,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS objects (
+    id INTEGER PRIMARY KEY,
+    switch INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    name TEXT NOT NULL,
+    key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS objects_by_switch ON objects (switch, type);
+CREATE INDEX IF NOT EXISTS objects_by_name ON objects (type, name);
+CREATE TABLE IF NOT EXISTS attributes (
+    object INTEGER NOT NULL,
+    attribute TEXT NOT NULL,
+    type TEXT,
+    name TEXT,
+    value TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS attributes_by_object ON attributes (object);
+CREATE INDEX IF NOT EXISTS attributes_by_value ON attributes (attribute, type, name);
+CREATE TABLE IF NOT EXISTS macs (
+    object INTEGER NOT NULL,
+    attribute TEXT NOT NULL,
+    address INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS macs_by_object ON macs (object);
+CREATE INDEX IF NOT EXISTS macs_by_address ON macs (address);
+CREATE TABLE IF NOT EXISTS routes (
+    object INTEGER NOT NULL,
+    address INTEGER NOT NULL,
+    length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS routes_by_object ON routes (object);
+CREATE INDEX IF NOT EXISTS routes_by_address ON routes (address);
+"""
+
+
+def _name(o: Switch.Object) -> str:
+    # Objects are found by their first field, such as the name of an Interface or the id of a Vlan.
+    return str(getattr(o, fields(o)[0].name))
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(codec.encode(value), separators=(",", ":"))
+
+
+class Inventory:
+    """
+    An Inventory stores the parsed data of many switches in a SQLite database.
+
+    Every switch is stored as a snapshot which replaces the previous snapshot of the same
+    switch. Keys and values are stored in the codec's JSON form so that queries return
+    typed Switch.Objects, and the MAC addresses and routes are also stored as integers
+    in indexed tables of their own, so that the fleet can be searched by address.
+    """
+
+    def __init__(self, path: Path | str = ":memory:", batch_size: int = 64):
+        """
+        Open an Inventory, creating the database if it does not exist.
+
+        :param path: the path to the database file
+        :param batch_size: the number of switches to store in each transaction of `store_many`
+        """
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(SCHEMA)
+        self._types = codec.object_types()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> Inventory:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _decode(self, value: str) -> Any:
+        return codec.decode(json.loads(value), self._types)
+
+    def snapshot(self, name: str) -> str | None:
+        """
+        Get the identifier of the stored snapshot of a switch.
+
+        :param name: the name of the switch
+        :return: the snapshot identifier, or None if the switch or its identifier is not stored
+        """
+        row = self.connection.execute("SELECT snapshot FROM switches WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def switches(self) -> list[str]:
+        """
+        :return: the names of the stored switches
+        """
+        return [name for name, in self.connection.execute("SELECT name FROM switches ORDER BY name")]
+
+    def store(self, name: str, switch: Switch | dict, snapshot: str = None) -> bool:
+        """
+        Store the parsed data of a switch, replacing its previous snapshot.
+
+        :param name: the name of the switch
+        :param switch: the Switch, or the dictionary returned by its `read` method
+        :param snapshot: an identifier of the snapshot, such as the hash of the tech file
+        :return: False if the snapshot was already stored and nothing changed, True otherwise
+        """
+        return self.store_many([(name, switch, snapshot)]) == 1
+
+    def store_many(self, switches: Iterable[tuple[str, Switch | dict, str | None]]) -> int:
+        """
+        Store the parsed data of many switches, committing `batch_size` switches per transaction.
+        A switch whose snapshot identifier is already stored is skipped.
+
+        :param switches: the name, Switch or parsed data, and snapshot identifier of each switch
+        :return: the number of switches stored
+        """
+        stored = pending = 0
+        cursor = self.connection.cursor()
+        try:
+            for name, switch, snapshot in switches:
+                if snapshot is not None and snapshot == self.snapshot(name):
+                    continue
+                if not pending:
+                    cursor.execute("BEGIN IMMEDIATE")
+                self._replace(cursor, name, switch, snapshot)
+                stored += 1
+                pending += 1
+                if pending == self.batch_size:
+                    cursor.execute("COMMIT")
+                    pending = 0
+            if pending:
+                cursor.execute("COMMIT")
+        except BaseException:
+            if self.connection.in_transaction:
+                cursor.execute("ROLLBACK")
+            raise
+        return stored
+
+    def _replace(self, cursor: sqlite3.Cursor, name: str, switch: Switch | dict, snapshot: str | None) -> None:
+        cursor.execute(
+            "INSERT INTO switches (name, snapshot, updated) VALUES (?, ?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET snapshot = excluded.snapshot, updated = excluded.updated",
+            (name, snapshot, time.time())
+        )
+        switch_id, = cursor.execute("SELECT id FROM switches WHERE name = ?", (name,)).fetchone()
+        self._delete(cursor, switch_id)
+        # The object ids are assigned here, which is safe within the write transaction,
+        # so that every table can be filled with a single executemany.
+        object_id, = cursor.execute("SELECT COALESCE(MAX(id), 0) FROM objects").fetchone()
+        objects, attributes, macs, routes = [], [], [], []
+        for t, data in (switch.items() if isinstance(switch, dict) else switch):
+            for o, values in data.items():
+                object_id += 1
+                objects.append((object_id, switch_id, t.__name__, _name(o), _dumps(o)))
+                if isinstance(o, Network):
+                    routes.append((object_id, *network_to_prefix(o)))
+                for attribute, value in values.items():
+                    if isinstance(value, MacAddresses):
+                        # The addresses are stored one per row, and the notation with an empty set of addresses.
+                        attributes.append((object_id, attribute, None, None, _dumps(MacAddresses([], value.notation))))
+                        macs.extend((object_id, attribute, address) for address in value.addresses)
+                    elif isinstance(value, Switch.Object):
+                        attributes.append((object_id, attribute, type(value).__name__, _name(value), _dumps(value)))
+                    else:
+                        attributes.append((object_id, attribute, None, None, _dumps(value)))
+        cursor.executemany("INSERT INTO objects VALUES (?, ?, ?, ?, ?)", objects)
+        cursor.executemany("INSERT INTO attributes VALUES (?, ?, ?, ?, ?)", attributes)
+        cursor.executemany("INSERT INTO macs VALUES (?, ?, ?)", macs)
+        cursor.executemany("INSERT INTO routes VALUES (?, ?, ?)", routes)
+
+    @staticmethod
+    def _delete(cursor: sqlite3.Cursor, switch_id: int) -> None:
+        owned = "SELECT id FROM objects WHERE switch = ?"
+        for table in ("attributes", "macs", "routes"):
+            cursor.execute(f"DELETE FROM {table} WHERE object IN ({owned})", (switch_id,))
+        cursor.execute("DELETE FROM objects WHERE switch = ?", (switch_id,))
+
+    def remove(self, name: str) -> None:
+        """
+        Remove a switch and its parsed data.
+
+        :param name: the name of the switch
+        """
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        row = cursor.execute("SELECT id FROM switches WHERE name = ?", (name,)).fetchone()
+        if row:
+            self._delete(cursor, row[0])
+            cursor.execute("DELETE FROM switches WHERE id = ?", row)
+        cursor.execute("COMMIT")
+
+    def read(self, name: str) -> dict[Type[Switch.Object], dict[Switch.Object, Any]]:
+        """
+        Read back the stored parsed data of a switch.
+
+        :param name: the name of the switch
+        :return: the parsed data in the form returned by `Switch.read`
+        """
+        data = {}
+        objects = {}
+        for object_id, type_name, key in self.connection.execute(
+                "SELECT objects.id, objects.type, objects.key FROM objects JOIN switches ON objects.switch = switches.id "
+                "WHERE switches.name = ? ORDER BY objects.id", (name,)
+        ):
+            o = self._decode(key)
+            objects[object_id] = data.setdefault(self._types[type_name], {})[o] = {}
+        if not objects:
+            return data
+        ids = "SELECT objects.id FROM objects JOIN switches ON objects.switch = switches.id WHERE switches.name = ?"
+        for object_id, attribute, value in self.connection.execute(
+                f"SELECT object, attribute, value FROM attributes WHERE object IN ({ids}) ORDER BY rowid", (name,)
+        ):
+            objects[object_id][attribute] = self._decode(value)
+        macs = {}
+        for object_id, attribute, address in self.connection.execute(
+                f"SELECT object, attribute, address FROM macs WHERE object IN ({ids}) ORDER BY rowid", (name,)
+        ):
+            macs.setdefault((object_id, attribute), []).append(address)
+        for (object_id, attribute), addresses in macs.items():
+            objects[object_id][attribute] = MacAddresses(addresses, objects[object_id][attribute].notation)
+        return data
+
+    def locate(self, t: Type[Switch.Object], name: Any) -> list[tuple[str, Switch.Object]]:
+        """
+        Find the switches holding objects of a Type by the value of their first field,
+        such as where VLAN 200 is defined or which switches have a port 1/1.
+
+        :param t: the Type of the objects
+        :param name: the value of the first field of the objects
+        :return: the name of each switch with the object it holds
+        """
+        return [(switch, self._decode(key)) for switch, key in self.connection.execute(
+            "SELECT switches.name, objects.key FROM objects JOIN switches ON objects.switch = switches.id "
+            "WHERE objects.type = ? AND objects.name = ? ORDER BY switches.name, objects.id",
+            (t.__name__, str(name))
+        )]
+
+    def find(self, attribute: str, value: Switch.Object) -> list[tuple[str, Switch.Object]]:
+        """
+        Find the objects holding an attribute with a given value across the fleet,
+        such as the ports with an LLDP neighbour named core-1.
+
+        :param attribute: the name of the attribute, such as "LLDP Remote SysName"
+        :param value: the value of the attribute
+        :return: the name of each switch with the object holding the value
+        """
+        return [(switch, self._decode(key)) for switch, key in self.connection.execute(
+            "SELECT switches.name, objects.key FROM attributes "
+            "JOIN objects ON attributes.object = objects.id JOIN switches ON objects.switch = switches.id "
+            "WHERE attributes.attribute = ? AND attributes.type = ? AND attributes.name = ? AND attributes.value = ? "
+            "ORDER BY switches.name, objects.id",
+            (attribute, type(value).__name__, _name(value), _dumps(value))
+        )]
+
+    def find_mac(self, address: str | int) -> list[tuple[str, Switch.Object]]:
+        """
+        Find the objects, such as the ports, that learned a MAC address across the fleet.
+
+        :param address: the MAC address in any notation, or as an integer
+        :return: the name of each switch with the object that learned the address
+        """
+        if isinstance(address, str):
+            address = MacAddresses([address]).addresses[0]
+        return [(switch, self._decode(key)) for switch, key in self.connection.execute(
+            "SELECT switches.name, objects.key FROM macs "
+            "JOIN objects ON macs.object = objects.id JOIN switches ON objects.switch = switches.id "
+            "WHERE macs.address = ? ORDER BY switches.name, objects.id",
+            (address,)
+        )]
+
+    def routes(self, address: str | int) -> list[tuple[str, Network]]:
+        """
+        Find the routes matching an IPv4 address across the fleet, longest prefix first.
+
+        :param address: the address as a dotted quad or an integer
+        :return: the name of each switch with the matching route
+        """
+        address = address_to_int(address)
+        candidates = sorted({address & prefix_mask(length) for length in range(33)})
+        rows = self.connection.execute(
+            "SELECT switches.name, objects.key, routes.address, routes.length FROM routes "
+            "JOIN objects ON routes.object = objects.id JOIN switches ON objects.switch = switches.id "
+            f"WHERE routes.address IN ({', '.join('?' * len(candidates))})",
+            candidates
+        ).fetchall()
+        matches = [row for row in rows if address & prefix_mask(row[3]) == row[2]]
+        matches.sort(key=lambda row: (-row[3], row[0]))
+        return [(switch, self._decode(key)) for switch, key, _, _ in matches]
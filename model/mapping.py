@@ -0,0 +1,193 @@
+"""
+The mapping module resolves the objects of an old switch to the objects of a new switch.
+
+A mapping file is a JSON or YAML dictionary of Type names to a list of entries. An entry
+either pairs one old object with one new object, pairs a range of old objects with a range
+of new objects, or substitutes a regular expression:
+
+    Interface:
+      - before: 1/1
+        after: 2/1
+      - before: 1/[2-48]
+        after: 3/[2-48]
+      - before: "[5-6]/[1-24]"
+        after: "[7-8]/[25-48]"
+      - match: '4/(\\d+)'
+        replace: '9/\\1'
+
+Each bracketed range of `before` is paired with the range in the same position of `after`,
+which must hold as many numbers, so that slots and ports can be offset. Ranges and regular
+expressions are never expanded, each old object is resolved when it is first looked up.
+"""
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Any, Type
+
+import yaml
+
+from model import codec
+from model.switch import Switch
+
+# The LibYAML loader is many times faster than the pure Python loaders, when it is available.
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_RANGE = re.compile(r'\[(\d+)-(\d+)\]')
+_MISSING = object()
+
+
+def _name(o: Switch.Object) -> str:
+    # Objects are resolved by their first field, such as the name of an Interface.
+    return str(getattr(o, fields(o)[0].name))
+
+
+@dataclass(frozen=True)
+class RangeRule:
+    """
+    A RangeRule maps old names to new names by the position of their numbers in bracketed ranges.
+    """
+    before: str
+    after: str
+    _pattern: re.Pattern = field(init=False, repr=False, compare=False)
+    _ranges: tuple[tuple[int, int, int], ...] = field(init=False, repr=False, compare=False)
+    _template: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        before = [(int(lo), int(hi)) for lo, hi in _RANGE.findall(self.before)]
+        after = [(int(lo), int(hi)) for lo, hi in _RANGE.findall(self.after)]
+        if len(before) != len(after) or any(b[1] - b[0] != a[1] - a[0] for b, a in zip(before, after)):
+            raise ValueError(f'The ranges of {self.before!r} and {self.after!r} do not correspond.')
+        pattern = r'(\d+)'.join(re.escape(part) for part in _RANGE.split(self.before)[::3])
+        template = '{}'.join(part.replace('{', '{{').replace('}', '}}') for part in _RANGE.split(self.after)[::3])
+        object.__setattr__(self, "_pattern", re.compile(pattern))
+        object.__setattr__(self, "_ranges", tuple((b[0], b[1], a[0]) for b, a in zip(before, after)))
+        object.__setattr__(self, "_template", template)
+
+    def resolve(self, name: str) -> str | None:
+        """
+        :param name: the old name
+        :return: the new name, or None if the rule does not apply to the old name
+        """
+        match = self._pattern.fullmatch(name)
+        if match is None:
+            return None
+        numbers = []
+        for number, (lo, hi, start) in zip(match.groups(), self._ranges):
+            number = int(number)
+            if not lo <= number <= hi:
+                return None
+            numbers.append(start + number - lo)
+        return self._template.format(*numbers)
+
+
+@dataclass(frozen=True)
+class RegexRule:
+    """
+    A RegexRule maps old names matching a regular expression to new names by substitution.
+    """
+    match: str
+    replace: str
+    _pattern: re.Pattern = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "_pattern", re.compile(self.match))
+
+    def resolve(self, name: str) -> str | None:
+        """
+        :param name: the old name
+        :return: the new name, or None if the rule does not apply to the old name
+        """
+        match = self._pattern.fullmatch(name)
+        return None if match is None else match.expand(self.replace)
+
+
+class Resolver:
+    """
+    A Resolver maps the old objects of a Type to new objects.
+
+    Explicit pairs are looked up in a dictionary. The rules are tried in order for any
+    other object, and the result of each object is remembered, so that every lookup after
+    the first costs a single dictionary lookup however many objects the rules cover.
+    """
+
+    def __init__(
+            self, t: Type[Switch.Object], pairs: dict[Switch.Object, Switch.Object] = None,
+            rules: list[RangeRule | RegexRule] = None
+    ):
+        """
+        Create a new Resolver.
+
+        :param t: the Type of the objects
+        :param pairs: the new object of each explicitly mapped old object
+        :param rules: the rules to resolve any other old object with
+        """
+        self.t = t
+        self.pairs = pairs if pairs else {}
+        self.rules = rules if rules else []
+        self._resolved: dict[Switch.Object, Switch.Object | None] = {}
+
+    def get(self, old: Switch.Object, default: Any = None) -> Switch.Object | Any:
+        """
+        Resolve an old object to its new object.
+
+        :param old: the old object
+        :param default: the value to return if the old object is not mapped
+        :return: the new object, or the default
+        """
+        new = self.pairs.get(old)
+        if new is not None or not self.rules:
+            return default if new is None else new
+        new = self._resolved.get(old, _MISSING)
+        if new is _MISSING:
+            new = None
+            name = _name(old)
+            for rule in self.rules:
+                resolved = rule.resolve(name)
+                if resolved is not None:
+                    new = self.t(resolved)
+                    break
+            self._resolved[old] = new
+        return default if new is None else new
+
+    def __len__(self) -> int:
+        return len(self.pairs) + len(self.rules)
+
+
+def parse_entries(t: Type[Switch.Object], entries: list[dict[str, Any]]) -> Resolver:
+    """
+    Compile the entries of a Type in a mapping file into a Resolver.
+
+    :param t: the Type
+    :param entries: the entries
+    :return: the Resolver
+    """
+    pairs, rules = {}, []
+    for entry in entries:
+        if "match" in entry:
+            rules.append(RegexRule(str(entry["match"]), str(entry["replace"])))
+        elif _RANGE.search(str(entry["before"])):
+            rules.append(RangeRule(str(entry["before"]), str(entry["after"])))
+        else:
+            pairs[t(str(entry["before"]))] = t(str(entry["after"]))
+    return Resolver(t, pairs, rules)
+
+
+def load_mapping(file_path: Path) -> dict[Type[Switch.Object], Resolver]:
+    """
+    Load a mapping file and compile it into a Resolver for each Type.
+
+    :param file_path: the path to the JSON or YAML mapping file
+    :return: the Resolvers by Type
+    """
+    with open(file_path, 'r') as f:
+        if file_path.suffix == '.json':
+            mapping = json.load(f)
+        elif file_path.suffix in ('.yaml', '.yml'):
+            mapping = yaml.load(f, Loader=YAML_LOADER)
+        else:
+            raise ValueError('The mapping file must be a JSON or YAML file.')
+    types = codec.object_types()
+    return {types[type_name]: parse_entries(types[type_name], entries) for type_name, entries in mapping.items()}
@@ -1,88 +1,168 @@
 from __future__ import annotations
-from dataclasses import dataclass
+from abc import ABCMeta
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, fields
+from weakref import WeakValueDictionary
+
+import re
 
 from model.switch import Switch
 
+_HEX_DIGIT = re.compile(r'[0-9a-fA-F]')
+_MAC_SEPARATORS = str.maketrans("", "", ":.-")
+
+
+class Interned(ABCMeta):
+    """
+    The Interned metaclass keeps a single canonical instance of each value of its classes.
+    Creating an object equal to one that is still in use returns the existing object, so
+    the values parsed over and over again across a fleet share their memory, and equal
+    objects can be recognised by identity before their fields are compared.
+
+    Each class has its own table, so a State and a Connection of the same name remain
+    distinct objects. The tables only hold weak references and never keep an object alive.
+    """
+
+    def __init__(cls, name, bases, namespace, **kwargs):
+        super().__init__(name, bases, namespace, **kwargs)
+        cls._interned = WeakValueDictionary()
+
+    def __call__(cls, *args, **kwargs):
+        if kwargs:
+            # Keyword arguments are resolved by constructing the object and keying it by its fields.
+            instance = super().__call__(*args, **kwargs)
+            return cls._interned.setdefault(tuple(getattr(instance, f.name) for f in fields(instance)), instance)
+        try:
+            return cls._interned[args]
+        except KeyError:
+            instance = cls._interned[args] = super().__call__(*args)
+            return instance
+
+    def intern_many(cls, rows: Iterable[tuple]) -> list:
+        """
+        Create or find the objects of many tuples of arguments at once, as reading a snapshot does.
+        The lookups of the table and the constructor are bound once for all the rows, rather than
+        going through the metaclass call for every object.
+
+        :param rows: a tuple of positional arguments for each object
+        :return: the objects in the order of the rows
+        """
+        table = cls._interned
+        find = table.get
+        register = table.setdefault
+        construct = super().__call__
+        objects = []
+        append = objects.append
+        for args in rows:
+            instance = find(args)
+            if instance is None:
+                instance = register(args, construct(*args))
+            append(instance)
+        return objects
+
 
 @dataclass(frozen=True)
-class Basic(Switch.Object):
+class Basic(Switch.Object, metaclass=Interned):
     """
     The Basic class is used to represent a basic object. This
     is any object that can be described in a single attribute.
     """
+    __slots__ = ("name", "__weakref__")
     name: str
 
+    # Subclasses inherit these comparisons rather than having dataclass generate their own.
+    # Interned objects are usually identical when they are equal, so identity is checked first.
     def __eq__(self, new: Connection) -> bool:
-        return self.name == new.name
+        return self is new or (self.__class__ is new.__class__ and self.name == new.name)
 
     def __ne__(self, new: Connection) -> dict | None:
-        if self.name != new.name:
+        if self is not new and self.name != new.name:
             return {"old": self.name, "new": new.name}
         return None
 
+    def __hash__(self) -> int:
+        return hash(self.name)
+
     def __str__(self) -> str:
         return self.name
 
+    def __reduce__(self):
+        # Pickling by constructor arguments is smaller and faster than pickling the instance dictionary.
+        return type(self), (self.name,)
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, eq=False)
 class State(Basic):
     """
     The State class represents the operational or administrative state of a
     Switch object.
     """
+    __slots__ = ()
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class Connection(Basic):
     """
     A Connection is an L2 or L3 connection between two systems.
     A Connection describes the other end of the connection.
     """
+    __slots__ = ()
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class Interface(Basic):
     """
     An Interface is a layer 3 construct that is used to identify a device on a network.
     It can correspond to a physical port on a device, or it can be a logical construct.
     """
+    __slots__ = ()
 
 @dataclass(frozen=True)
-class Network(Switch.Object):
+class Network(Switch.Object, metaclass=Interned):
     """
     A Network is a layer 3 construct denoting a range of consecutive IP addresses that
     are grouped by masks for routing purposes.
     """
+    __slots__ = ("address", "mask", "__weakref__")
     address: str
     mask: str
 
     def __eq__(self, new: Network) -> bool:
-        return self.address == new.address and self.mask == new.mask
+        return self is new or (self.address == new.address and self.mask == new.mask)
 
     def __ne__(self, new: Network) -> dict | None:
-        if self.address != new.address or self.mask != new.mask:
+        if self is not new and (self.address != new.address or self.mask != new.mask):
             return {"old": f"{self.address}//{self.mask}", "new": f"{new.address}//{new.mask}"}
         return None
 
     def __str__(self) -> str:
         return f"{self.address}//{self.mask}"
 
+    def __reduce__(self):
+        return type(self), (self.address, self.mask)
+
 
 @dataclass(frozen=True)
-class Vlan(Switch.Object):
+class Vlan(Switch.Object, metaclass=Interned):
     """
     A Vlan is a layer 2 construct that is used to group ports together.
     """
 
+    __slots__ = ("id", "name", "__weakref__")
     id: int
     name: str
 
     def __eq__(self, new: Vlan) -> bool:
-        return self.id == new.id and self.name == new.name
+        return self is new or (self.id == new.id and self.name == new.name)
 
     def __ne__(self, new: Vlan) -> dict[str, str] | None:
-        if self.id != new.id or self.name != new.name:
+        if self is not new and (self.id != new.id or self.name != new.name):
             return {"old": f"VLAN({self.id}, {self.name})", "new": f"VLAN({new.id}, {new.name})"}
         return None
 
+    def __reduce__(self):
+        return type(self), (self.id, self.name)
+
 
 @dataclass(frozen=True)
 class MacAddresses(Switch.Object):
@@ -90,8 +170,23 @@ class MacAddresses(Switch.Object):
     A MacAddresses are a layer 2 construct that is used to identify a devices
     on an Ethernet network. They are learned by ports and are used to form
     tables for forwarding packets.
+
+    The addresses are held as a sorted array of unique 48-bit integers, which costs
+    eight bytes per address and allows the differences between two sets of addresses
+    to be found in linear time. The notation records how the switch wrote the
+    addresses, as a template of hex digits and separators, so that they can be
+    rendered the same way in reports.
     """
-    addresses: list[str]
+    addresses: array[int]
+    notation: str = "xx:xx:xx:xx:xx:xx"
+
+    def __post_init__(self):
+        addresses = list(self.addresses)
+        if addresses and isinstance(addresses[0], str):
+            # Remember how the switch wrote the addresses from the first one.
+            object.__setattr__(self, "notation", _HEX_DIGIT.sub(lambda m: "X" if m[0].isupper() else "x", addresses[0]))
+            addresses = [int(address.translate(_MAC_SEPARATORS), 16) for address in addresses]
+        object.__setattr__(self, "addresses", array("Q", sorted(set(addresses))))
 
     def __eq__(self, other: MacAddresses) -> bool:
         return self.addresses == other.addresses
@@ -99,9 +194,39 @@ class MacAddresses(Switch.Object):
     def __ne__(self, other) -> dict[str, list[str]] | None:
         if self == other:
             return None
-        missing = [address for address in self.addresses if address not in other.addresses]
-        gained = [address for address in other.addresses if address not in self.addresses]
-        return {'missing': missing, 'gained': gained} if missing or gained else None
+        missing = sorted(set(self.addresses).difference(other.addresses))
+        gained = sorted(set(other.addresses).difference(self.addresses))
+        if not missing and not gained:
+            return None
+        return {'missing': [self.render(a) for a in missing], 'gained': [other.render(a) for a in gained]}
+
+    def __hash__(self) -> int:
+        return hash(self.addresses.tobytes())
+
+    def __len__(self) -> int:
+        return len(self.addresses)
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.render(address) for address in self.addresses)
+
+    def __contains__(self, address: str | int) -> bool:
+        if isinstance(address, str):
+            address = int(address.translate(_MAC_SEPARATORS), 16)
+        i = bisect_left(self.addresses, address)
+        return i < len(self.addresses) and self.addresses[i] == address
+
+    def render(self, address: int) -> str:
+        """
+        Render an address in the notation the switch used.
+
+        :param address: the address as an integer
+        :return: the address as a string
+        """
+        digits = iter(format(address, "012X" if "X" in self.notation else "012x"))
+        return "".join(next(digits) if c in "xX" else c for c in self.notation)
 
     def __str__(self) -> str:
-        return ", ".join(self.addresses)
+        return ", ".join(self)
+
+    def __reduce__(self):
+        return type(self), (self.addresses, self.notation)
@@ -0,0 +1,87 @@
+"""
+The report module writes the contents of a Switch or a Comparison to a file one
+object at a time, so that memory stays flat no matter how large the switch is and
+downstream tools can start reading before the report is finished.
+"""
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any, TextIO, Type
+
+from model.switch import Switch
+
+
+def _default(o: Any) -> str:
+    return str(o)
+
+
+class ReportWriter:
+    """
+    A ReportWriter streams records of a Type, an object of that Type and the object's
+    value to a text stream, either as a single JSON document nested by Type name and
+    object, or as JSON Lines holding one record per object.
+
+    The JSON document is byte for byte what `json.dump(..., indent=2)` would write for
+    the equivalent nested dictionary of strings, without ever building that dictionary.
+    """
+
+    def __init__(self, stream: TextIO, json_lines: bool = False):
+        """
+        Create a new ReportWriter.
+
+        :param stream: the text stream to write to
+        :param json_lines: whether to write JSON Lines instead of a single JSON document
+        """
+        self.stream = stream
+        self.json_lines = json_lines
+        self._types = 0
+
+    @classmethod
+    def open(cls, file_path: Path) -> ReportWriter:
+        """
+        Open a file for writing a report. Files with a `.jsonl` suffix are written as JSON Lines.
+
+        :param file_path: the path to the file
+        :return: a ReportWriter
+        """
+        file_path = Path(file_path)
+        return cls(open(file_path, 'w'), json_lines=file_path.suffix == '.jsonl')
+
+    def __enter__(self) -> ReportWriter:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write_type(self, t: Type[Switch.Object], items: Iterable[tuple[Switch.Object, Any]]) -> None:
+        """
+        Write every object of a Type as it is produced.
+
+        :param t: the Type
+        :param items: the objects of the Type and their values
+        """
+        if self.json_lines:
+            for key, value in items:
+                self.stream.write(json.dumps({"type": t.__name__, "key": str(key), "value": value}, default=_default))
+                self.stream.write("\n")
+            self.stream.flush()
+            return
+        self.stream.write(("{\n" if not self._types else ",\n") + f"  {json.dumps(t.__name__)}: {{")
+        self._types += 1
+        written = 0
+        for key, value in items:
+            value = json.dumps(value, default=_default, indent=2).replace("\n", "\n    ")
+            self.stream.write(("\n" if not written else ",\n") + f"    {json.dumps(str(key))}: {value}")
+            written += 1
+        self.stream.write("\n  }" if written else "}")
+        self.stream.flush()
+
+    def close(self) -> None:
+        """
+        Finish the report and close the stream.
+        """
+        if not self.json_lines:
+            self.stream.write("\n}" if self._types else "{}")
+        self.stream.close()
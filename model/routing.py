@@ -0,0 +1,332 @@
+"""
+The routing module holds structures for answering longest prefix match and prefix
+overlap questions about a parsed route table, and for comparing two route tables.
+"""
+from __future__ import annotations
+
+import socket
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+from model.network_objects import Network
+
+
+def address_to_int(address: str | int) -> int:
+    """
+    Convert a dotted quad IPv4 address to an integer.
+
+    :param address: the address as a dotted quad or an integer
+    :return: the address as an integer
+    """
+    if isinstance(address, int):
+        return address
+    try:
+        return int.from_bytes(socket.inet_pton(socket.AF_INET, address), "big")
+    except OSError:
+        raise ValueError(f"{address!r} is not a dotted quad IPv4 address") from None
+
+
+def int_to_address(address: int) -> str:
+    """
+    Convert an integer to a dotted quad IPv4 address.
+
+    :param address: the address as an integer
+    :return: the address as a dotted quad
+    """
+    return f"{address >> 24 & 255}.{address >> 16 & 255}.{address >> 8 & 255}.{address & 255}"
+
+
+# Tables hold few distinct masks, so each is converted once.
+_masks: dict[str, tuple[int, int]] = {}
+
+
+def _mask(mask: str) -> tuple[int, int]:
+    """
+    Convert a dotted quad mask to an integer and a prefix length, and remember the conversion.
+
+    :param mask: the mask as a dotted quad
+    :return: a tuple of the mask as an integer and the prefix length
+    """
+    value = address_to_int(mask)
+    _masks[mask] = value, bin(value).count("1")
+    return _masks[mask]
+
+
+def network_to_prefix(network: Network) -> tuple[int, int]:
+    """
+    Convert a Network to its integer network address and prefix length.
+
+    :param network: the Network
+    :return: a tuple of the network address, with host bits cleared, and the prefix length
+    """
+    mask, length = _masks.get(network.mask) or _mask(network.mask)
+    return address_to_int(network.address) & mask, length
+
+
+def prefix_mask(length: int) -> int:
+    """
+    Return the integer mask of a prefix length.
+
+    :param length: the prefix length
+    :return: the mask as an integer
+    """
+    return (0xFFFFFFFF << (32 - length)) & 0xFFFFFFFF
+
+
+class RouteTable:
+    """
+    A RouteTable indexes the routes parsed from "show ip route" by prefix.
+
+    For every prefix length present in the table, the network addresses of that
+    length are held in a sorted integer array alongside the position of their
+    route. A longest prefix match probes the lengths from longest to shortest
+    with a binary search each, and the prefixes covered by a network are a
+    contiguous range of each longer length's array. This costs a few bytes per
+    prefix on top of the parsed routes themselves, which suits full tables of
+    a million prefixes.
+    """
+
+    def __init__(self, routes: dict[Network, Any]):
+        """
+        Create a new RouteTable.
+
+        :param routes: the parsed routes, such as the Network data of a Switch
+        """
+        self._networks: list[Network] = list(routes)
+        self._values: list[Any] = list(routes.values())
+        by_length: dict[int, list[tuple[int, int]]] = {}
+        for position, network in enumerate(self._networks):
+            address, length = network_to_prefix(network)
+            by_length.setdefault(length, []).append((address, position))
+        self._prefixes: dict[int, tuple[array, array]] = {}
+        for length, prefixes in by_length.items():
+            prefixes.sort()
+            self._prefixes[length] = (array("I", (a for a, _ in prefixes)), array("I", (p for _, p in prefixes)))
+        # Longest prefix matches probe the longest prefix lengths first.
+        self._lengths = sorted(self._prefixes, reverse=True)
+
+    def __len__(self) -> int:
+        return len(self._networks)
+
+    def __iter__(self) -> Iterator[tuple[Network, Any]]:
+        return zip(self._networks, self._values)
+
+    def __contains__(self, network: Network) -> bool:
+        address, length = network_to_prefix(network)
+        return self._find(address, length) is not None
+
+    def _find(self, address: int, length: int) -> int | None:
+        """
+        Find the position of the route with exactly the given prefix.
+
+        :param address: the network address as an integer
+        :param length: the prefix length
+        :return: the position of the route, or None if there is no such route
+        """
+        if length not in self._prefixes:
+            return None
+        addresses, positions = self._prefixes[length]
+        i = bisect_left(addresses, address)
+        if i < len(addresses) and addresses[i] == address:
+            return positions[i]
+        return None
+
+    def lookup(self, address: str | int) -> tuple[Network, Any] | None:
+        """
+        Find the route with the longest prefix that matches an address.
+
+        :param address: the address as a dotted quad or an integer
+        :return: a tuple of the matching Network and its route data, or None if no route matches
+        """
+        address = address_to_int(address)
+        for length in self._lengths:
+            position = self._find(address & prefix_mask(length), length)
+            if position is not None:
+                return self._networks[position], self._values[position]
+        return None
+
+    def lookup_many(self, addresses: Iterable[str | int]) -> list[tuple[Network, Any] | None]:
+        """
+        Find the longest prefix match of many addresses at once.
+        Each prefix length is probed for every unresolved address in turn, so
+        addresses resolved by long prefixes are never probed against short ones.
+
+        :param addresses: the addresses as dotted quads or integers
+        :return: the matching Network and route data of each address, in the order given
+        """
+        addresses = [address_to_int(a) for a in addresses]
+        results: list[tuple[Network, Any] | None] = [None] * len(addresses)
+        unresolved = list(range(len(addresses)))
+        for length in self._lengths:
+            if not unresolved:
+                break
+            mask = prefix_mask(length)
+            prefixes, positions = self._prefixes[length]
+            remaining = []
+            for i in unresolved:
+                key = addresses[i] & mask
+                j = bisect_left(prefixes, key)
+                if j < len(prefixes) and prefixes[j] == key:
+                    results[i] = self._networks[positions[j]], self._values[positions[j]]
+                else:
+                    remaining.append(i)
+            unresolved = remaining
+        return results
+
+    def covering(self, network: Network) -> list[tuple[Network, Any]]:
+        """
+        Find the routes whose prefix contains a network, including the network itself.
+
+        :param network: the Network
+        :return: the covering Networks and their route data, from the longest prefix to the shortest
+        """
+        address, length = network_to_prefix(network)
+        found = (self._find(address & prefix_mask(l), l) for l in self._lengths if l <= length)
+        return [(self._networks[p], self._values[p]) for p in found if p is not None]
+
+    def covered(self, network: Network) -> list[tuple[Network, Any]]:
+        """
+        Find the routes whose prefix is contained in a network, including the network itself.
+
+        :param network: the Network
+        :return: the covered Networks and their route data, ordered by prefix length and then address
+        """
+        address, length = network_to_prefix(network)
+        end = address + (1 << (32 - length))
+        routes = []
+        for l in sorted(l for l in self._lengths if l >= length):
+            prefixes, positions = self._prefixes[l]
+            for i in range(bisect_left(prefixes, address), bisect_left(prefixes, end)):
+                routes.append((self._networks[positions[i]], self._values[positions[i]]))
+        return routes
+
+    def overlapping(self, network: Network) -> list[tuple[Network, Any]]:
+        """
+        Find the routes whose prefix overlaps a network in either direction.
+
+        :param network: the Network
+        :return: the covering and the covered Networks and their route data
+        """
+        routes = self.covering(network)
+        return routes + [route for route in self.covered(network) if not route[0] == network]
+
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+AGGREGATED = "aggregated"
+DEAGGREGATED = "deaggregated"
+
+
+@dataclass
+class RouteChange:
+    """
+    A RouteChange describes a single difference between two route tables.
+
+    An added route that covers removed routes is reported once as aggregated, with
+    the removed routes as its specifics, and a removed route that is covered by
+    added routes is reported once as deaggregated, with the added routes as its
+    specifics. The old and new values are the route data of the network, if any.
+    """
+    kind: str
+    network: Network
+    old: Any = None
+    new: Any = None
+    specifics: list[Network] = field(default_factory=list)
+
+
+def _ordered(routes: dict[Network, Any] | Iterable[tuple[Network, Any]]) -> tuple[list[int], list[Network], list[Any]]:
+    """
+    Order routes by network address and then by prefix length, so that every route
+    comes before the routes it covers.
+
+    :param routes: the parsed routes, or pairs of Networks and their route data
+    :return: the sorted keys, holding the prefix above the position of the route, and the Networks and route data
+    """
+    if isinstance(routes, dict):
+        networks, values = list(routes), list(routes.values())
+    else:
+        networks, values = [], []
+        for network, value in routes:
+            networks.append(network)
+            values.append(value)
+    # The prefix and position are packed into one integer so that sorting compares integers only.
+    # This is network_to_prefix, inlined for the million routes of a full table.
+    pton, family, masks = socket.inet_pton, socket.AF_INET, _masks
+    keys = []
+    for position, network in enumerate(networks):
+        prefix = masks.get(network.mask) or _mask(network.mask)
+        address = int.from_bytes(pton(family, network.address), "big") & prefix[0]
+        keys.append((address << 6 | prefix[1]) << 32 | position)
+    keys.sort()
+    return keys, networks, values
+
+
+def diff_routes(
+        old: dict[Network, Any] | Iterable[tuple[Network, Any]],
+        new: dict[Network, Any] | Iterable[tuple[Network, Any]],
+        shortest_aggregate: int = 8
+) -> Iterator[RouteChange]:
+    """
+    Compare two route tables with a single merge of both tables ordered by prefix.
+
+    Routes are reported in prefix order as they are found, except that an added or removed
+    route is reported once every route it covers has been seen, since those may turn it
+    into an aggregation. Only the added and removed routes still open, of which there are
+    at most one per prefix length, are held while merging.
+
+    :param old: the old parsed routes, such as the Network data of a Switch or a RouteTable
+    :param new: the new parsed routes
+    :param shortest_aggregate: the shortest prefix length reported as an aggregation, so
+        that a new default route is not reported as aggregating the whole table
+    :return: the RouteChanges
+    """
+    old_keys, old_networks, old_values = _ordered(old)
+    new_keys, new_networks, new_values = _ordered(new)
+    i, j, old_count, new_count = 0, 0, len(old_keys), len(new_keys)
+    # Each open route is held with the end of its range of addresses and its prefix length.
+    open_routes: list[tuple[int, int, RouteChange]] = []
+    while i < old_count or j < new_count:
+        o = old_keys[i] if i < old_count else None
+        n = new_keys[j] if j < new_count else None
+        if n is None or (o is not None and o >> 32 < n >> 32):
+            key, network = o >> 32, old_networks[o & 0xFFFFFFFF]
+            change = RouteChange(REMOVED, network, old=old_values[o & 0xFFFFFFFF])
+            i += 1
+        elif o is None or n >> 32 < o >> 32:
+            key, network = n >> 32, new_networks[n & 0xFFFFFFFF]
+            change = RouteChange(ADDED, network, new=new_values[n & 0xFFFFFFFF])
+            j += 1
+        else:
+            key, network = n >> 32, new_networks[n & 0xFFFFFFFF]
+            old_value, new_value = old_values[o & 0xFFFFFFFF], new_values[n & 0xFFFFFFFF]
+            change = RouteChange(CHANGED, network, old=old_value, new=new_value) if old_value != new_value else None
+            i += 1
+            j += 1
+        address, length = key >> 6, key & 63
+        # Every open route whose range ends before this route has seen all the routes it covers.
+        while open_routes and open_routes[-1][0] <= address:
+            yield _close(open_routes.pop()[2])
+        if change is None:
+            continue
+        if change.kind is CHANGED:
+            yield change
+            continue
+        opposite = REMOVED if change.kind is ADDED else ADDED
+        for _, covering_length, covering in reversed(open_routes):
+            if covering.kind is opposite and covering_length >= shortest_aggregate:
+                covering.specifics.append(network)
+                break
+        else:
+            open_routes.append((address + (1 << (32 - length)), length, change))
+    while open_routes:
+        yield _close(open_routes.pop()[2])
+
+
+def _close(change: RouteChange) -> RouteChange:
+    if change.specifics:
+        change.kind = AGGREGATED if change.kind is ADDED else DEAGGREGATED
+    return change
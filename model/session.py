@@ -0,0 +1,233 @@
+"""
+The session module holds many switches in a single process within a memory budget.
+"""
+from __future__ import annotations
+
+import sys
+import types
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+from model import codec
+from model.network_objects import Interned
+from model.switch import Switch
+
+# Classes, functions and modules are shared by every Switch, so they are never counted.
+_SHARED = (type, types.FunctionType, types.BuiltinFunctionType, types.MethodType, types.ModuleType)
+_slots: dict[type, tuple[str, ...]] = {}
+
+
+def _slot_names(t: type) -> tuple[str, ...]:
+    names = _slots.get(t)
+    if names is None:
+        names = []
+        for c in t.__mro__:
+            slots = c.__dict__.get('__slots__', ())
+            for name in (slots,) if isinstance(slots, str) else slots:
+                if name not in ('__dict__', '__weakref__'):
+                    names.append(name)
+        names = _slots[t] = tuple(names)
+    return names
+
+
+def _measure(roots: Iterable[Any], seen: set[int], interned: bool) -> int:
+    size = 0
+    pending = list(roots)
+    while pending:
+        o = pending.pop()
+        if id(o) in seen or isinstance(o, _SHARED) or (not interned and isinstance(type(o), Interned)):
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+        if isinstance(o, dict):
+            pending.extend(o.keys())
+            pending.extend(o.values())
+        elif isinstance(o, (list, tuple, set, frozenset)):
+            pending.extend(o)
+        if hasattr(o, '__dict__'):
+            pending.extend(vars(o).values())
+        for name in _slot_names(type(o)):
+            pending.append(getattr(o, name, None))
+    return size
+
+
+def footprint(o: Any) -> int:
+    """
+    Estimate the memory held by an object and by everything it references, counting each object once.
+    Interned values are shared by every object using them rather than held by any one, so they are
+    not counted, see `interned_footprint`.
+
+    :param o: the object, such as a Switch
+    :return: the estimated size in bytes
+    """
+    return _measure([o], set(), interned=False)
+
+
+def interned_footprint() -> int:
+    """
+    Estimate the memory held by the interned values in use, each counted once however many objects share it.
+
+    :return: the estimated size in bytes
+    """
+    roots = []
+    for t in codec.object_types().values():
+        if isinstance(t, Interned):
+            roots.extend(t._interned.values())
+    return _measure(roots, set(), interned=True)
+
+
+def _parsed(switch: Switch) -> tuple:
+    # What a lazily parsing Switch has parsed so far, which only changes as it parses more.
+    return (
+        getattr(switch, '_complete', None),
+        len(getattr(switch, '_data_store', None) or ()),
+        len(getattr(switch, '_merged', None) or ())
+    )
+
+
+class Session:
+    """
+    A Session holds many Switch objects by name, loading each one the first time it is needed.
+
+    The parsed data of every loaded Switch counts against a memory budget. Once the budget is
+    exceeded the least recently used switches are evicted, and are loaded again the next time
+    they are needed, which reads them from the ParseCache given to the load function if any.
+
+    Because a Switch parses its data lazily, the footprint of a Switch is measured when it is
+    loaded, and again when another Switch is requested or the session is trimmed if it has parsed
+    more since. The interned values the switches share are measured once for the whole session
+    whenever a Switch is measured. A Switch still referenced outside of the session is not freed
+    by its eviction.
+    """
+
+    def __init__(
+            self,
+            load: Callable[[Path], Switch],
+            max_bytes: int = 1 << 30,
+            measure: Callable[[Switch], int] = footprint,
+            measure_shared: Callable[[], int] = interned_footprint
+    ):
+        """
+        Create a new Session.
+
+        :param load: the function loading a Switch from a path, such as `VOSS.load`
+        :param max_bytes: the memory budget for the loaded switches
+        :param measure: the function estimating the memory held by a Switch
+        :param measure_shared: the function estimating the memory shared by every Switch
+        """
+        self.load = load
+        self.max_bytes = max_bytes
+        self.measure = measure
+        self.measure_shared = measure_shared
+        self._paths: dict[str, Path] = {}
+        self._loaded: OrderedDict[str, Switch] = OrderedDict()
+        self._sizes: dict[str, int] = {}
+        # What each loaded switch had parsed when it was measured.
+        self._measured: dict[str, tuple] = {}
+        self._shared = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def add(self, name: str, path: Path) -> None:
+        """
+        Add a switch to the session without loading it.
+        Adding a name again replaces its path and evicts the switch loaded from the old one.
+
+        :param name: the name of the switch
+        :param path: the path to load the switch from
+        """
+        self._paths[name] = Path(path)
+        self.evict(name)
+
+    def __getitem__(self, name: str) -> Switch:
+        """
+        Get a switch, loading it if it is not loaded, and evict the least recently used
+        switches if the memory budget is exceeded.
+
+        :param name: the name of the switch
+        :return: the Switch
+        """
+        measured = False
+        if self._loaded:
+            # The most recently used switch is the only one that may have parsed more data since it was measured.
+            measured = self._measure(next(reversed(self._loaded)))
+        switch = self._loaded.get(name)
+        if switch is None:
+            switch = self.load(self._paths[name])
+            self.loads += 1
+            self._loaded[name] = switch
+            measured = self._measure(name) or measured
+        if measured:
+            self._shared = self.measure_shared()
+        self._loaded.move_to_end(name)
+        self._enforce()
+        return switch
+
+    def trim(self) -> None:
+        """
+        Measure every loaded switch and evict the least recently used switches
+        until the memory budget is met.
+        """
+        if any([self._measure(name) for name in self._loaded]):
+            self._shared = self.measure_shared()
+        self._enforce()
+
+    def _measure(self, name: str) -> bool:
+        """
+        Measure a loaded switch, unless it has parsed nothing since it was last measured.
+
+        :param name: the name of the switch
+        :return: whether the switch was measured
+        """
+        switch = self._loaded[name]
+        parsed = _parsed(switch)
+        if self._measured.get(name) == parsed:
+            return False
+        self._sizes[name] = self.measure(switch)
+        self._measured[name] = parsed
+        return True
+
+    def _enforce(self) -> None:
+        # The most recently used switch is always kept, even when it alone exceeds the budget.
+        while len(self._loaded) > 1 and self.size > self.max_bytes:
+            self.evict(next(iter(self._loaded)))
+
+    def evict(self, name: str) -> None:
+        """
+        Drop the parsed data of a switch, if it is loaded, and close the file it was parsed from.
+
+        :param name: the name of the switch
+        """
+        switch = self._loaded.pop(name, None)
+        if switch is not None:
+            source = getattr(switch, 'tech_file', None)
+            if source is not None:
+                source.close()
+            del self._sizes[name]
+            del self._measured[name]
+            self.evictions += 1
+
+    @property
+    def size(self) -> int:
+        """
+        The memory held by the loaded switches, and by the values they share, when they were last measured.
+        """
+        return sum(self._sizes.values()) + self._shared
+
+    @property
+    def loaded(self) -> list[str]:
+        """
+        The names of the loaded switches from the least to the most recently used.
+        """
+        return list(self._loaded)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._paths
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
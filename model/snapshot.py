@@ -0,0 +1,467 @@
+"""
+The snapshot module saves the parsed data of a Switch to a compact binary file, and loads
+it back with the same Types, one Type at a time if need be.
+
+A snapshot file starts with a header holding the format version and the offset of a table
+of contents written after the data. The data of each Type is a self-contained block of
+atoms and rows. Every distinct value of a block is an atom stored once, and everything
+else refers to atoms by their index. The atoms are stored in segments of a single kind,
+each segment only referring to the atoms of the segments before it:
+
+    strings   every string, separated by NUL characters
+    objects   the Switch.Objects of a single Type, as a column of atoms for each field
+    macs      the MacAddresses, as columns of notations and lengths followed by one column
+              of the 64-bit integer addresses of them all
+    values    any other value, such as integers or lists, in a tagged encoding
+
+The rows are a column of the key atom of each object and a column of the shape of each
+object's value, where a shape is a tuple of attribute names. The values of the objects of
+each shape are then stored as a column of atoms for each attribute, so that the objects of
+a Type, the MAC addresses of a Switch and the routes of a routing table are all read back
+a column at a time.
+
+All the integers are little-endian, and the indices are unsigned 32-bit integers.
+"""
+from __future__ import annotations
+
+import gc
+import struct
+import sys
+from array import array
+from collections.abc import Iterable, Iterator
+from dataclasses import fields
+from itertools import repeat
+from pathlib import Path
+from typing import Any, BinaryIO, Type
+
+from model import codec
+from model.network_objects import Interned, MacAddresses
+from model.switch import Switch
+
+MAGIC = b"PURPLESN"
+VERSION = 1
+
+_HEADER = struct.Struct("<8sHHQ")
+_U32 = struct.Struct("<I")
+_U16 = struct.Struct("<H")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+
+# The shape of an object whose value is a single atom rather than a dictionary of attributes.
+NO_SHAPE = 0xFFFFFFFF
+
+SEGMENT_STRINGS, SEGMENT_OBJECTS, SEGMENT_MACS, SEGMENT_VALUES = range(4)
+TAG_NONE, TAG_TRUE, TAG_FALSE, TAG_INT, TAG_FLOAT, TAG_LIST, TAG_TUPLE, TAG_DICT = range(8)
+
+_STRINGS = (SEGMENT_STRINGS,)
+_MACS = (SEGMENT_MACS,)
+_VALUES = (SEGMENT_VALUES,)
+
+
+def _column(values: Iterable[int], typecode: str = "I") -> bytes:
+    column = array(typecode, values)
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column.tobytes()
+
+
+def _read_column(buffer: memoryview, offset: int, count: int, typecode: str = "I") -> tuple[array, int]:
+    column = array(typecode)
+    end = offset + count * column.itemsize
+    column.frombytes(buffer[offset:end])
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column, end
+
+
+def is_snapshot(file_path: Path) -> bool:
+    """
+    :param file_path: the path to a file
+    :return: whether the file is a snapshot
+    """
+    with open(file_path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+_kinds: dict[type, tuple] = {}
+
+
+def _kind(t: type) -> tuple:
+    # The segment of the values of each type, with the field names of a Switch.Object, is worked out once.
+    if issubclass(t, str):
+        kind = _STRINGS
+    elif issubclass(t, MacAddresses):
+        kind = _MACS
+    elif issubclass(t, Switch.Object):
+        kind = (SEGMENT_OBJECTS, t, tuple(f.name for f in fields(t)))
+    elif t is type(None) or issubclass(t, (int, float, dict, list, tuple)):
+        kind = _VALUES
+    else:
+        raise TypeError(f'A {t.__name__} cannot be stored in a snapshot.')
+    _kinds[t] = kind
+    return kind
+
+
+class _BlockWriter:
+    """
+    A _BlockWriter encodes the data of a single Type into a block.
+
+    Each atom is given a provisional index as it is found, along with the segment it belongs
+    to and its depth, which is one more than the depth of the deepest atom it refers to.
+    The segments are written in order of depth, and the atoms are given their final index
+    in the order they are written.
+    """
+
+    def __init__(self):
+        self.atoms: dict[Any, int] = {}
+        self.values: list[Any] = []
+        self.references: list[tuple[int, ...]] = []
+        self.segments: dict[tuple, list[int]] = {_STRINGS: []}
+        self.depths: list[int] = []
+
+    def atom(self, value: Any) -> int:
+        t = type(value)
+        kind = _kinds.get(t) or _kind(t)
+        # Equal values are stored once, except that values such as True and 1 are told apart by their
+        # type, floats such as 0.0 and -0.0 by their bits, and tuples by the atoms they hold, so that
+        # (1, 2) and (True, 2) are not shared. MacAddresses are equal whatever their notation, so they
+        # are never shared.
+        key = None
+        if kind is not _MACS and t is not tuple:
+            try:
+                key = (t, _F64.pack(value)) if t is float else (t, value)
+                index = self.atoms.get(key)
+            except TypeError:
+                key, index = None, None
+            if index is not None:
+                return index
+        segment = kind
+        if kind is _STRINGS:
+            references = ()
+        elif kind is _MACS:
+            references = (self.atom(value.notation),)
+        elif kind is not _VALUES:
+            segment = kind[:2]
+            references = tuple([self.atom(getattr(value, name)) for name in kind[2]])
+        elif isinstance(value, dict):
+            references = tuple([self.atom(v) for item in value.items() for v in item])
+        elif isinstance(value, (list, tuple)):
+            references = tuple([self.atom(v) for v in value])
+            if t is tuple:
+                key = (t, references)
+                index = self.atoms.get(key)
+                if index is not None:
+                    return index
+        else:
+            references = ()
+        index = len(self.values)
+        self.values.append(value)
+        self.references.append(references)
+        depth = 1 + max([self.depths[r] for r in references]) if references else 0
+        self.depths.append(depth)
+        self.segments.setdefault((depth, segment) if segment is not _STRINGS else _STRINGS, []).append(index)
+        if key is not None:
+            self.atoms[key] = index
+        return index
+
+    def block(self, data: dict[Switch.Object, Any]) -> bytes:
+        keys, shape_column = [], []
+        shapes: dict[tuple[str, ...] | None, int] = {}
+        rows: list[list[list[int]]] = []
+        for key, value in data.items():
+            keys.append(self.atom(key))
+            shape = tuple(value) if isinstance(value, dict) and all(type(k) is str for k in value) else None
+            index = shapes.get(shape)
+            if index is None:
+                index = shapes[shape] = len(shapes)
+                rows.append([])
+            shape_column.append(index)
+            rows[index].append([self.atom(v) for v in value.values()] if shape is not None else [self.atom(value)])
+        names = [[self.atom(name) for name in shape] if shape is not None else None for shape in shapes]
+
+        # The strings come first, then every other segment from the shallowest to the deepest.
+        order = sorted((s for s in self.segments if s is not _STRINGS), key=lambda s: s[0])
+        final = [0] * len(self.values)
+        position = 0
+        for segment in (_STRINGS, *order):
+            for index in self.segments[segment]:
+                final[index] = position
+                position += 1
+
+        out = bytearray(_U32.pack(len(self.segments)))
+        out += self._strings(self.segments[_STRINGS])
+        for depth, segment in order:
+            out += self._segment(segment, self.segments[depth, segment], final)
+
+        out += _U32.pack(len(keys)) + _column(final[k] for k in keys) + _column(shape_column)
+        out += _U32.pack(len(shapes))
+        for shape_names, shape_rows in zip(names, rows):
+            if shape_names is None:
+                out += _U32.pack(NO_SHAPE)
+                width = 1
+            else:
+                out += _U32.pack(len(shape_names)) + _column(final[n] for n in shape_names)
+                width = len(shape_names)
+            out += _U32.pack(len(shape_rows))
+            for i in range(width):
+                out += _column(final[row[i]] for row in shape_rows)
+        return bytes(out)
+
+    def _strings(self, indices: list[int]) -> bytes:
+        encoded = [self.values[i].encode(errors='surrogatepass') for i in indices]
+        if any(b"\0" in s for s in encoded):
+            # A string holding a NUL character cannot be separated by one, so every length is stored instead.
+            return b"".join([
+                bytes([SEGMENT_STRINGS, 1]), _U32.pack(len(encoded)), _column(len(s) for s in encoded), *encoded
+            ])
+        joined = b"\0".join(encoded)
+        return bytes([SEGMENT_STRINGS, 0]) + _U32.pack(len(encoded)) + _U32.pack(len(joined)) + joined
+
+    def _segment(self, segment: tuple, indices: list[int], final: list[int]) -> bytes:
+        kind = segment[0]
+        if kind == SEGMENT_OBJECTS:
+            name = segment[1].__name__.encode()
+            width = len(fields(segment[1]))
+            out = bytearray([SEGMENT_OBJECTS]) + _U16.pack(len(name)) + name + bytes([width])
+            out += _U32.pack(len(indices))
+            for i in range(width):
+                out += _column(final[self.references[index][i]] for index in indices)
+            return bytes(out)
+        if kind == SEGMENT_MACS:
+            macs = [self.values[index] for index in indices]
+            return b"".join([
+                bytes([SEGMENT_MACS]), _U32.pack(len(macs)),
+                _column(final[self.references[index][0]] for index in indices),
+                _column(len(m.addresses) for m in macs),
+                *(_column(m.addresses, "Q") for m in macs),
+            ])
+        out = bytearray()
+        for index in indices:
+            value = self.values[index]
+            references = [final[r] for r in self.references[index]]
+            if value is None:
+                out.append(TAG_NONE)
+            elif value is True or value is False:
+                out.append(TAG_TRUE if value else TAG_FALSE)
+            elif isinstance(value, int):
+                out.append(TAG_INT)
+                out += _I64.pack(value)
+            elif isinstance(value, float):
+                out.append(TAG_FLOAT)
+                out += _F64.pack(value)
+            else:
+                out.append(TAG_DICT if isinstance(value, dict) else TAG_TUPLE if isinstance(value, tuple) else TAG_LIST)
+                out += _U32.pack(len(references)) + _column(references)
+        return bytes([SEGMENT_VALUES]) + _U32.pack(len(indices)) + _U32.pack(len(out)) + out
+
+
+def write_snapshot(file_path: Path, data: Iterable[tuple[Type[Switch.Object], dict[Switch.Object, Any]]]) -> None:
+    """
+    Write the parsed data of a Switch to a snapshot file, one Type at a time.
+
+    :param file_path: the path to the new file
+    :param data: the Types and the data of each Type, such as a Switch
+    """
+    contents = []
+    with open(file_path, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, 0))
+        for t, d in data:
+            block = _BlockWriter().block(d)
+            contents.append((t.__name__, f.tell(), len(block)))
+            f.write(block)
+        table_offset = f.tell()
+        f.write(_U32.pack(len(contents)))
+        for name, offset, length in contents:
+            encoded = name.encode()
+            f.write(_U16.pack(len(encoded)) + encoded + struct.pack("<QQ", offset, length))
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, table_offset))
+
+
+class Snapshot:
+    """
+    A Snapshot reads the parsed data of a Switch from a snapshot file.
+    Only the table of contents is read when the Snapshot is opened, and the block of each
+    Type is read when that Type is requested.
+    """
+
+    def __init__(self, file_path: Path):
+        """
+        Open a snapshot file.
+
+        :param file_path: the path to the snapshot file
+        """
+        self.file_path = Path(file_path)
+        self._types = codec.object_types()
+        with open(self.file_path, 'rb') as f:
+            magic, version, _, table_offset = _HEADER.unpack(f.read(_HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f'{self.file_path} is not a snapshot.')
+            if version > VERSION:
+                raise ValueError(f'{self.file_path} is a version {version} snapshot, newer than version {VERSION}.')
+            self.version = version
+            f.seek(table_offset)
+            self.contents: dict[str, tuple[int, int]] = {}
+            for _ in range(_U32.unpack(f.read(4))[0]):
+                name = f.read(_U16.unpack(f.read(2))[0]).decode()
+                self.contents[name] = struct.unpack("<QQ", f.read(16))
+
+    def types(self) -> list[Type[Switch.Object]]:
+        """
+        :return: the Types held by the snapshot, in the order they were written
+        """
+        return [self._types[name] for name in self.contents]
+
+    def __contains__(self, t: Type[Switch.Object]) -> bool:
+        return t.__name__ in self.contents
+
+    def __iter__(self) -> Iterator[tuple[Type[Switch.Object], dict[Switch.Object, Any]]]:
+        with open(self.file_path, 'rb') as f:
+            for name in self.contents:
+                yield self._types[name], self._read(f, name)
+
+    def read(self, t: Type[Switch.Object]) -> dict[Switch.Object, Any] | None:
+        """
+        Read the data of a single Type.
+
+        :param t: the Type
+        :return: the data of the Type, or None if the snapshot does not hold the Type
+        """
+        if t.__name__ not in self.contents:
+            return None
+        with open(self.file_path, 'rb') as f:
+            return self._read(f, t.__name__)
+
+    def _read(self, f: BinaryIO, name: str) -> dict[Switch.Object, Any]:
+        offset, length = self.contents[name]
+        f.seek(offset)
+        # A block only creates objects, none of which can be garbage until it has been read, so the
+        # collector is paused rather than left to traverse the growing data over and over again.
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            return _BlockReader(memoryview(f.read(length)), self._types).data()
+        finally:
+            if collecting:
+                gc.enable()
+
+
+class _BlockReader:
+    """
+    A _BlockReader decodes the data of a single Type from a block.
+    """
+
+    def __init__(self, buffer: memoryview, types: dict[str, Type[Switch.Object]]):
+        self.buffer = buffer
+        self.types = types
+        self.position = 0
+        self.atoms: list[Any] = []
+
+    def u32(self) -> int:
+        value, = _U32.unpack_from(self.buffer, self.position)
+        self.position += 4
+        return value
+
+    def column(self, count: int, typecode: str = "I") -> array:
+        column, self.position = _read_column(self.buffer, self.position, count, typecode)
+        return column
+
+    def atom_column(self, count: int) -> list[Any]:
+        return list(map(self.atoms.__getitem__, self.column(count)))
+
+    def data(self) -> dict[Switch.Object, Any]:
+        for _ in range(self.u32()):
+            kind = self.buffer[self.position]
+            self.position += 1
+            if kind == SEGMENT_STRINGS:
+                self.strings()
+            elif kind == SEGMENT_OBJECTS:
+                self.objects()
+            elif kind == SEGMENT_MACS:
+                self.macs()
+            elif kind == SEGMENT_VALUES:
+                self.values()
+            else:
+                raise ValueError(f'Unknown segment {kind} in snapshot.')
+        rows = self.u32()
+        keys = self.atom_column(rows)
+        shape_column = self.column(rows)
+        values = []
+        for _ in range(self.u32()):
+            width = self.u32()
+            names = self.atom_column(width) if width != NO_SHAPE else None
+            count = self.u32()
+            if names is None:
+                values.append(iter(self.atom_column(count)))
+            else:
+                columns = [self.atom_column(count) for _ in names]
+                values.append(map(dict, map(zip, repeat(names), zip(*columns))))
+        # The values of each shape are taken in turn in the order of the rows.
+        return dict(zip(keys, map(next, map(values.__getitem__, shape_column))))
+
+    def strings(self) -> None:
+        buffer = self.buffer
+        separated = buffer[self.position] == 0
+        self.position += 1
+        count = self.u32()
+        if separated:
+            length = self.u32()
+            end = self.position + length
+            if count:
+                self.atoms.extend(str(buffer[self.position:end], 'utf-8', 'surrogatepass').split("\0"))
+            self.position = end
+        else:
+            for length in self.column(count):
+                self.atoms.append(str(buffer[self.position:self.position + length], 'utf-8', 'surrogatepass'))
+                self.position += length
+
+    def objects(self) -> None:
+        length, = _U16.unpack_from(self.buffer, self.position)
+        self.position += 2
+        t = self.types[str(self.buffer[self.position:self.position + length], 'utf-8')]
+        width = self.buffer[self.position + length]
+        self.position += length + 1
+        count = self.u32()
+        if width and isinstance(t, Interned):
+            self.atoms.extend(t.intern_many(zip(*[self.atom_column(count) for _ in range(width)])))
+        elif width:
+            self.atoms.extend(map(t, *[self.atom_column(count) for _ in range(width)]))
+        else:
+            self.atoms.extend(t() for _ in range(count))
+
+    def macs(self) -> None:
+        count = self.u32()
+        notations = self.atom_column(count)
+        lengths = self.column(count)
+        addresses = self.column(sum(lengths), "Q")
+        start = 0
+        for notation, length in zip(notations, lengths):
+            self.atoms.append(MacAddresses(addresses[start:start + length], notation))
+            start += length
+
+    def values(self) -> None:
+        buffer = self.buffer
+        atoms = self.atoms
+        count = self.u32()
+        self.position += 4
+        for _ in range(count):
+            tag = buffer[self.position]
+            self.position += 1
+            if tag == TAG_NONE:
+                atoms.append(None)
+            elif tag == TAG_TRUE or tag == TAG_FALSE:
+                atoms.append(tag == TAG_TRUE)
+            elif tag == TAG_INT:
+                atoms.append(_I64.unpack_from(buffer, self.position)[0])
+                self.position += 8
+            elif tag == TAG_FLOAT:
+                atoms.append(_F64.unpack_from(buffer, self.position)[0])
+                self.position += 8
+            elif tag == TAG_LIST or tag == TAG_TUPLE or tag == TAG_DICT:
+                items = self.atom_column(self.u32())
+                if tag == TAG_DICT:
+                    atoms.append(dict(zip(items[::2], items[1::2])))
+                else:
+                    atoms.append(items if tag == TAG_LIST else tuple(items))
+            else:
+                raise ValueError(f'Unknown tag {tag} in snapshot.')
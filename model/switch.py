@@ -1,11 +1,22 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from collections.abc import Collection, Iterable
-from typing import Any, Callable, Type
+from collections.abc import Collection, Iterable, Iterator
+from typing import Any, Callable, Type, TYPE_CHECKING
 from pathlib import Path
 
+import hashlib
+import io
 import json
+import mmap
+import time
+
+from model import compression
+from model.compression import CompressedBuffer
+
+if TYPE_CHECKING:
+    from model.cache import ParseCache
+    from model.instrument import Instrumentation
 
 
 class SourceData:
@@ -16,49 +27,210 @@ class SourceData:
     injected into the class at runtime by the parser decorator.
 
     The SourceData can be iterated over to parse the output of each command.
-    Using a `with` statement, the SourceData can be refreshed.
+    Using a `with` statement, the file holding the raw data is closed on leaving it.
+
+    A SourceData loaded without an index reads its data stream at most once, from the start
+    to the end. Every section is hashed as it is read, and the sections that are not parsed
+    straight away are kept as raw lines until they are needed, so that parsing more commands
+    later never reads the stream again.
+
+    When loaded with an index, the raw data is memory-mapped and the byte offsets
+    of every command section are recorded up front, so that any single command
+    can be parsed by reading only its own section.
+
+    Raw data compressed with gzip, bzip2 or xz is decompressed as it is read.
+    An index of gzip compressed raw data records where decompression can resume for
+    each section, see `CompressedBuffer`. Raw data compressed with bzip2 or xz cannot
+    resume in the middle, so it is streamed even when an index is asked for.
+
+    When given a `ParseCache`, each command section is looked up in the cache
+    before it is parsed, and the parsed output of every miss is stored in it.
+
+    Every command section is hashed before it is parsed. When given a previous
+    SourceData, such as an earlier collection from the same switch, the parsed
+    output of any section whose hash is unchanged is reused instead of parsed.
 
     Attributes:
         _data_stream: the raw data
-        _commands: a dictionary of commands and their associated parsing methods
-        _data_store: a dictionary of parsed data
+        _commands: a dictionary of commands and their associated parsing methods, per subclass
+        _versions: a dictionary of commands and the version of their parsing methods
+        _produces: a dictionary of commands and the Switch.Object Types their parsing methods produce
+        data_store: a dictionary of parsed data, per instance
+        _buffer: the memory-mapped or compressed raw data when indexed
+        _sections: the byte offsets of each command section when indexed
+        _order: the commands of the sections read from the data stream so far, in the order they appear
+        _pending: the raw lines of the sections read from the data stream but not yet parsed
+        cache: the cache of parsed command sections
+        previous: the SourceData to reuse the parsed output of unchanged sections from
+        digests: a dictionary of commands and the hash of their sections
+        hashed: whether the section of every command has been hashed, see `hash_sections`
+        reused: the commands whose parsed output was reused from the previous SourceData
+        instrumentation: the Instrumentation measuring the extraction and parsing of each section
     """
 
     _commands: dict[str, Callable] = {}
-    data_store: dict[str, dict[Switch.Object, Any]] = {}
+    _versions: dict[str, str] = {}
+    _produces: dict[str, tuple[Type[Switch.Object], ...] | None] = {}
+    data_store: dict[str, dict[Switch.Object, Any]]
     data_stream: Iterable[str] = None
+    _buffer: mmap.mmap | bytes | CompressedBuffer | None = None
+    _sections: dict[str, tuple[int, int]] | None = None
+    cache: ParseCache | None = None
+    previous: SourceData | None = None
+    file_path: Path | None = None
+    instrumentation: Instrumentation | None = None
+    hashed: bool = False
+
+    def __init_subclass__(cls, **kwargs):
+        # Each subclass registers its parsing methods in registries of its own, starting from
+        # those of its parent, so that the parsers of one platform never leak into another.
+        super().__init_subclass__(**kwargs)
+        cls._commands = dict(cls._commands)
+        cls._versions = dict(cls._versions)
+        cls._produces = dict(cls._produces)
+
+    def __init__(self):
+        # The parsed output belongs to this SourceData alone, so that it can be told apart from,
+        # and reused by, another SourceData of the same class.
+        self.data_store = {}
+        self.digests: dict[str, str] = {}
+        self.reused: set[str] = set()
+        self._order: list[str] = []
+        self._pending: dict[str, tuple[list[str], float]] = {}
+        self._extracting: Iterator[tuple[str, list[str]]] | None = None
+        self._exhausted = False
 
     @classmethod
     @abstractmethod
     def extractor(cls, text_lines: Iterable[str], command_set: Collection[str]) -> (str, list[str]): ...
 
     @classmethod
-    def load(cls, file_path: Path) -> SourceData:
+    @abstractmethod
+    def headers(cls, buffer: bytes, command_set: Collection[str]) -> Iterator[tuple[str | None, int, int]]: ...
+
+    @classmethod
+    def load(cls, file_path: Path, index: bool = False, cache: ParseCache = None, previous: SourceData = None) -> SourceData:
         """
         Load SourceData from a file path.
         To cut down on memory usage, the tech file is not loaded into memory
         at instantiation time. Instead, the tech file is loaded into memory
         by a `with` statement and read as needed line by line.
 
+        With `index` set, the file is memory-mapped and scanned once for the
+        location of each command section instead of being streamed.
+        Compressed files are detected and decompressed as they are read. Only gzip
+        compressed files can be indexed, bzip2 and xz compressed files are streamed.
+
         :param file_path: the path to the tech file
+        :param index: whether to index the command sections for random access
+        :param cache: a cache of parsed command sections to consult before parsing
+        :param previous: a parsed SourceData to reuse the output of unchanged sections from
         :return: a VOSS object
         """
         instance = cls()
-        instance.data_stream = open(file_path, 'r')
+        instance.file_path = file_path
+        instance.cache = cache
+        instance.previous = previous
+        method = compression.detect(file_path) if index else None
+        if index and method not in compression.UNRESUMABLE:
+            if method:
+                instance._buffer = compression.CompressedBuffer(file_path, method)
+                windows = instance._buffer.windows()
+            else:
+                with open(file_path, 'rb') as f:
+                    # An empty file cannot be memory-mapped, but it has no sections either.
+                    instance._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if f.seek(0, 2) else b''
+                windows = [(0, instance._buffer)]
+            instance._sections = instance._index(windows)
+        else:
+            instance.data_stream = compression.open_text(file_path)
         return instance
 
+    def close(self) -> None:
+        """
+        Close the file holding the raw data. The parsed output remains available, but no
+        more commands can be parsed from the raw data.
+        """
+        if self._buffer is not None and hasattr(self._buffer, "close"):
+            self._buffer.close()
+        if self.file_path is not None and hasattr(self.data_stream, "close"):
+            self.data_stream.close()
+
+    def __enter__(self) -> SourceData:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _index(self, windows: Iterable[tuple[int, bytes]]) -> dict[str, tuple[int, int]]:
+        """
+        Find the byte offsets of every command section from the command headers.
+
+        :param windows: the raw data in blocks of whole lines, each with the offset of the block
+        :return: a dictionary of the start and end offsets of each command's output
+        """
+        checkpoint = getattr(self._buffer, "checkpoint", None)
+        sections = {}
+        current_command = None
+        start = 0
+        for base, window in windows:
+            for command, line_start, line_end in self.headers(window, self._commands.keys()):
+                if current_command:
+                    sections[current_command] = (start, base + line_start)
+                current_command, start = command, base + line_end
+                if current_command and checkpoint:
+                    checkpoint(start)
+        if current_command:
+            sections[current_command] = (start, len(self._buffer))
+        return sections
+
+    def section(self, command: str) -> list[str] | None:
+        """
+        Return the raw output lines of a given command from an indexed SourceData.
+        Only the pages of the file holding the section are read, or for a compressed
+        file, decompression resumes from the last checkpoint before the section.
+
+        :param command: the command to return the output of
+        :return: the output of the command separated by lines, or None if the command is not in the data
+        """
+        if self._sections is None:
+            raise ValueError('The SourceData was not loaded with an index.')
+        if command not in self._sections:
+            return None
+        start, end = self._sections[command]
+        # Decode through a universal newline StringIO to produce the same lines as a text mode file.
+        return list(io.StringIO(self._buffer[start:end].decode(errors='replace'), newline=None))
+
     def save(self, filename: Path):
         """
         Save the data in the `SourceData` to a JSON file
         representing the parsed output of each command.
+        The file can be loaded back with `restore`.
 
         :param filename: the `Path` of the new file
         """
-        with self:
-            serialized = {cmd: obj for cmd, obj in self}
+        from model import codec
+        serialized = {cmd: codec.encode(obj) for cmd, obj in self}
         with open(filename, 'w') as f:
             json.dump(serialized, f, indent=2)
 
+    @classmethod
+    def restore(cls, filename: Path) -> SourceData:
+        """
+        Restore a `SourceData` from a JSON file written by `save`.
+        The restored `SourceData` has no raw data and serves the saved parsed output.
+
+        :param filename: the `Path` of the saved file
+        :return: a SourceData object
+        """
+        from model import codec
+        with open(filename, 'r') as f:
+            serialized = json.load(f)
+        instance = cls()
+        types = codec.object_types()
+        instance.data_store = {cmd: codec.decode(obj, types) for cmd, obj in serialized.items()}
+        return instance
+
     def __getitem__(self, command: str) -> dict[Switch.Object, Any]:
         """
         Return the parsed output of a given command.
@@ -67,14 +239,17 @@ class SourceData:
         :return: the parsed results of the command
         """
         # If the command has already been parsed, return the results.
-        # If it hasn't been parsed yet, iterate over the entire SourceData
-        # as normal, but stop as soon as the command is encountered.
         if command in self.data_store:
             return self.data_store[command]
-        # The iteration process will automatically populate the data store
-        for cmd, obj in self:
-            if cmd == command:
-                return obj
+        # An indexed SourceData can go straight to the section holding the command.
+        if self._sections is not None:
+            start = time.perf_counter()
+            lines = self.section(command)
+            if lines is None:
+                return None
+            return self._parse(command, lines, time.perf_counter() - start)
+        # A streamed SourceData reads on until the command is found, keeping the sections it passes.
+        return self.parse([command]).get(command)
 
     def __iter__(self) -> tuple[str, dict[Switch.Object, Any]]:
         """
@@ -84,9 +259,205 @@ class SourceData:
 
         :return: a tuple containing the command and the parsed results
         """
-        for cmd, lines in self.__class__.extractor(self.data_stream, self._commands.keys()):
-            self.data_store[cmd] = self._commands[cmd](lines)
-            yield cmd, self.data_store[cmd]
+        if self._sections is not None:
+            # The sections are recorded in the order they appear in the file.
+            for cmd in self._sections:
+                yield cmd, self[cmd]
+            return
+        if self.data_stream is None:
+            # Without raw data, such as after a restore, only the stored results can be served.
+            yield from self.data_store.items()
+            return
+        # The sections already read from the stream are served first, then the stream is read on.
+        position = 0
+        while True:
+            if position < len(self._order):
+                cmd = self._order[position]
+                yield cmd, self._stored(cmd)
+            else:
+                section = self._extract()
+                if section is None:
+                    return
+                cmd, lines, seconds = section
+                # Commands already parsed on their own by `parse` are not parsed again.
+                yield cmd, self.data_store[cmd] if cmd in self.data_store else self._parse(cmd, lines, seconds)
+            position += 1
+
+    def _extract(self) -> tuple[str, list[str], float] | None:
+        """
+        Read the next section from the data stream, hashing it and recording its place.
+        The file holding the data stream is closed once the end is reached.
+
+        :return: a tuple holding the command, its output and the time taken to read it, or None at the end
+        """
+        if self._exhausted:
+            return None
+        if self._extracting is None:
+            self._extracting = self.__class__.extractor(self.data_stream, self._commands.keys())
+        # The time spent waiting for the extractor is the time taken to read and extract the section.
+        start = time.perf_counter()
+        section = next(self._extracting, None)
+        seconds = time.perf_counter() - start
+        if section is None:
+            self._exhausted = True
+            self._extracting = None
+            if self.file_path is not None:
+                self.data_stream.close()
+            return None
+        command, lines = section
+        self._order.append(command)
+        # A section is hashed once, however it is parsed later.
+        self.digests[command] = self.digest(command, self._versions.get(command, ""), lines)
+        return command, lines, seconds
+
+    def _stored(self, command: str) -> dict[Switch.Object, Any]:
+        """
+        Return the parsed output of a command already read from the data stream, parsing it if it was kept unparsed.
+
+        :param command: the command
+        :return: the parsed results of the command
+        """
+        if command in self.data_store:
+            return self.data_store[command]
+        return self._parse(command, *self._pending.pop(command))
+
+    @property
+    def has_raw_data(self) -> bool:
+        """
+        Whether the SourceData holds raw data, rather than only parsed output such as after a restore.
+        """
+        return self._sections is not None or self.data_stream is not None
+
+    def hash_sections(self) -> dict[str, str]:
+        """
+        Hash the section of every command in the raw data without parsing it, see `digest`.
+        An indexed SourceData reads each section from the index. A streamed SourceData
+        reads the rest of its stream, keeping the sections it has not parsed for later.
+
+        :return: a dictionary of commands and the hash of their sections
+        """
+        if self.hashed:
+            return self.digests
+        if self._sections is not None:
+            for command in self._sections:
+                if command not in self.digests:
+                    self.digests[command] = self.digest(command, self._versions.get(command, ""), self.section(command))
+        elif self.data_stream is not None:
+            self._read_until(set())
+        self.hashed = True
+        return self.digests
+
+    def parse(self, commands: Collection[str]) -> dict[str, dict[Switch.Object, Any]]:
+        """
+        Parse the output of only the given commands, leaving every other section unparsed.
+        An indexed SourceData reads just those sections. A streamed SourceData reads on
+        from where its stream was left until it has found them all, keeping the sections
+        it passes for later, and parses those it had already read.
+
+        :param commands: the commands to parse
+        :return: a dictionary containing the parsed output of each command found
+        """
+        wanted = [c for c in commands if c in self._commands and c not in self.data_store]
+        if wanted and self._sections is not None:
+            for command in wanted:
+                self[command]
+        elif wanted and self.data_stream is not None:
+            for command in wanted:
+                if command in self._pending:
+                    self._stored(command)
+            self._read_until({c for c in wanted if c not in self.data_store})
+        return {c: self.data_store[c] for c in commands if c in self.data_store}
+
+    def _read_until(self, commands: set[str]) -> None:
+        """
+        Read sections from the data stream, parsing the given commands and keeping every other section
+        unparsed, until every given command is parsed or the stream ends.
+
+        :param commands: the commands to parse, or an empty set to read to the end of the stream
+        """
+        while commands or not self._exhausted:
+            section = self._extract()
+            if section is None:
+                return
+            command, lines, seconds = section
+            if command in commands:
+                self._parse(command, lines, seconds)
+                commands.discard(command)
+                if not commands:
+                    return
+            elif command not in self.data_store:
+                self._pending[command] = (lines, seconds)
+
+    @classmethod
+    def producers(cls, t: Type[Switch.Object]) -> list[str]:
+        """
+        Find the commands whose parsing methods may produce objects of a given Type,
+        which includes every parsing method that did not declare the Types it produces.
+
+        :param t: the Switch.Object Type
+        :return: the commands
+        """
+        return [c for c in cls._commands if cls._produces.get(c) is None or t in cls._produces[c]]
+
+    @staticmethod
+    def digest(command: str, version: str, lines: list[str]) -> str:
+        """
+        Hash the output of a command together with the command and the version of its parser,
+        so that equal hashes can only come from output that parses to equal results.
+
+        :param command: the command
+        :param version: the version of the parser bound to the command
+        :param lines: the output of the command separated by lines
+        :return: the hash as a hexadecimal string
+        """
+        # The same SHA-256 hash that ParseCache has always keyed its entries by, so that existing caches stay valid.
+        digest = hashlib.sha256(f"{command}\0{version}\0".encode())
+        digest.update("".join(lines).encode(errors='surrogateescape'))
+        return digest.hexdigest()
+
+    def _parse(self, command: str, lines: list[str], extract_seconds: float = 0.0) -> dict[Switch.Object, Any]:
+        """
+        Parse the output of a command, measuring it if the SourceData is instrumented,
+        and save the parsed output to the data store.
+
+        :param command: the command to parse
+        :param lines: the output of the command separated by lines
+        :param extract_seconds: the time taken to extract the output
+        :return: the parsed results of the command
+        """
+        if self.instrumentation is None:
+            result = self._resolve(command, lines)
+        else:
+            result = self.instrumentation.measure(
+                command, lines, extract_seconds, self._resolve, lambda: command in self.reused
+            )
+        self.data_store[command] = result
+        return result
+
+    def _resolve(self, command: str, lines: list[str]) -> dict[Switch.Object, Any]:
+        """
+        Resolve the parsed output of a command, reusing the previous SourceData's output
+        or consulting the cache if there is one before running the parser.
+
+        :param command: the command to parse
+        :param lines: the output of the command separated by lines
+        :return: the parsed results of the command
+        """
+        # A section hashed as it was read is not hashed again.
+        digest = self.digests.get(command) or self.digest(command, self._versions.get(command, ""), lines)
+        self.digests[command] = digest
+        previous = self.previous
+        if previous is not None and previous.digests.get(command) == digest and command in previous.data_store:
+            result = previous.data_store[command]
+            self.reused.add(command)
+        elif self.cache is None:
+            result = self._commands[command](lines)
+        else:
+            result = self.cache.get(digest)
+            if result is None:
+                result = self._commands[command](lines)
+                self.cache.put(digest, result)
+        return result
 
     def read(self) -> dict[str, dict[Switch.Object, Any]]:
         """
@@ -97,19 +468,32 @@ class SourceData:
         return {cmd: obj for cmd, obj in self}
 
     @classmethod
-    def parser(cls, command: str) -> Callable:
+    def parser(
+            cls, command: str, version: str = "1", produces: Collection[Type[Switch.Object]] = None
+    ) -> Callable:
         """
         This decorator is used to inject parsing functions into the class.
         The parsing function must take a list of strings as its only argument
         and return a dictionary.
         These functions are accessible via direct call, iteration, and item access.
 
+        The version must be changed whenever the parsing function changes its output,
+        so that results cached from earlier versions are not reused.
+
+        Declaring the Types of the objects keying the parsing function's output lets
+        a Switch parse only the commands it needs for a Type. A parsing function that
+        does not declare them is assumed to produce every Type.
+
         :param command: the command to bind the parsing function to
+        :param version: the version of the parsing function
+        :param produces: the Switch.Object Types the parsing function produces
         :return: the parsing function
         """
         def _parser(func: Callable) -> Callable:
             setattr(cls, func.__name__, func)
             cls._commands[command] = func
+            cls._versions[command] = version
+            cls._produces[command] = tuple(produces) if produces is not None else None
             return func
         return _parser
 
@@ -127,6 +511,8 @@ class Switch(ABC):
         differentiating between different objects of the same type.
         """
 
+        __slots__ = ()
+
         @abstractmethod
         def __eq__(self, other) -> bool:
             """
@@ -142,7 +528,8 @@ class Switch(ABC):
             """
             ...
 
-    _data_store: dict[Type[Switch.Object], dict[Switch.Object, Any]] = {}
+    # The parsed data is owned by each Switch, and must be set by its `__init__`.
+    _data_store: dict[Type[Switch.Object], dict[Switch.Object, Any]]
 
     @abstractmethod
     def __init__(self, source_data: SourceData): ...
@@ -164,4 +551,22 @@ class Switch(ABC):
     def __contains__(self, t: Type[Switch.Object]) -> bool: ...
 
     @abstractmethod
-    def read(self) -> dict[Type[Switch.Object], dict[Switch.Object, Any]]: ...
\ No newline at end of file
+    def read(self) -> dict[Type[Switch.Object], dict[Switch.Object, Any]]: ...
+
+    def types(self) -> list[Type[Switch.Object]] | None:
+        """
+        List the Types the Switch may hold without parsing its data.
+
+        :return: the Types, or None if they cannot be known without parsing
+        """
+        return None
+
+    def section_digests(self, t: Type[Switch.Object]) -> dict[str, str | None] | None:
+        """
+        Hash the raw data that the objects of a Type are parsed from, without parsing it.
+        Two switches whose hashes are equal for a Type hold equal objects of that Type.
+
+        :param t: the Type
+        :return: the hashes by command, or None if the raw data cannot be hashed
+        """
+        return None
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""
+The table module compiles declarative descriptions of tabular show output into fast scanners.
+
+A parser declares the columns of each table it reads, and the markers bounding the section the
+table appears in, once at import time. Every line is then read a single time, rejected by a
+substring test where possible, and matched against one precompiled pattern per table.
+"""
+from __future__ import annotations
+
+import re
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from typing import Any
+
+IPV4 = r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}'
+PORT = r'\d+/\d+'
+
+
+@dataclass(frozen=True)
+class Column:
+    """
+    A Column describes one whitespace separated field of a table row.
+
+    A Column without a name is matched but not returned, which skips the fields of no interest.
+    The pattern must not contain capturing groups, and the prefix is a pattern matched before
+    the field but not returned with it, such as the "Port" of "Port1/1".
+    """
+    name: str | None
+    pattern: str = r'\S+'
+    convert: Callable[[str], Any] | None = None
+    prefix: str = ""
+
+    def compile(self) -> str:
+        """
+        :return: the pattern of the Column as part of a row pattern
+        """
+        if self.name is None:
+            return f'{self.prefix}(?:{self.pattern})'
+        return f'{self.prefix}(?P<{self.name}>{self.pattern})'
+
+
+class Table:
+    """
+    A Table describes the rows of a table in show output as a sequence of Columns separated
+    by whitespace.
+
+    A Table with a start marker only reads the lines from a line containing the start marker
+    up to a line containing the end marker, and reads again if the start marker reappears.
+    A Table with a marker only matches the lines containing it, which rejects most other
+    lines with a substring test rather than a pattern match.
+
+    A row is returned as a tuple of the values of the named Columns, converted if the Column
+    has a conversion.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            columns: Iterable[Column],
+            marker: str = None,
+            start: str = None,
+            end: str = None,
+            anchored: bool = False,
+            trailing: bool = False
+    ):
+        """
+        Compile a new Table.
+
+        :param name: the name of the Table, which identifies its rows when scanned with other Tables
+        :param columns: the Columns of a row
+        :param marker: a string every row contains
+        :param start: a string marking the start of the section holding the table
+        :param end: a string marking the end of the section holding the table
+        :param anchored: whether the first Column starts the line, after any whitespace
+        :param trailing: whether the last Column ends the line, before any whitespace
+        """
+        self.name = name
+        self.columns = tuple(columns)
+        self.marker = marker
+        self.start = start
+        self.end = end
+        pattern = r'\s+'.join(column.compile() for column in self.columns)
+        if anchored:
+            pattern = r'\s*' + pattern
+        if trailing:
+            pattern += r'\s*$'
+        self.pattern = re.compile(pattern)
+        self._match = self.pattern.match if anchored else self.pattern.search
+        named = [column for column in self.columns if column.name is not None]
+        self._converters = tuple((i, column.convert) for i, column in enumerate(named) if column.convert)
+
+    def row(self, line: str) -> tuple | None:
+        """
+        Match a single line.
+
+        :param line: the line
+        :return: the row, or None if the line is not a row of the Table
+        """
+        if self.marker is not None and self.marker not in line:
+            return None
+        match = self._match(line)
+        if match is None:
+            return None
+        if not self._converters:
+            return match.groups()
+        values = list(match.groups())
+        for i, convert in self._converters:
+            values[i] = convert(values[i])
+        return tuple(values)
+
+    def rows(self, lines: Iterable[str]) -> Iterator[tuple]:
+        """
+        Read the rows of the Table from show output.
+
+        :param lines: the show output separated by lines
+        :return: the rows in the order they appear
+        """
+        for _, row in Scanner(self).scan(lines):
+            yield row
+
+
+class Scanner:
+    """
+    A Scanner reads the rows of many Tables from show output in a single pass.
+    """
+
+    def __init__(self, *tables: Table):
+        self.tables = tables
+
+    def scan(self, lines: Iterable[str]) -> Iterator[tuple[str, tuple]]:
+        """
+        Read the rows of every Table from show output. A line may be a row of more than one Table.
+
+        :param lines: the show output separated by lines
+        :return: the name of the Table and the row, in the order they appear
+        """
+        if len(self.tables) == 1 and self.tables[0].start is None:
+            # A single Table read from every line needs none of the section tracking.
+            table = self.tables[0]
+            row = table.row
+            for line in lines:
+                r = row(line)
+                if r is not None:
+                    yield table.name, r
+            return
+        tables = [(table.name, table.row, table.start, table.end) for table in self.tables]
+        active = [start is None for _, _, start, _ in tables]
+        for line in lines:
+            for i, (name, row, start, end) in enumerate(tables):
+                if start is not None:
+                    if start in line:
+                        active[i] = True
+                    elif end is not None and end in line:
+                        active[i] = False
+                if active[i]:
+                    r = row(line)
+                    if r is not None:
+                        yield name, r
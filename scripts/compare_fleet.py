@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Compare the tech files of many switches captured before and after a change.
+
+The manifest is a CSV file with an `old` and a `new` column holding the paths to the tech
+files or snapshots of each switch, and optional `name` and `mapping` columns holding the
+name of the switch and the path to its mapping file. Relative paths are relative to the
+manifest. The switches are compared in parallel, and one JSON Lines record is written per
+switch as soon as it is compared, followed by a summary of the throughput on stderr.
+
+The exit status is 0 if no switch differs, 1 if any switch differs and 2 if any switch
+could not be compared.
+"""
+from __future__ import annotations
+
+import csv
+import json
+import os
+import sys
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TextIO
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "controller" / "voss")]
+
+from model.compare import Comparison  # noqa: E402
+from voss import VOSS  # noqa: E402
+
+import layer2  # noqa: E402,F401 registers the layer 2 parsers
+import layer3  # noqa: E402,F401 registers the layer 3 parsers
+
+DIFFERENT, FAILED = 1, 2
+
+
+@dataclass
+class Pair:
+    """
+    A Pair holds the tech files of a single switch from before and after a change.
+    """
+    name: str
+    old: Path
+    new: Path
+    mapping: Path | None = None
+
+
+def read_manifest(manifest_path: Path) -> list[Pair]:
+    """
+    Read the pairs of tech files to compare from a CSV manifest.
+
+    :param manifest_path: the path to the manifest
+    :return: the Pairs in the order of the manifest
+    """
+    manifest_path = Path(manifest_path)
+    with open(manifest_path, newline='') as f:
+        rows = list(csv.DictReader(f))
+    pairs = []
+    for n, row in enumerate(rows, 2):
+        if not row.get("old") or not row.get("new"):
+            raise ValueError(f'Line {n} of {manifest_path} needs both an old and a new tech file.')
+        old, new = manifest_path.parent / row["old"], manifest_path.parent / row["new"]
+        mapping = manifest_path.parent / row["mapping"] if row.get("mapping") else None
+        pairs.append(Pair(row.get("name") or new.stem, old, new, mapping))
+    return pairs
+
+
+def compare(pair: Pair, summary_only: bool = False) -> tuple[str, int, int, float]:
+    """
+    Compare a single switch, catching any error so that the rest of the fleet is still compared.
+
+    :param pair: the Pair to compare
+    :param summary_only: whether to count the differing objects of each Type rather than describe them
+    :return: a tuple holding the JSON record, the status, the size of both tech files and the time taken
+    """
+    start = time.perf_counter()
+    record = {"switch": pair.name, "old": str(pair.old), "new": str(pair.new),
+              "mapping": str(pair.mapping) if pair.mapping else None}
+    status, size = 0, 0
+    try:
+        size = os.path.getsize(pair.old) + os.path.getsize(pair.new)
+        comparison = Comparison.load(
+            VOSS.load(pair.old), VOSS.load(pair.new), mapping_file_path=pair.mapping, skip_unchanged=True
+        )
+        if summary_only:
+            summary = {t.__name__: count for t, count in comparison.summary().items()}
+        else:
+            differences = {t.__name__: {str(k): v for k, v in d.items() if v} for t, d in comparison}
+            record["differences"] = {name: d for name, d in differences.items() if d}
+            summary = {name: len(d) for name, d in differences.items()}
+        record["summary"] = summary
+        record["skipped"] = {t.__name__: commands for t, commands in comparison.skipped.items()}
+        status = DIFFERENT if any(summary.values()) else 0
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+        status = FAILED
+    seconds = time.perf_counter() - start
+    record["seconds"] = round(seconds, 6)
+    return json.dumps(record, default=str), status, size, seconds
+
+
+def compare_fleet(
+        pairs: list[Pair], output: TextIO, workers: int = None, summary_only: bool = False, log: TextIO = None
+) -> int:
+    """
+    Compare every switch across a pool of worker processes, writing each record as soon as it completes.
+
+    :param pairs: the Pairs to compare
+    :param output: the stream to write the JSON Lines records to
+    :param workers: the number of worker processes, defaulting to the number of CPUs
+    :param summary_only: whether to count the differing objects of each Type rather than describe them
+    :param log: the stream to write the throughput summary to, stderr if not given
+    :return: the exit status
+    """
+    start = time.perf_counter()
+    statuses = [0] * len(pairs)
+    total_size, total_seconds, slowest = 0, 0.0, 0.0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(compare, pair, summary_only): n for n, pair in enumerate(pairs)}
+        for future in as_completed(futures):
+            try:
+                line, status, size, seconds = future.result()
+            except Exception as e:
+                # A worker that died, or a record that could not be returned, only fails its own switch.
+                pair = pairs[futures[future]]
+                line = json.dumps({
+                    "switch": pair.name, "old": str(pair.old), "new": str(pair.new),
+                    "mapping": str(pair.mapping) if pair.mapping else None,
+                    "error": f"{type(e).__name__}: {e}", "seconds": 0
+                })
+                status, size, seconds = FAILED, 0, 0.0
+            output.write(line + "\n")
+            output.flush()
+            statuses[futures[future]] = status
+            total_size += size
+            total_seconds += seconds
+            slowest = max(slowest, seconds)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{len(pairs)} switches compared in {elapsed:.2f}s: "
+        f"{statuses.count(0)} unchanged, {statuses.count(DIFFERENT)} different, {statuses.count(FAILED)} failed\n"
+        f"{len(pairs) / elapsed if elapsed else 0.0:.2f} switches/s, "
+        f"{total_size / 1e6 / elapsed if elapsed else 0.0:.1f}MB/s of tech files, "
+        f"{total_seconds / len(pairs) if pairs else 0.0:.2f}s per switch on average, {slowest:.2f}s for the slowest",
+        file=log if log is not None else sys.stderr
+    )
+    return max(statuses, default=0)
+
+
+def main(argv: list[str] = None) -> int:
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("manifest", type=Path, help="a CSV file with old, new and optional name and mapping columns")
+    parser.add_argument("-o", "--output", type=Path, help="the JSON Lines file to write, stdout if not given")
+    parser.add_argument("-w", "--workers", type=int, help="the number of worker processes, one per CPU by default")
+    parser.add_argument("-s", "--summary", action="store_true",
+                        help="only count the differing objects of each Type of each switch")
+    args = parser.parse_args(argv)
+
+    pairs = read_manifest(args.manifest)
+    if args.output is None:
+        return compare_fleet(pairs, sys.stdout, args.workers, args.summary)
+    with open(args.output, 'w') as output:
+        return compare_fleet(pairs, output, args.workers, args.summary)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# The parser modules import `voss` as a top level module, so both the repository root
+# and the VOSS controller directory need to be importable.
+ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [str(ROOT), str(ROOT / "controller" / "voss")]
@@ -0,0 +1,77 @@
+import pytest
+
+from model import codec
+from model.cache import ParseCache
+from model.network_objects import Interface, MacAddresses, Network, State
+from voss import TechFile
+
+import layer2  # noqa: F401 registers the layer 2 parsers
+import layer3  # noqa: F401 registers the layer 3 parsers
+
+from test_show import TECH_FILE
+
+
+@pytest.fixture
+def tech_file_path(tmp_path):
+    path = tmp_path / "tech.txt"
+    path.write_text(TECH_FILE)
+    return path
+
+
+def test_codec_round_trip():
+    data = {
+        Interface("1/1"): {"State": State("Up"), "MAC Addresses": MacAddresses(["00:11:22:33:44:55"])},
+        Network("10.0.0.0", "255.0.0.0"): {"Next Hop": Interface("Vlan10")},
+    }
+    assert codec.decode(codec.encode(data)) == data
+
+
+def test_cache_skips_parsing(tech_file_path, tmp_path, monkeypatch):
+    cache = ParseCache(tmp_path / "cache")
+    first = TechFile.load(tech_file_path, cache=cache).read()
+
+    def fail(_):
+        raise AssertionError("parsed a cached section")
+    monkeypatch.setitem(TechFile._commands, "show ip route", fail)
+    monkeypatch.setitem(TechFile._commands, "show isis adjacencies", fail)
+    assert TechFile.load(tech_file_path, cache=cache).read() == first
+
+
+def test_cache_misses_on_new_parser_version(tech_file_path, tmp_path, monkeypatch):
+    cache = ParseCache(tmp_path / "cache")
+    TechFile.load(tech_file_path, cache=cache).read()
+    monkeypatch.setitem(TechFile._versions, "show ip route", "2")
+    monkeypatch.setitem(TechFile._commands, "show ip route", lambda _: {})
+    assert TechFile.load(tech_file_path, cache=cache)["show ip route"] == {}
+
+
+def test_cache_keys_are_stable():
+    # The keys of existing caches must not change, or every entry would be parsed again.
+    assert ParseCache.key("show ip route", "1", ["a\n", "b\n"]) == (
+        "0fe31b79d3b29f108a5221db3b6fea4466fc987e09563fb381d82f32f88fa821"
+    )
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ParseCache(tmp_path / "cache", max_bytes=600)
+    keys = [ParseCache.key("show", "1", [str(n)]) for n in range(10)]
+    for key in keys:
+        cache.put(key, {Interface(f"1/{n}"): State("Up") for n in range(3)})
+    assert cache.size() <= 600
+    assert cache.get(keys[-1]) is not None
+    assert cache.get(keys[0]) is None
+
+
+def test_cache_replacing_an_entry_keeps_its_size(tmp_path):
+    cache = ParseCache(tmp_path / "cache")
+    key = ParseCache.key("show", "1", ["1"])
+    for _ in range(3):
+        cache.put(key, {Interface("1/1"): State("Up")})
+    assert cache._size == cache.size()
+
+
+def test_save_and_restore(tech_file_path, tmp_path):
+    saved = tmp_path / "saved.json"
+    source = TechFile.load(tech_file_path)
+    source.save(saved)
+    assert TechFile.restore(saved).read() == source.data_store
@@ -0,0 +1,102 @@
+import threading
+import time
+
+from collect import Collector, Device
+from model.network_objects import Interface
+from voss import TechFile, VOSS
+
+import layer2  # noqa: F401 registers the layer 2 parsers
+import layer3  # noqa: F401 registers the layer 3 parsers
+
+from test_show import TECH_FILE, lines
+
+OUTPUTS = {command: "".join(output) for command, output in TechFile.extractor(lines(TECH_FILE), TechFile._commands)}
+
+
+class FakeSession:
+    """
+    A stand in for a netmiko session that answers with canned command output.
+    """
+
+    def __init__(self, switches, site: str, delay: float = 0.0):
+        self.switches = switches
+        self.site = site
+        self.delay = delay
+        self.commands = []
+
+    def send_command(self, command: str, read_timeout: float = None) -> str:
+        time.sleep(self.delay)
+        self.commands.append(command)
+        return OUTPUTS.get(command, "")
+
+    def disconnect(self):
+        with self.switches.lock:
+            self.switches.open[self.site] -= 1
+
+
+class FakeSwitches:
+    """
+    A set of fake switches recording how many sessions are open, in total and per site.
+    """
+
+    def __init__(self, failures: dict[str, int] = None, delay: float = 0.0):
+        self.failures = dict(failures or {})
+        self.delay = delay
+        self.open = {}
+        self.peak = {}
+        self.sessions = []
+        self.lock = threading.Lock()
+
+    def connect(self, device: Device, timeout: float) -> FakeSession:
+        with self.lock:
+            if self.failures.get(device.host):
+                self.failures[device.host] -= 1
+                raise TimeoutError(device.host)
+            self.open[device.site] = self.open.get(device.site, 0) + 1
+            self.peak[device.site] = max(self.peak.get(device.site, 0), self.open[device.site])
+            session = FakeSession(self, device.site, self.delay)
+            self.sessions.append(session)
+            return session
+
+
+def devices(count: int, sites: int = 1) -> list[Device]:
+    return [Device(f"10.0.0.{n}", "admin", "secret", site=f"site{n % sites}") for n in range(count)]
+
+
+def test_collect_feeds_tech_files():
+    switches = FakeSwitches()
+    captures = list(Collector(connect=switches.connect).collect(devices(3)))
+    assert len(captures) == 3
+    for capture in captures:
+        assert capture.error is None
+        assert VOSS(capture.source)[Interface][Interface("1/1")]["ISIS Status"].name == "UP"
+    # Every registered command is gathered over a single session per device.
+    assert len(switches.sessions) == 3
+    assert all(session.commands == list(TechFile._commands) for session in switches.sessions)
+
+
+def test_collect_retries_failed_devices():
+    switches = FakeSwitches(failures={"10.0.0.0": 2, "10.0.0.1": 5})
+    collector = Collector(connect=switches.connect, retries=2, backoff=0)
+    captures = {capture.device.host: capture for capture in collector.collect(devices(2))}
+    assert captures["10.0.0.0"].attempts == 3
+    assert captures["10.0.0.0"].source is not None
+    assert isinstance(captures["10.0.0.1"].error, TimeoutError)
+    assert captures["10.0.0.1"].source is None
+
+
+def test_collect_limits_sessions_per_site():
+    switches = FakeSwitches(delay=0.005)
+    list(Collector(connect=switches.connect, workers=16, per_site=2).collect(devices(12, sites=2)))
+    assert max(switches.peak.values()) <= 2
+
+
+def test_collect_does_not_hold_workers_on_a_busy_site():
+    switches = FakeSwitches(delay=0.01)
+    busy = [Device(f"10.0.1.{n}", "admin", "secret", site="busy") for n in range(4)]
+    quiet = Device("10.0.2.1", "admin", "secret", site="quiet")
+    captures = list(Collector(connect=switches.connect, workers=2, per_site=1).collect([*busy, quiet]))
+    assert len(captures) == 5
+    # The quiet site is collected alongside the first busy Device, rather than after the busy site frees a worker.
+    assert [s.site for s in switches.sessions[:2]] == ["busy", "quiet"]
+    assert switches.peak == {"busy": 1, "quiet": 1}
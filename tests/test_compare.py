@@ -0,0 +1,119 @@
+from model import compression
+from model.compare import Comparison
+from model.network_objects import Basic, Connection, Interface, Network, State
+from voss import TechFile, VOSS
+
+import layer2  # noqa: F401 registers the layer 2 parsers
+import layer3  # noqa: F401 registers the layer 3 parsers
+
+from test_show import TECH_FILE
+
+
+def switch(data: dict) -> VOSS:
+    instance = VOSS(TechFile())
+    instance._data_store = data
+    return instance
+
+
+def test_compare_fields():
+    old = {"State": State("Up"), "Gone": Connection("a"), "Same": Connection("b")}
+    new = {"State": State("Down"), "Same": Connection("b"), "Added": Connection("c")}
+    assert dict(Comparison.compare(old, new)) == {
+        "State": {"old": "Up", "new": "Down"},
+        "Gone": {"old": Connection("a"), "new": None},
+        "Added": {"old": None, "new": Connection("c")},
+    }
+
+
+def test_compare_nested_fields():
+    old = {"Neighbor": {"Host": Connection("a"), "Port": Interface("1/1")}}
+    new = {"Neighbor": {"Host": Connection("b"), "Port": Interface("1/1")}}
+    assert dict(Comparison.compare(old, new)) == {"Neighbor": {"Host": {"old": "a", "new": "b"}}}
+
+
+def test_comparison_with_mapping():
+    old = switch({Interface: {
+        Interface("1/1"): {"State": State("Up")},
+        Interface("1/2"): {"State": State("Up")},
+    }})
+    new = switch({Interface: {
+        Interface("3/1"): {"State": State("Down")},
+        Interface("1/2"): {"State": State("Up")},
+    }})
+    mapping = {Interface: [Comparison.Pair(Interface("1/1"), Interface("3/1"))]}
+    differences = Comparison(old, new, mapping)[Interface]
+    assert differences[Interface("3/1")] == {"State": {"old": "Up", "new": "Down"}, "old": Interface("1/1")}
+    assert differences[Interface("1/2")] == {}
+
+
+def test_comparison_skips_objects_missing_from_new():
+    network = Network("10.0.0.0", "255.0.0.0")
+    old = switch({Network: {network: {"Next Hop": Basic("10.0.0.1")}}})
+    new = switch({Network: {}})
+    assert dict(Comparison(old, new)) == {Network: {}}
+
+
+def test_comparison_routes():
+    hop = {"Next Hop": Basic("10.0.0.1")}
+    old = switch({Network: {Network("10.1.0.0", "255.255.255.0"): hop, Network("10.1.1.0", "255.255.255.0"): hop}})
+    new = switch({Network: {Network("10.1.0.0", "255.255.254.0"): hop}})
+    changes = list(Comparison(old, new).routes())
+    assert [(c.kind, c.network) for c in changes] == [("aggregated", Network("10.1.0.0", "255.255.254.0"))]
+    assert changes[0].specifics == [Network("10.1.0.0", "255.255.255.0"), Network("10.1.1.0", "255.255.255.0")]
+
+
+def test_any_difference_and_summary():
+    network = Network("10.0.0.0", "255.0.0.0")
+    old = switch({
+        Interface: {Interface("1/1"): {"State": State("Up")}, Interface("1/2"): {"State": State("Up")}},
+        Network: {network: {"Next Hop": Basic("10.0.0.1")}},
+    })
+    new = switch({
+        Interface: {Interface("1/1"): {"State": State("Down")}, Interface("1/2"): {"State": State("Up")}},
+        Network: {network: {"Next Hop": Basic("10.0.0.1")}},
+    })
+    comparison = Comparison(old, new)
+    assert comparison.any_difference()
+    assert comparison.summary() == {Interface: 1, Network: 0}
+    assert not Comparison(old, new, types=[Network]).any_difference()
+    assert dict(Comparison(old, new, types=[Network])) == {Network: {network: {}}}
+
+
+def test_comparison_of_some_types_parses_only_those_types(tmp_path):
+    path = tmp_path / "tech.txt"
+    path.write_text(TECH_FILE)
+    old, new = VOSS.load(path, index=True), VOSS.load(path, index=True)
+    assert Comparison(old, new, types=[Network]).summary() == {Network: 0}
+    for s in (old, new):
+        assert "show isis adjacencies" not in s.tech_file.data_store
+
+
+def test_comparison_skips_types_whose_sections_are_unchanged(tmp_path):
+    before, after = tmp_path / "before.txt", tmp_path / "after.txt"
+    before.write_text(TECH_FILE)
+    after.write_text(TECH_FILE.replace("core-b          UP", "core-b          DOWN"))
+    for index in (True, False):
+        old, new = VOSS.load(before, index=index), VOSS.load(after, index=index)
+        comparison = Comparison(old, new, skip_unchanged=True)
+        differences = dict(comparison)
+        assert comparison.skipped == {Network: ["show ip route"]}
+        assert differences[Network] == {}
+        assert differences[Interface][Interface("1/2")]["ISIS Status"] == {"old": "UP", "new": "DOWN"}
+        for s in (old, new):
+            assert "show ip route" not in s.tech_file.data_store
+    full = Comparison(VOSS.load(before), VOSS.load(after))
+    assert dict(full)[Network] == {n: {} for n in VOSS.load(before)[Network]}
+    assert full.skipped == {}
+
+
+def test_skipping_unchanged_types_reads_each_file_once(tmp_path, monkeypatch):
+    before, after = tmp_path / "before.txt", tmp_path / "after.txt"
+    before.write_text(TECH_FILE)
+    after.write_text(TECH_FILE.replace("core-b          UP", "core-b          DOWN"))
+    opened = []
+    open_text = compression.open_text
+    monkeypatch.setattr(compression, "open_text", lambda file_path: opened.append(file_path) or open_text(file_path))
+    comparison = Comparison(VOSS.load(before), VOSS.load(after), skip_unchanged=True)
+    assert comparison.summary() == {Interface: 1, Network: 0}
+    assert comparison.skipped == {Network: ["show ip route"]}
+    assert sorted(opened) == [after, before]
@@ -0,0 +1,65 @@
+import io
+import json
+import os
+
+from scripts.compare_fleet import DIFFERENT, FAILED, compare_fleet, main, read_manifest
+
+from benchmarks.generator import TechFileGenerator
+
+
+def fleet(tmp_path):
+    for seed in range(3):
+        TechFileGenerator(ports=8, mac_addresses=50, routes=50, filler_lines=0, seed=seed).write(tmp_path / f"{seed}.txt")
+    (tmp_path / "mapping.yaml").write_text("Interface:\n  - before: 1/[1-8]\n    after: 1/[1-8]\n")
+    manifest = tmp_path / "manifest.csv"
+    manifest.write_text(
+        "name,old,new,mapping\n"
+        "same,0.txt,0.txt,\n"
+        "changed,0.txt,1.txt,mapping.yaml\n"
+        "missing,0.txt,nowhere.txt,\n"
+    )
+    return manifest
+
+
+def test_read_manifest(tmp_path):
+    pairs = read_manifest(fleet(tmp_path))
+    assert [p.name for p in pairs] == ["same", "changed", "missing"]
+    assert pairs[1].old == tmp_path / "0.txt" and pairs[1].mapping == tmp_path / "mapping.yaml"
+    assert pairs[0].mapping is None
+
+
+def test_compare_fleet_streams_a_record_per_switch(tmp_path):
+    output, log = io.StringIO(), io.StringIO()
+    status = compare_fleet(read_manifest(fleet(tmp_path)), output, workers=2, log=log)
+    assert status == FAILED
+    records = {r["switch"]: r for r in map(json.loads, output.getvalue().splitlines())}
+    assert set(records) == {"same", "changed", "missing"}
+    assert not any(records["same"]["summary"].values()) and records["same"]["differences"] == {}
+    assert records["changed"]["differences"]["Interface"]
+    assert records["changed"]["summary"]["Interface"] == len(records["changed"]["differences"]["Interface"])
+    assert records["missing"]["error"].startswith("FileNotFoundError")
+    assert "3 switches compared" in log.getvalue()
+
+
+def test_main_summary_only(tmp_path, capsys):
+    manifest = fleet(tmp_path)
+    manifest.write_text("old,new\n0.txt,1.txt\n")
+    assert main([str(manifest), "--summary", "--workers", "1", "--output", str(tmp_path / "out.jsonl")]) == DIFFERENT
+    record, = map(json.loads, (tmp_path / "out.jsonl").read_text().splitlines())
+    assert record["switch"] == "1" and "differences" not in record and record["summary"]["Interface"]
+    assert "1 different" in capsys.readouterr().err
+
+
+def crash(pair, summary_only=False):
+    # Kill the worker process as a crash would, rather than raising.
+    os._exit(1)
+
+
+def test_compare_fleet_survives_a_dead_worker(tmp_path, monkeypatch):
+    monkeypatch.setattr("scripts.compare_fleet.compare", crash)
+    output = io.StringIO()
+    pairs = read_manifest(fleet(tmp_path))
+    assert compare_fleet(pairs, output, workers=1, log=io.StringIO()) == FAILED
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert sorted(r["switch"] for r in records) == ["changed", "missing", "same"]
+    assert all(r["error"].startswith("BrokenProcessPool") for r in records)
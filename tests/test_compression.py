@@ -0,0 +1,46 @@
+import bz2
+import gzip
+import lzma
+
+import pytest
+
+from model import compression
+from voss import TechFile
+
+import layer2  # noqa: F401 registers the layer 2 parsers
+import layer3  # noqa: F401 registers the layer 3 parsers
+
+from test_show import TECH_FILE, lines
+
+COMPRESSORS = {"gzip": gzip.compress, "bzip2": bz2.compress, "xz": lzma.compress}
+
+
+@pytest.mark.parametrize("method", COMPRESSORS)
+def test_compressed_tech_files(method, tmp_path):
+    path = tmp_path / "tech.txt.z"
+    path.write_bytes(COMPRESSORS[method](TECH_FILE.encode()))
+    assert compression.detect(path) == method
+    expected = dict(TechFile.extractor(lines(TECH_FILE), TechFile._commands.keys()))
+    streamed = TechFile.load(path)
+    assert dict(TechFile.extractor(streamed.data_stream, TechFile._commands.keys())) == expected
+    with TechFile.load(path, index=True) as indexed:
+        if method in compression.UNRESUMABLE:
+            # Without checkpoints every section would be decompressed from the start, so the file is streamed.
+            assert indexed._sections is None and indexed.read() == TechFile.load(path).read()
+        else:
+            assert {command: indexed.section(command) for command in indexed._sections} == expected
+    assert indexed._buffer is None or indexed._buffer._file.closed
+
+
+def test_gzip_index_resumes_from_checkpoints(tmp_path, monkeypatch):
+    monkeypatch.setattr(compression, "CHUNK_SIZE", 64)
+    # Several concatenated gzip members, as produced by appending to a .gz file.
+    text = TECH_FILE * 20
+    path = tmp_path / "tech.txt.gz"
+    path.write_bytes(b"".join(gzip.compress(text[i:i + 1000].encode()) for i in range(0, len(text), 1000)))
+    indexed = TechFile.load(path, index=True)
+    assert len(indexed._buffer._checkpoints) > 1
+    # Repeated commands keep the last occurrence, as the extractor does.
+    expected = dict(TechFile.extractor(lines(text), TechFile._commands.keys()))
+    assert {command: indexed.section(command) for command in indexed._sections} == expected
+    assert indexed._buffer[0:len(indexed._buffer)] == text.encode()
@@ -0,0 +1,87 @@
+import copy
+from datetime import date
+
+import pytest
+
+from model.history import History, delta
+from model.network_objects import Connection, Interface, Network
+from voss import VOSS
+
+import layer2  # noqa: F401 registers the layer 2 parsers
+import layer3  # noqa: F401 registers the layer 3 parsers
+
+from benchmarks.generator import TechFileGenerator
+
+
+def generated(tmp_path):
+    path = tmp_path / "vsp.txt"
+    TechFileGenerator(ports=8, mac_addresses=50, routes=50, filler_lines=0).write(path)
+    return VOSS.load(path).read()
+
+
+def days(data, count):
+    """Yield a collection a day, moving the LLDP neighbour of one port and withdrawing one route each day."""
+    port = next(p for p, v in data[Interface].items() if "LLDP Remote SysName" in v)
+    for day in range(count):
+        data = copy.deepcopy(data)
+        data[Interface][port]["LLDP Remote SysName"] = Connection(f"core-{day % 3}")
+        if day % 2:
+            data[Network].pop(next(iter(data[Network])))
+        yield date(2026, 1, day + 1), data
+
+
+def test_delta_is_attribute_by_attribute(tmp_path):
+    old = generated(tmp_path)
+    (_, first), (_, second) = days(old, 2)
+    assert list(delta(first, first)) == []
+    changes = list(delta(first, second))
+    assert [(t, attribute) for t, _, attribute, _, _ in changes] == [(Interface, "LLDP Remote SysName"), (Network, None)]
+
+
+def test_state_is_rebuilt_at_any_date(tmp_path):
+    collections = list(days(generated(tmp_path), 7))
+    with History(tmp_path / "history", keyframe_interval=3) as history:
+        for collected, data in collections:
+            history.record(collected, data)
+        assert len(history) == 7 and history.collections()[0] == "2026-01-01"
+        assert len(list((tmp_path / "history").glob("*.snap"))) == 3
+        for collected, data in collections:
+            assert history.state(collected) == data
+        assert history.state() == collections[-1][1]
+        assert history.state("2026-01-05T12:00", types=[Network]) == {Network: collections[4][1][Network]}
+        with pytest.raises(KeyError):
+            history.state("2025-12-31")
+        with pytest.raises(ValueError):
+            history.record("2026-01-07", collections[0][1])
+
+
+def test_changes_of_an_attribute(tmp_path):
+    collections = list(days(generated(tmp_path), 5))
+    port = next(p for p, v in collections[0][1][Interface].items() if "LLDP Remote SysName" in v)
+    with History(tmp_path / "history", keyframe_interval=2) as history:
+        for collected, data in collections:
+            history.record(collected, data)
+    with History(tmp_path / "history") as history:
+        changes = history.changes(Interface, port, "LLDP Remote SysName")
+        assert [(c.collected, c.old, c.new) for c in changes] == [
+            ("2026-01-02", Connection("core-0"), Connection("core-1")),
+            ("2026-01-03", Connection("core-1"), Connection("core-2")),
+            ("2026-01-04", Connection("core-2"), Connection("core-0")),
+            ("2026-01-05", Connection("core-0"), Connection("core-1")),
+        ]
+        route = next(iter(collections[0][1][Network]))
+        removed, = [c for c in history.changes(Network, route) if c.new is None]
+        assert removed.collected == "2026-01-02" and removed.attribute is None
+        history.record("2026-01-06", collections[-1][1])
+        assert history.state() == collections[-1][1]
+
+
+def test_record_is_not_affected_by_changing_the_recorded_data(tmp_path):
+    data = generated(tmp_path)
+    port = next(p for p, v in data[Interface].items() if "LLDP Remote SysName" in v)
+    with History(tmp_path / "history") as history:
+        history.record("2026-01-01", data)
+        # The same dictionaries are changed in place and recorded again, as a caller reusing them would.
+        data[Interface][port]["LLDP Remote SysName"] = Connection("core-9")
+        assert history.record("2026-01-02", data) == 1
+        assert history.changes(Interface, port, "LLDP Remote SysName")[0].new == Connection("core-9")
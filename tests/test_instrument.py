@@ -0,0 +1,65 @@
+import tracemalloc
+
+from model.instrument import Instrumentation
+from voss import TechFile
+
+import layer2  # noqa: F401 registers the layer 2 parsers
+import layer3  # noqa: F401 registers the layer 3 parsers
+
+from test_show import TECH_FILE, lines
+
+
+def source() -> TechFile:
+    instance = TechFile()
+    instance.data_stream = lines(TECH_FILE)
+    return instance
+
+
+def test_records_every_parsed_section():
+    seen = []
+    instrumentation = Instrumentation(allocations=True)
+    instrumentation.add_hook(seen.append)
+    instance = source()
+    instance.instrumentation = instrumentation
+    instance.read()
+    assert [r.command for r in seen] == ["show isis adjacencies", "show ip route"]
+    assert seen == instrumentation.records
+    routes = seen[1]
+    assert (routes.lines, routes.objects) == (2, 2)
+    section = dict(TechFile.extractor(lines(TECH_FILE), ["show ip route"]))["show ip route"]
+    assert routes.bytes == len("".join(section).encode())
+    assert routes.allocated is not None and routes.peak >= 0
+    assert not tracemalloc.is_tracing()
+    assert "show ip route" in instrumentation.summary()
+
+
+def test_allocations_leave_an_existing_trace_alone():
+    instance = TechFile()
+    instance.data_stream = lines(TECH_FILE.replace("core-a", "c\u00f6re-a"))
+    instance.instrumentation = Instrumentation(allocations=True)
+    tracemalloc.start()
+    try:
+        instance.read()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+    adjacencies, routes = instance.instrumentation.records
+    assert adjacencies.allocated is not None and adjacencies.peak is None
+    # The bytes are counted once the section is encoded, not as characters.
+    section = dict(TechFile.extractor(instance.data_stream, ["show isis adjacencies"]))["show isis adjacencies"]
+    assert adjacencies.bytes == len("".join(section).encode()) == len("".join(section)) + 1
+
+
+def test_class_instrumentation(tmp_path, monkeypatch):
+    instrumentation = Instrumentation()
+    monkeypatch.setattr(TechFile, "instrumentation", instrumentation)
+    path = tmp_path / "tech.txt"
+    path.write_text(TECH_FILE)
+    TechFile.load(path, index=True)["show ip route"]
+    assert [r.command for r in instrumentation.records] == ["show ip route"]
+    assert instrumentation.records[0].allocated is None
+
+
+def test_uninstrumented_source_records_nothing():
+    assert source().instrumentation is None
+    assert len(source().read()) == 2
@@ -0,0 +1,57 @@
+from model.inventory import Inventory
+from model.network_objects import Connection, Interface, Network
+from voss import VOSS
+
+import layer2  # noqa: F401 registers the layer 2 parsers
+import layer3  # noqa: F401 registers the layer 3 parsers
+
+from benchmarks.generator import TechFileGenerator
+
+
+def generated(tmp_path, seed):
+    path = tmp_path / f"vsp-{seed}.txt"
+    TechFileGenerator(ports=8, mac_addresses=50, routes=50, filler_lines=0, seed=seed, hostname=f"vsp-{seed}").write(path)
+    return VOSS.load(path).read()
+
+
+def test_store_and_read_back(tmp_path):
+    data = generated(tmp_path, 1)
+    with Inventory(tmp_path / "fleet.db") as inventory:
+        assert inventory.store("vsp-1", data, snapshot="a")
+        assert not inventory.store("vsp-1", data, snapshot="a")
+        assert inventory.switches() == ["vsp-1"]
+        assert inventory.read("vsp-1") == data
+
+
+def test_upsert_replaces_the_previous_snapshot(tmp_path):
+    with Inventory(tmp_path / "fleet.db", batch_size=2) as inventory:
+        assert inventory.store_many((f"vsp-{n}", generated(tmp_path, n), "a") for n in range(3)) == 3
+        replacement = generated(tmp_path, 7)
+        assert inventory.store("vsp-0", replacement, snapshot="b")
+        assert inventory.snapshot("vsp-0") == "b"
+        assert inventory.read("vsp-0") == replacement
+        inventory.remove("vsp-2")
+        assert inventory.switches() == ["vsp-0", "vsp-1"]
+        assert inventory.read("vsp-2") == {}
+
+
+def test_queries_return_typed_objects(tmp_path):
+    fleet = {f"vsp-{n}": generated(tmp_path, n) for n in range(2)}
+    with Inventory() as inventory:
+        inventory.store_many((name, data, None) for name, data in fleet.items())
+
+        port, values = next((p, v) for p, v in fleet["vsp-1"][Interface].items() if "MAC Addresses" in v and len(v["MAC Addresses"]))
+        mac = next(iter(values["MAC Addresses"]))
+        assert ("vsp-1", port) in inventory.find_mac(mac.upper())
+
+        assert inventory.locate(Interface, port.name) == [("vsp-0", port), ("vsp-1", port)]
+
+        neighbour = next(v["LLDP Remote SysName"] for v in fleet["vsp-0"][Interface].values() if "LLDP Remote SysName" in v)
+        expected = [("vsp-0", p) for p, v in fleet["vsp-0"][Interface].items() if v.get("LLDP Remote SysName") == neighbour]
+        assert [m for m in inventory.find("LLDP Remote SysName", neighbour) if m[0] == "vsp-0"] == expected
+        assert inventory.find("LLDP Remote SysName", Connection("nowhere")) == []
+
+        network = next(iter(fleet["vsp-0"][Network]))
+        routes = inventory.routes(network.address)
+        assert ("vsp-0", network) in routes
+        assert all(isinstance(route, Network) for _, route in routes)
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from model.compare import Comparison
+from model.mapping import RangeRule, RegexRule, Resolver, load_mapping
+from model.network_objects import Interface, State
+from voss import TechFile, VOSS
+
+MAPPING = """\
+Interface:
+  - before: 1/1
+    after: 2/1
+  - before: 1/[2-48]
+    after: 3/[2-48]
+  - before: "[5-6]/[1-24]"
+    after: "[7-8]/[25-48]"
+  - match: '4/(\\d+)'
+    replace: '9/\\1'
+"""
+
+
+def test_range_rule():
+    rule = RangeRule("[5-6]/[1-24]", "[7-8]/[25-48]")
+    assert rule.resolve("5/1") == "7/25"
+    assert rule.resolve("6/24") == "8/48"
+    assert rule.resolve("6/25") is None
+    assert rule.resolve("15/1") is None
+    with pytest.raises(ValueError):
+        RangeRule("1/[1-48]", "3/[1-24]")
+
+
+def test_regex_rule():
+    assert RegexRule(r"4/(\d+)", r"9/\1").resolve("4/12") == "9/12"
+    assert RegexRule(r"4/(\d+)", r"9/\1").resolve("14/12") is None
+
+
+@pytest.mark.parametrize("suffix", [".yaml", ".json"])
+def test_load_mapping(tmp_path, suffix):
+    path = tmp_path / f"mapping{suffix}"
+    if suffix == ".json":
+        import yaml
+        path.write_text(json.dumps(yaml.safe_load(MAPPING)))
+    else:
+        path.write_text(MAPPING)
+    resolver = load_mapping(path)[Interface]
+    assert isinstance(resolver, Resolver)
+    assert resolver.get(Interface("1/1")) == Interface("2/1")
+    assert resolver.get(Interface("1/17")) == Interface("3/17")
+    assert resolver.get(Interface("5/3")) == Interface("7/27")
+    assert resolver.get(Interface("4/7")) == Interface("9/7")
+    assert resolver.get(Interface("2/2"), Interface("2/2")) == Interface("2/2")
+
+
+def test_comparison_with_mapping_rules(tmp_path):
+    path = tmp_path / "mapping.yaml"
+    path.write_text(MAPPING)
+    old, new = VOSS(TechFile()), VOSS(TechFile())
+    old._data_store = {Interface: {Interface(f"1/{n}"): {"State": State("Up")} for n in range(2, 49)}}
+    new._data_store = {Interface: {Interface(f"3/{n}"): {"State": State("Down" if n == 7 else "Up")} for n in range(2, 49)}}
+    comparison = Comparison.load(old, new, mapping_file_path=path)
+    differences = {k: v for k, v in comparison[Interface].items() if v}
+    assert differences == {Interface("3/7"): {"State": {"old": "Up", "new": "Down"}, "old": Interface("1/7")}}
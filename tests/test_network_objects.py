@@ -0,0 +1,54 @@
+import gc
+import pickle
+
+from model.network_objects import Connection, Interface, MacAddresses, Network, State, Vlan
+
+
+def test_mac_addresses_are_normalised():
+    macs = MacAddresses(["00:11:22:33:44:AA", "00:11:22:33:44:01", "00:11:22:33:44:AA"])
+    assert list(macs.addresses) == [0x001122334401, 0x0011223344AA]
+    assert str(macs) == "00:11:22:33:44:01, 00:11:22:33:44:AA"
+    assert "00:11:22:33:44:aa" in macs
+    assert 0x001122334402 not in macs
+
+
+def test_mac_addresses_equality_ignores_order():
+    assert MacAddresses(["0011.2233.4455", "0011.2233.4400"]) == MacAddresses(["0011.2233.4400", "0011.2233.4455"])
+
+
+def test_mac_addresses_differences_keep_notation():
+    old = MacAddresses(["0011.2233.4455", "0011.2233.4400"])
+    new = MacAddresses(["0011.2233.4400", "0011.2233.44ff"])
+    assert (old != new) == {"missing": ["0011.2233.4455"], "gained": ["0011.2233.44ff"]}
+    assert (old != old) is None
+
+
+def test_values_are_interned_per_type():
+    assert Interface("1/1") is Interface("1/1")
+    assert Network("10.0.0.0", "255.0.0.0") is Network(address="10.0.0.0", mask="255.0.0.0")
+    assert Vlan(10, "users") is Vlan(10, "users")
+    assert State("Up") is not Connection("Up")
+    assert not State("Up") == Connection("Up")
+
+
+def test_interned_values_are_slotted_and_released():
+    interface = Interface("9/99")
+    assert not hasattr(interface, "__dict__")
+    assert ("9/99",) in Interface._interned
+    del interface
+    gc.collect()
+    assert ("9/99",) not in Interface._interned
+
+
+def test_unpickled_values_are_interned():
+    interface = Interface("1/1")
+    assert pickle.loads(pickle.dumps(interface)) is interface
+
+
+def test_intern_many_shares_the_table_of_the_class():
+    existing = Network("10.0.0.0", "255.0.0.0")
+    created, found = Network.intern_many([("10.9.9.0", "255.255.255.0"), ("10.0.0.0", "255.0.0.0")])
+    assert found is existing and created is Network("10.9.9.0", "255.255.255.0")
+    del created
+    gc.collect()
+    assert ("10.9.9.0", "255.255.255.0") not in Network._interned
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from model.compare import Comparison
+from model.network_objects import Basic, Interface, MacAddresses, Network, State
+
+from test_compare import switch
+
+
+@pytest.fixture
+def comparison():
+    old = switch({
+        Interface: {
+            Interface("1/1"): {"State": State("Up"), "MAC Addresses": MacAddresses(["00:11:22:33:44:55"])},
+            Interface("1/2"): {"State": State("Up"), "MAC Addresses": MacAddresses([])},
+        },
+        Network: {Network("10.0.0.0", "255.0.0.0"): {"Next Hop": Basic("10.0.0.1")}},
+    })
+    new = switch({
+        Interface: {
+            Interface("1/1"): {"State": State("Down"), "MAC Addresses": MacAddresses(["00:11:22:33:44:66"])},
+            Interface("1/2"): {"State": State("Up"), "MAC Addresses": MacAddresses([])},
+        },
+        Network: {Network("10.0.0.0", "255.0.0.0"): {"Next Hop": Basic("10.0.0.1")}},
+    })
+    return Comparison(old, new)
+
+
+def test_comparison_save_matches_json_dump(comparison, tmp_path):
+    path = tmp_path / "report.json"
+    comparison.save(path)
+    expected = {t.__name__: {str(k): v for k, v in d.items() if v} for t, d in comparison}
+    assert path.read_text() == json.dumps(expected, default=str, indent=2)
+
+
+def test_comparison_save_json_lines(comparison, tmp_path):
+    path = tmp_path / "report.jsonl"
+    comparison.save(path)
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(r["type"], r["key"]) for r in records] == [("Interface", "1/1")]
+    assert records[0]["value"]["MAC Addresses"] == {"missing": ["00:11:22:33:44:55"], "gained": ["00:11:22:33:44:66"]}
+
+
+def test_switch_save_matches_json_dump(comparison, tmp_path):
+    path = tmp_path / "switch.json"
+    comparison.old.save(path)
+    expected = {t.__name__: {str(k): v for k, v in d.items()} for t, d in comparison.old}
+    assert path.read_text() == json.dumps(expected, default=str, indent=2)
@@ -0,0 +1,69 @@
+from model.network_objects import Basic, Network
+from model.routing import RouteTable, diff_routes
+
+ROUTES = {
+    Network("0.0.0.0", "0.0.0.0"): {"Next Hop": Basic("192.168.0.1")},
+    Network("10.0.0.0", "255.0.0.0"): {"Next Hop": Basic("192.168.0.2")},
+    Network("10.4.0.0", "255.255.0.0"): {"Next Hop": Basic("192.168.0.3")},
+    Network("10.4.7.0", "255.255.255.0"): {"Next Hop": Basic("192.168.0.4")},
+    Network("10.5.0.0", "255.255.0.0"): {"Next Hop": Basic("192.168.0.5")},
+}
+
+
+def test_longest_prefix_match():
+    table = RouteTable(ROUTES)
+    assert table.lookup("10.4.7.19")[0] == Network("10.4.7.0", "255.255.255.0")
+    assert table.lookup("10.4.8.19")[0] == Network("10.4.0.0", "255.255.0.0")
+    assert table.lookup("172.16.0.1")[0] == Network("0.0.0.0", "0.0.0.0")
+
+
+def test_lookup_many_matches_lookup():
+    table = RouteTable(ROUTES)
+    addresses = ["10.4.7.19", "10.5.1.1", "10.6.1.1", "8.8.8.8"]
+    assert table.lookup_many(addresses) == [table.lookup(a) for a in addresses]
+
+
+def test_no_match_without_default_route():
+    table = RouteTable({n: v for n, v in ROUTES.items() if n.mask != "0.0.0.0"})
+    assert table.lookup("8.8.8.8") is None
+
+
+def test_covering_and_covered():
+    table = RouteTable(ROUTES)
+    network = Network("10.4.0.0", "255.255.0.0")
+    assert [n for n, _ in table.covering(network)] == [
+        network, Network("10.0.0.0", "255.0.0.0"), Network("0.0.0.0", "0.0.0.0")
+    ]
+    assert [n for n, _ in table.covered(Network("10.0.0.0", "255.0.0.0"))] == [
+        Network("10.0.0.0", "255.0.0.0"), Network("10.4.0.0", "255.255.0.0"),
+        Network("10.5.0.0", "255.255.0.0"), Network("10.4.7.0", "255.255.255.0"),
+    ]
+    assert len(table.overlapping(network)) == 4
+    assert network in table
+    assert Network("10.6.0.0", "255.255.0.0") not in table
+
+
+def route(network: str, mask: str, hop: str = "192.168.0.1") -> tuple[Network, dict]:
+    return Network(network, mask), {"Next Hop": Basic(hop)}
+
+
+def test_diff_routes():
+    old = dict([
+        route("10.1.0.0", "255.255.255.0"), route("10.1.1.0", "255.255.255.0"), route("10.1.2.0", "255.255.255.0"),
+        route("10.2.0.0", "255.255.0.0"), route("10.3.0.0", "255.255.0.0"), route("172.16.0.0", "255.255.0.0"),
+    ])
+    new = dict([
+        route("10.1.0.0", "255.255.252.0"), route("10.1.2.0", "255.255.255.0"),
+        route("10.2.0.0", "255.255.0.0", "192.168.0.9"), route("10.4.0.0", "255.255.0.0"),
+        route("172.16.0.0", "255.255.255.0"), route("172.16.1.0", "255.255.255.0"), route("0.0.0.0", "0.0.0.0"),
+    ])
+    changes = [(c.kind, str(c.network), [str(s) for s in c.specifics]) for c in diff_routes(old, new)]
+    assert changes == [
+        ("aggregated", "10.1.0.0//255.255.252.0", ["10.1.0.0//255.255.255.0", "10.1.1.0//255.255.255.0"]),
+        ("changed", "10.2.0.0//255.255.0.0", []),
+        ("removed", "10.3.0.0//255.255.0.0", []),
+        ("added", "10.4.0.0//255.255.0.0", []),
+        ("deaggregated", "172.16.0.0//255.255.0.0", ["172.16.0.0//255.255.255.0", "172.16.1.0//255.255.255.0"]),
+        # The default route covers every other route, so it is only reported once they have all been seen.
+        ("added", "0.0.0.0//0.0.0.0", []),
+    ]
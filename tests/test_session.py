@@ -0,0 +1,85 @@
+from model.network_objects import Connection, Interface
+from model.session import Session, footprint, interned_footprint
+from voss import VOSS
+
+import layer2  # noqa: F401 registers the layer 2 parsers
+import layer3  # noqa: F401 registers the layer 3 parsers
+
+from test_show import TECH_FILE
+
+
+def session(tmp_path, switches, max_bytes):
+    s = Session(VOSS.load, max_bytes=max_bytes)
+    for n in range(switches):
+        path = tmp_path / f"tech{n}.txt"
+        path.write_text(TECH_FILE.replace("core-a", f"core-{n}"))
+        s.add(f"switch-{n}", path)
+    return s
+
+
+def adjacencies(switch):
+    return [v["ISIS Adjacency"] for v in switch[Interface].values()]
+
+
+def test_switches_do_not_share_parsed_data(tmp_path):
+    s = session(tmp_path, 3, max_bytes=1 << 30)
+    for n in range(3):
+        assert Connection(f"core-{n}") in adjacencies(s[f"switch-{n}"])
+    assert s.loaded == ["switch-0", "switch-1", "switch-2"]
+    assert s.evictions == 0
+
+
+def test_least_recently_used_switches_are_evicted(tmp_path):
+    s = session(tmp_path, 3, max_bytes=0)
+    adjacencies(s["switch-0"])
+    adjacencies(s["switch-1"])
+    assert s.loaded == ["switch-1"]
+    parsed = VOSS.load(tmp_path / "tech0.txt")
+    adjacencies(parsed)
+    s.max_bytes = 2 * footprint(parsed) + 1024
+    adjacencies(s["switch-2"])
+    assert s.loaded == ["switch-1", "switch-2"]
+    # An evicted switch is loaded again on demand.
+    assert Connection("core-0") in adjacencies(s["switch-0"])
+    assert s.loads == 4
+    assert "switch-0" in s.loaded and len(s.loaded) <= 2
+    s.max_bytes = 0
+    s.trim()
+    assert s.loaded == ["switch-0"]
+
+
+def test_evicted_switches_close_their_tech_files(tmp_path):
+    s = session(tmp_path, 2, max_bytes=0)
+    stream = s["switch-0"].tech_file.data_stream
+    assert not stream.closed
+    s["switch-1"]
+    assert s.loaded == ["switch-1"]
+    assert stream.closed
+
+
+def test_switches_are_only_measured_when_they_parse_more(tmp_path):
+    measured = []
+    s = session(tmp_path, 2, max_bytes=1 << 30)
+    s.measure = lambda switch: measured.append(switch) or footprint(switch)
+    for _ in range(3):
+        s["switch-0"]
+    assert len(measured) == 1
+    adjacencies(s["switch-0"])
+    s["switch-1"]
+    # switch-0 parsed its interfaces since it was loaded, and switch-1 is new.
+    assert len(measured) == 3
+    s.trim()
+    assert len(measured) == 3
+
+
+def test_interned_values_are_not_counted_per_switch(tmp_path):
+    s = session(tmp_path, 2, max_bytes=1 << 30)
+    switches = [s["switch-0"], s["switch-1"]]
+    for switch in switches:
+        adjacencies(switch)
+    # Both switches hold the same interned ports, which only count towards the values they share.
+    port = next(iter(switches[0][Interface]))
+    assert port is next(iter(switches[1][Interface]))
+    assert footprint({port: None}) == footprint({None: None})
+    s.trim()
+    assert s.size == footprint(switches[0]) + footprint(switches[1]) + interned_footprint()
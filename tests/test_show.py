@@ -0,0 +1,98 @@
+import pytest
+
+from voss import TechFile
+
+import layer2  # noqa: F401 registers the layer 2 parsers
+import layer3  # noqa: F401 registers the layer 3 parsers
+
+
+TECH_FILE = """\
+Command:[1] [show sys-info]
+General Info :
+        SysDescr     : VSP-8404C (8.1.0.0)
+Command:[2] [ show isis adjacencies ]
+================================================================================
+                                ISIS Adjacencies
+================================================================================
+INTERFACE    L STATE   UPTIME     PRI HOLDTIME SYSID          HOST-NAME       STATE
+--------------------------------------------------------------------------------
+Port1/1      1 UP      1d 02:11:03 127 27     0200.1000.0001 core-a          UP
+Port1/2      1 UP      1d 02:11:03 127 27     0200.1000.0002 core-b          UP
+Command:[3] [show ip route vrf red]
+10.9.9.0      255.255.255.0  10.9.9.1   -   1    9   LOC  0   DB   0
+Command:[4] [show ip route]
+10.1.1.0      255.255.255.0  10.1.1.1   -   1    10   LOC  0   DB   0
+10.2.0.0      255.255.0.0    10.1.1.254 -   1    10   OSPF 0   IB   20
+"""
+
+
+def lines(text: str) -> list[str]:
+    return text.splitlines(keepends=True)
+
+
+def test_extractor_matches_registered_commands_only():
+    sections = dict(TechFile.extractor(lines(TECH_FILE), {"show isis adjacencies", "show ip route"}))
+    assert set(sections) == {"show isis adjacencies", "show ip route"}
+    assert sections["show isis adjacencies"][-1].startswith("Port1/2")
+
+
+def test_extractor_yields_the_last_section():
+    sections = dict(TechFile.extractor(lines(TECH_FILE), {"show ip route"}))
+    assert len(sections["show ip route"]) == 2
+
+
+def test_extractor_ignores_unregistered_commands_with_registered_prefix():
+    sections = dict(TechFile.extractor(lines(TECH_FILE), {"show ip route"}))
+    assert not any("10.9.9.0" in line for line in sections["show ip route"])
+
+
+def test_isis_adjacencies():
+    sections = dict(TechFile.extractor(lines(TECH_FILE), TechFile._commands.keys()))
+    data = layer2.get_isis_adjacencies(sections["show isis adjacencies"])
+    assert {str(port): str(values["ISIS Adjacency"]) for port, values in data.items()} == {
+        "1/1": "core-a", "1/2": "core-b"
+    }
+
+
+@pytest.fixture
+def tech_file_path(tmp_path):
+    path = tmp_path / "tech.txt"
+    path.write_text(TECH_FILE)
+    return path
+
+
+def test_indexed_sections_match_extractor(tech_file_path):
+    indexed = TechFile.load(tech_file_path, index=True)
+    extracted = dict(TechFile.extractor(lines(TECH_FILE), TechFile._commands.keys()))
+    assert list(indexed._sections) == list(extracted)
+    for command, output in extracted.items():
+        assert indexed.section(command) == output
+
+
+def test_indexed_item_access_parses_one_section(tech_file_path):
+    with TechFile.load(tech_file_path, index=True) as indexed:
+        routes = indexed["show ip route"]
+        assert len(routes) == 2
+        assert list(indexed.data_store) == ["show ip route"]
+        assert indexed["show lldp neighbor"] is None
+    # Closing releases the memory map, while the parsed output remains.
+    assert indexed._buffer.closed and indexed["show ip route"] is routes
+
+
+def test_indexed_empty_file(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.touch()
+    assert TechFile.load(path, index=True).read() == {}
+
+
+def test_generated_tech_file_parses():
+    from benchmarks.generator import TechFileGenerator
+    generator = TechFileGenerator(ports=96, lldp_neighbors=8, isis_neighbors=4, mac_addresses=50, routes=30)
+    assert list(generator.lines()) == list(generator.lines())
+    source = TechFile()
+    source.data_stream = generator.lines()
+    parsed = source.read()
+    assert len(parsed["show interfaces gigabitEthernet"]) == 96
+    assert len(parsed["show lldp neighbor"]) == 8
+    assert len(parsed["show isis adjacencies"]) == 4
+    assert len(parsed["show ip route"]) == 30
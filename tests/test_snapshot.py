@@ -0,0 +1,86 @@
+import math
+
+import pytest
+
+from model.network_objects import Basic, Interface, MacAddresses, Network, State
+from model.snapshot import MAGIC, VERSION, Snapshot, _HEADER, is_snapshot, write_snapshot
+from voss import VOSS
+
+import layer2  # noqa: F401 registers the layer 2 parsers
+import layer3  # noqa: F401 registers the layer 3 parsers
+
+from benchmarks.generator import TechFileGenerator
+
+
+def generated(tmp_path):
+    path = tmp_path / "vsp.txt"
+    TechFileGenerator(ports=8, mac_addresses=50, routes=50, filler_lines=0).write(path)
+    return path
+
+
+def test_round_trip_keeps_types(tmp_path):
+    data = VOSS.load(generated(tmp_path)).read()
+    write_snapshot(tmp_path / "vsp.snap", data.items())
+    snapshot = Snapshot(tmp_path / "vsp.snap")
+    assert snapshot.types() == list(data)
+    loaded = dict(snapshot)
+    assert loaded == data
+    port, values = next((p, v) for p, v in loaded[Interface].items() if len(v.get("MAC Addresses", ())))
+    assert type(port) is Interface
+    assert type(values["MAC Addresses"]) is MacAddresses
+    assert values["MAC Addresses"].notation == data[Interface][port]["MAC Addresses"].notation
+    assert all(type(route) is Network for route in loaded[Network])
+
+
+def test_values_of_every_kind(tmp_path):
+    data = {
+        Interface("1/1"): {
+            "State": State("Up"), "Speed": 10000, "Load": 0.5, "Tagged": True, "Shutdown": False, "Vlan": None,
+            "Vlans": [1, 2, 2], "Pair": (Interface("1/2"), "x"), "Names": {Interface("1/3"): ["a", "a\0b"]},
+            "Pairs": {"a": (1, 2), "b": (True, 2)}, "Zeros": [0.0, -0.0],
+        },
+        Interface("1/2"): State("Down"),
+        Interface("1/3"): {"Speed": 1},
+    }
+    write_snapshot(tmp_path / "kinds.snap", [(Interface, data)])
+    loaded = Snapshot(tmp_path / "kinds.snap").read(Interface)
+    assert loaded == data
+    assert list(loaded) == list(data)
+    values = loaded[Interface("1/1")]
+    assert values["Tagged"] is True and values["Speed"] == 10000 and type(values["Speed"]) is int
+    assert type(values["Pair"]) is tuple and type(values["Vlans"]) is list
+    assert values["Pairs"]["b"][0] is True and values["Pairs"]["a"][0] is not True
+    assert [math.copysign(1, zero) for zero in values["Zeros"]] == [1, -1]
+    with pytest.raises(TypeError):
+        write_snapshot(tmp_path / "bad.snap", [(Interface, {Interface("1/1"): {"Set": {1}}})])
+
+
+def test_read_a_single_type(tmp_path):
+    data = VOSS.load(generated(tmp_path)).read()
+    write_snapshot(tmp_path / "vsp.snap", data.items())
+    snapshot = Snapshot(tmp_path / "vsp.snap")
+    assert Network in snapshot and Basic not in snapshot
+    assert snapshot.read(Network) == data[Network]
+    assert snapshot.read(Basic) is None
+
+
+def test_rejects_other_files(tmp_path):
+    path = generated(tmp_path)
+    assert not is_snapshot(path)
+    with pytest.raises(ValueError):
+        Snapshot(path)
+    newer = tmp_path / "newer.snap"
+    newer.write_bytes(_HEADER.pack(MAGIC, VERSION + 1, 0, 0))
+    assert is_snapshot(newer)
+    with pytest.raises(ValueError, match="newer"):
+        Snapshot(newer)
+
+
+def test_voss_saves_and_loads_snapshots(tmp_path):
+    switch = VOSS.load(generated(tmp_path))
+    switch.save(str(tmp_path / "vsp.snap"))
+    loaded = VOSS.load(tmp_path / "vsp.snap")
+    assert loaded.types() == list(switch.read())
+    assert loaded[Network] == switch[Network]
+    assert list(loaded._data_store) == [Network]
+    assert loaded.read() == switch.read()
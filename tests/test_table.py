@@ -0,0 +1,54 @@
+import pytest
+
+from model.network_objects import Interface
+from model.table import Column, PORT, Scanner, Table
+from voss import TechFile
+
+from benchmarks.generator import TechFileGenerator
+from benchmarks.parsers import LEGACY
+from test_show import TECH_FILE, lines
+
+
+def test_table_rows_convert_named_columns():
+    table = Table("row", [Column("port", PORT, prefix="Port"), Column(None), Column("speed", convert=int)], marker="Port")
+    assert list(table.rows(["Port1/1  up  1000\n", "header line\n", "Port1/2 down 10\n"])) == [("1/1", 1000), ("1/2", 10)]
+
+
+def test_scanner_reads_sections_in_a_single_pass():
+    scanner = Scanner(
+        Table("a", [Column("value")], start="Section A", end="Section B", anchored=True, trailing=True),
+        Table("b", [Column("value")], start="Section B", anchored=True, trailing=True),
+    )
+    text = ["x\n", "Section A\n", "one\n", "Section B\n", "two\n", "Section A\n", "three\n"]
+    assert list(scanner.scan(text)) == [("a", ("one",)), ("b", ("two",)), ("a", ("three",)), ("b", ("three",))]
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_ported_parsers_match_the_hand_rolled_parsers(seed):
+    generated = TechFileGenerator(ports=16, mac_addresses=200, routes=200, filler_lines=10, seed=seed).lines()
+    for text in (generated, lines(TECH_FILE)):
+        for command, lines_ in TechFile.extractor(text, LEGACY.keys()):
+            assert TechFile._commands[command](lines_) == LEGACY[command](lines_)
+
+
+def test_mac_addresses_are_found_anywhere_on_the_line():
+    text = [
+        "Port Name\n", "1/1    10GbSR    up    full    10000    Access\n",
+        "Port Config\n", "Port Fdb\n",
+        "00:11:22:33:44:55  Port-1/1  LEARNED\n",
+        "10 learned 00:11:22:33:44:66 Port-1/1\n",
+        "Port-1/1 00:11:22:33:44:77 LEARNED\n",
+        "Brouter Port Ip\n",
+    ]
+    command = "show interfaces gigabitEthernet"
+    parsed = TechFile._commands[command](text)
+    assert parsed == LEGACY[command](text)
+    assert len(parsed[Interface("1/1")]["MAC Addresses"]) == 3
+
+
+def test_isis_adjacencies_need_no_columns_between_port_and_host():
+    text = ["Port1/1 core-a UP\n", "Port1/2\tcore-b\tUP\n"]
+    command = "show isis adjacencies"
+    parsed = TechFile._commands[command](text)
+    assert parsed == LEGACY[command](text)
+    assert len(parsed) == 2
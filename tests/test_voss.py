@@ -0,0 +1,108 @@
+import pickle
+
+import pytest
+
+from model import compression
+from model.network_objects import Connection, Interface, MacAddresses, Network, State, Vlan
+from voss import TechFile, VOSS
+
+import layer2  # noqa: F401 registers the layer 2 parsers
+import layer3  # noqa: F401 registers the layer 3 parsers
+
+from test_show import TECH_FILE, lines
+
+
+def test_network_objects_pickle_round_trip():
+    objects = [
+        Interface("1/1"), State("Up"), Connection("core-a"), Network("10.0.0.0", "255.0.0.0"),
+        Vlan(10, "users"), MacAddresses(["00:11:22:33:44:55"]),
+    ]
+    restored = pickle.loads(pickle.dumps(objects))
+    assert restored == objects
+    assert [type(o) for o in restored] == [type(o) for o in objects]
+
+
+def test_load_many(tmp_path):
+    paths = []
+    for n in range(4):
+        path = tmp_path / f"tech{n}.txt"
+        path.write_text(TECH_FILE.replace("core-a", f"core-{n}"))
+        paths.append(path)
+    statistics = {}
+    loaded = dict(VOSS.load_many(paths, workers=2, statistics=statistics))
+    assert set(loaded) == set(paths)
+    for n, path in enumerate(paths):
+        assert loaded[path].read() == VOSS.load(path).read()
+        assert Connection(f"core-{n}") in [v["ISIS Adjacency"] for v in loaded[path][Interface].values()]
+    assert sum(worker.files for worker in statistics.values()) == len(paths)
+    assert all(worker.bytes_per_second > 0 for worker in statistics.values())
+
+
+def test_load_many_reports_failures(tmp_path):
+    good = tmp_path / "good.txt"
+    good.write_text(TECH_FILE)
+    missing = tmp_path / "missing.txt"
+    errors = {}
+    loaded = dict(VOSS.load_many([missing, good], workers=2, errors=errors))
+    assert list(loaded) == [good]
+    assert isinstance(errors[missing], FileNotFoundError)
+    with pytest.raises(FileNotFoundError):
+        dict(VOSS.load_many([missing, good], workers=2))
+
+
+def test_incremental_load_reuses_unchanged_sections(tmp_path):
+    before, after = tmp_path / "before.txt", tmp_path / "after.txt"
+    before.write_text(TECH_FILE)
+    after.write_text(TECH_FILE.replace("core-b          UP", "core-b          DOWN"))
+    previous = VOSS.load(before)
+    previous.read()
+    current = VOSS.load(after, previous=previous)
+    assert current.read() == VOSS.load(after).read()
+    assert current.tech_file.reused == {"show ip route"}
+    assert current.tech_file["show ip route"] is previous.tech_file["show ip route"]
+    assert current[Interface][Interface("1/2")]["ISIS Status"] == State("DOWN")
+
+
+def test_item_access_parses_only_the_producing_commands(tmp_path):
+    path = tmp_path / "tech.txt"
+    path.write_text(TECH_FILE)
+    for index in (True, False):
+        switch = VOSS.load(path, index=index)
+        networks = switch[Network]
+        assert set(switch.tech_file.data_store) == set(TechFile.producers(Network))
+        assert "show ip route" in switch.tech_file.data_store
+        assert "show isis adjacencies" not in switch.tech_file.data_store
+        assert networks == VOSS.load(path).read()[Network]
+        assert switch.read() == VOSS.load(path).read()
+
+
+def test_streamed_switch_reads_its_file_once(tmp_path, monkeypatch):
+    path = tmp_path / "tech.txt"
+    path.write_text(TECH_FILE)
+    opened = []
+    open_text = compression.open_text
+    monkeypatch.setattr(compression, "open_text", lambda file_path: opened.append(file_path) or open_text(file_path))
+    switch = VOSS.load(path)
+    switch[Network]
+    switch[Interface]
+    assert switch.read() == VOSS.load(path, index=True).read()
+    assert opened == [path]
+    assert switch.tech_file.data_stream.closed
+    # A stream that can only be read once serves later commands from the sections it kept.
+    source = TechFile()
+    source.data_stream = iter(lines(TECH_FILE))
+    assert source.parse(["show ip route"]).keys() == {"show ip route"}
+    assert set(source.read()) == {"show isis adjacencies", "show ip route"}
+
+
+def test_subclass_parsers_are_not_registered_on_the_parent():
+    class Other(TechFile):
+        pass
+
+    @Other.parser("show other")
+    def show_other(lines: list[str]) -> dict:
+        return {}
+
+    assert "show other" in Other._commands
+    assert "show other" not in TechFile._commands
+    assert set(TechFile._commands) <= set(Other._commands)